@@ -8,7 +8,9 @@ from fastapi import FastAPI, UploadFile, File
 from pydantic import BaseModel, Field
 
 import domain_bg as domain
-from component_two.utils.data_utils import DataUtils
+from component_two.utils.data_utils import DataUtils, ColumnConfig
+from rag.config_rag import RAGConfig
+from rag.retriever_registry import retriever_registry
 
 from datetime import datetime
 
@@ -83,4 +85,15 @@ def accept(sid: str):
         "status": s.status,
         "file_path": file_path,
         "message": "Session accepted and data saved successfully"
-    }
\ No newline at end of file
+    }
+
+
+@bg_app.get("/rag/health")
+def rag_health(load: bool = False):
+    """
+    Report the state of the shared warm retriever.
+
+    With `load=true` the vector DB is loaded (warmed up) if it is not loaded yet.
+    """
+    cfg_rag = RAGConfig(project_root=ColumnConfig.config_paths.project_root)
+    return retriever_registry.health_check(cfg_rag, load=load)
@@ -3,4 +3,7 @@ class ConfigAgent:
     """Configuration class"""
     def __init__(self):
             self.llm_model = 'gpt-4o-mini' #"gpt-4o" #"gpt-4o-mini" #'gpt-4.1-nano'
-            self.llm_temperature = 0.0
\ No newline at end of file
+            self.llm_temperature = 0.0
+            # Response cache of row regenerations: "off" | "read_write" | "replay" (see utils/llm_cache.py)
+            self.llm_cache_mode = "off"
+            self.llm_cache_max_entries = 20_000
@@ -6,6 +6,9 @@ from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
 
 from configs.config import ConfigAgent
+from utils.api_scheduler import rate_limited, PRIORITY_INTERACTIVE
+from utils.llm_cache import CachedLLM, get_llm_cache
+from configs.config_paths import ConfigPaths
 
 from dotenv import load_dotenv
 
@@ -14,8 +17,22 @@ load_dotenv(override=True)
 # Instantiate configuration
 confing_constants = ConfigAgent()
 
-# Initialize the LLM client
-_llm = ChatOpenAI(model=confing_constants.llm_model, temperature=confing_constants.llm_temperature)
+# Initialize the LLM client. Review requests are interactive: the shared rate limiter
+# admits them before queued batch generation calls.
+_llm = rate_limited(
+    ChatOpenAI(model=confing_constants.llm_model, temperature=confing_constants.llm_temperature, max_retries=0),
+    priority=PRIORITY_INTERACTIVE,
+)
+
+# Identical (row, feedback) requests are answered from the response cache when enabled
+_cache = None
+if confing_constants.llm_cache_mode != "off":
+    _cache = get_llm_cache(ConfigPaths().llm_cache_path, max_entries=confing_constants.llm_cache_max_entries)
+_cached_llm = CachedLLM(
+    _cache,
+    model=f"{confing_constants.llm_model}|temperature={confing_constants.llm_temperature}",
+    mode=confing_constants.llm_cache_mode,
+)
 
 
 def regenerate_row_with_llm(columns: List[str], current_row: Dict[str, object], feedback: str) -> Dict[str, object]:
@@ -61,7 +78,8 @@ def regenerate_row_with_llm(columns: List[str], current_row: Dict[str, object],
     )
 
     # Get response from LLM
-    raw = _llm.invoke([system, human]).content.strip()
+    messages = [system, human]
+    raw = _cached_llm.invoke(messages, lambda: _llm.invoke(messages)).content.strip()
 
     # Parse and validate response
     try:
@@ -5,4 +5,54 @@ class ConfigAgents:
             self.max_iterations = 2
             self.recursion_limit = 20
             self.llm_model = 'gpt-4o-mini' #"gpt-4o" #"gpt-4o-mini" #'gpt-4.1-nano'
-            self.llm_temperature = 0.0
\ No newline at end of file
+            self.llm_temperature = 0.0
+
+            # Generator: send only rows which still hold placeholders and merge the answers
+            # back into the template by key (False = the LLM re-emits the whole table)
+            self.generate_missing_rows_only = True
+
+            # How tables are serialized in the generator/validator prompts:
+            # "json_indent" (legacy) | "json_records" | "json_columns" | "delimited"
+            self.prompt_table_encoding = "delimited"
+            # Print the token cost of every encoding on the first generation of a table
+            self.report_encoding_savings = False
+            # Print, per LLM call, how many prompt tokens are shared with a previous prompt
+            # (the prompts keep a stable prefix so provider-side prompt caching can reuse it)
+            self.report_prompt_prefix = False
+
+            # Wide tables: split the rows into shards of about `shard_token_budget` prompt tokens,
+            # generate and validate the shards concurrently and reduce the shard summaries
+            # into one table summary. Tables which fit into a single shard run unchanged.
+            self.shard_wide_tables = True
+            self.shard_token_budget = 6000
+            self.shard_rag_token_budget = 3000   # RAG context packed for the columns of one shard
+            self.shard_max_workers = 4
+
+            # Batch runs (main_batch.py): number of tables processed concurrently
+            self.batch_max_workers = 4
+
+            # Deadlines per graph node in seconds, for all LLM calls of one node run (0 = none).
+            # A node missing its deadline raises NodeDeadlineExceeded and the table fails.
+            self.node_deadlines_s = {"generate": 600, "validate": 300}
+            # Hedged requests: when an LLM call is slower than the given latency percentile of
+            # previous calls of its kind, a duplicate request is fired and the first valid answer wins
+            self.hedge_requests = True
+            self.hedge_latency_percentile = 95
+            self.hedge_min_samples = 8          # latencies needed before the percentile is used
+            self.hedge_initial_delay_s = 120    # hedge delay until then (None = no hedging until then)
+
+            # Deterministic LLM response cache keyed by (model, prompt hash, output schema):
+            # "off" | "read_write" (reuse + store) | "replay" (cache only, a miss fails - for CI)
+            self.llm_cache_mode = "off"
+            self.llm_cache_max_entries = 20_000
+
+            # Resumable runs (needs langgraph-checkpoint-sqlite): every node's output is
+            # checkpointed (SQLite) per table and run id. Re-running with the same run id resumes
+            # a failed table from its last completed node; completed tables run again.
+            self.use_checkpointer = False
+            self.checkpoint_run_id = "default"
+
+            # Async execution: the graph runs with `ainvoke` on one event loop (LLM calls,
+            # shards and embedding requests are awaited instead of using a thread each)
+            self.use_async = False
+            self.batch_max_concurrency = 16   # tables in flight at once in an async batch run
@@ -1,3 +1,5 @@
+import re
+
 import pandas as pd
 
 class DatasetColumnMappings:
@@ -63,6 +65,13 @@ class ColumnGroupDefinitions:
         self.additional_columns = [
                 "sample_values"
             ]
+        # Compact view of rows accepted in a previous attempt, sent to the generator as read-only context
+        self.readonly_context_columns = [
+                "column_name",
+                "business_domain_name",
+                "business_name",
+                "column_description"
+            ]
         # self.columns_to_drop = [
         #     "data_steward_approval",
         #     "data_steward_feedback",
@@ -82,6 +91,7 @@ class ConfigDatasets:
         #expose the dictionaries via the  attribute names used in other parts of the code
         self.column_mappings_master_bg = self._column_mappings.column_mappings_master_bg
         self.column_mappings_master_data_owners = self._column_mappings.column_mappings_master_data_owners
+        self.readonly_context_columns = self._column_groups.readonly_context_columns
 
         self.define_columns_to_fill = {
             'key_columns': self._column_groups.key_columns,
@@ -100,6 +110,11 @@ class ConfigDatasets:
         # Placeholders
         self.rag_placeholder = "<agent>"
         self.ds_placeholder = "<ds_master>"
+        # Only these exact tags mark a field which still needs to be filled: other <...> text
+        # (e.g. "<NA>" of nullable pandas / DuckDB samples, "0 < x and y > 1") is content
+        self.placeholder_pattern = "|".join(re.escape(p) for p in (self.rag_placeholder, self.ds_placeholder))
+        # Fields of the template which can hold a placeholder (sample_values is source data)
+        self.placeholder_fields = self._column_groups.rag_columns + self._column_groups.data_steward_columns
 
 
     def get_framework_dict(self):
@@ -111,6 +126,14 @@ class ConfigDatasets:
             "search_with_data_steward_file": list(self._column_groups.data_steward_columns),
         }
 
+    def default_table_identity(self):
+        """bucket_name / dataset_name / table_name used when a run does not name its table."""
+        return {
+            "bucket_name": self.bucket_name_value,
+            "dataset_name": self.dataset_name_value,
+            "table_name": self.table_name_value,
+        }
+
     def template_columns(self):
         """Return all columns in the template, de-duped and in the right order."""
         fw = self.get_framework_dict()
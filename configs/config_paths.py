@@ -16,11 +16,26 @@ class ConfigPaths:
         self.data_dir = self.project_root / "data"
         self.output_dir = self.project_root / "99_playground" / "outputs_collected"
 
-        # CSV file paths
+        # Input file paths (.csv, Parquet: .parquet / .pq, Feather / Arrow IPC: .feather / .arrow / .ipc)
         self.main_dataset = self.data_dir / "datasets" / "dataset_csv.csv"
         self.master_glossary = self.data_dir / "master_business_glossary" / "master_business_glossary_csv.csv"
         self.data_stewards = self.data_dir / "stewards_and_owners" / "data_stewards.csv"
 
+        # SQL source (DuckDB / SQLite) instead of `main_dataset`, sampled in the database
+        self.sql_source = None                # e.g. "duckdb:///data/warehouse.duckdb" or "sqlite:///data/source.db"
+        self.sql_table = None                 # "schema.table" or "table" (default schema)
+        self.sql_profile_rows = 10_000        # rows sampled in SQL for the column profiles
+
+        # Batch runs (main_batch.py)
+        # Manifest columns: bucket_name;dataset_name;table_name;path (path relative to project_root or absolute)
+        # (kept outside data/datasets, which `--datasets-dir` would read as a table)
+        self.batch_manifest = self.data_dir / "batch_manifest.csv"
+
+        # Persistent LLM response cache (ConfigAgents.llm_cache_mode)
+        self.llm_cache_path = self.project_root / "cache" / "llm_responses.sqlite"
+        # LangGraph checkpoints of resumable runs (ConfigAgents.use_checkpointer)
+        self.checkpoint_db = self.project_root / "cache" / "checkpoints.sqlite"
+
         # Output settings
         self.output_filename_suffix_context_rag = "BG_CONTEXT"
         self.output_filename_suffix_table_summary = "BG_TABLE_SUMMARY"
@@ -28,4 +43,23 @@ class ConfigPaths:
         self.include_timestamp = True
 
         # CSV settings
-        self.csv_separator = ";"
\ No newline at end of file
+        self.csv_separator = ";"
+        self.csv_decimal = ","                # decimal separator of the numbers in source tables (1727237,59)
+
+        # Sampling of the source tables (sample values shown to the Agents)
+        self.sample_size = 3                  # rows in the sample
+        self.sample_method = "reservoir"      # "reservoir" (uniform, streamed) | "head" (first rows)
+        self.sample_max_rows = None           # stop scanning after this many rows (None = no limit)
+        self.sample_max_bytes = 256 * 1024 ** 2  # stop scanning after ~this many bytes (None = no limit)
+                                              # (Parquet: compressed bytes of the projected columns)
+                                              # A CSV is read from its start: the sample of a larger file is
+                                              # uniform over its first ~256 MiB only, not the whole file
+        self.sample_chunksize = 50_000        # rows parsed per chunk
+        self.sample_seed = 42                 # reproducible samples (None = random)
+        self.source_columns = None            # columns read from the source tables (None = all)
+
+        # Column profiles computed in the same pass (type, nulls, distinct, top values, shapes)
+        self.profile_columns = True           # profiles feed the RAG queries and the Agents' context
+        self.profile_top_k = 5                # most frequent values kept per column
+        self.profile_sketch_size = 1024       # distinct counts are exact up to this, then estimated
+        self.profile_max_shapes = 3           # regex shape signatures kept per column
\ No newline at end of file
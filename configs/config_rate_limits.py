@@ -0,0 +1,26 @@
+class ConfigRateLimits:
+    """
+    Process-wide limits of the OpenAI APIs, shared by every LLM and embedding call
+    of the process (graph nodes, batch runs, DBIndexer, VectorRetriever, review API).
+    Set a limit to 0 to disable it.
+    """
+    def __init__(self):
+            # Chat completions (generator, validator, summary, row regeneration)
+            self.chat_rpm = 500
+            self.chat_tpm = 200_000
+            # Expected completion tokens per call, reserved in the token bucket on top of the prompt
+            self.chat_output_tokens_estimate = 1_500
+
+            # Embeddings (indexing and retrieval)
+            self.embeddings_rpm = 3_000
+            self.embeddings_tpm = 1_000_000
+
+            # Adaptive concurrency: calls in flight grow with every successful call and are
+            # halved on every 429 or overload (503 / 529) response
+            self.min_concurrency = 1
+            self.max_concurrency = 32
+            self.initial_concurrency = 8
+
+            # 429 / transient errors are retried by the scheduler (a 429 pauses all callers)
+            self.max_retries = 4
+            self.backoff_s = 2.0
@@ -1,4 +1,5 @@
 import os
+import asyncio
 import datetime
 import pandas as pd
 # from pathlib import Path
@@ -19,13 +20,26 @@ from utils.helpers import save_outputs
 
 # Import the graph builder
 from src.graph import build_graph
+from src.checkpointing import (
+    checkpointer_available, open_checkpointer, aopen_checkpointer, thread_id_for, run_inputs, run_config,
+    invoke_resumable, ainvoke_resumable,
+)
 
 # Import Configs
 from configs.config_paths import ConfigPaths
 from rag.config_rag import RAGConfig
 from configs.config_datasets import ConfigDatasets
 from configs.config_agent import ConfigAgents
-from src.state import TemplateOutput
+from src.state import TemplateOutput, build_initial_state
+
+async def run_async(cfg_paths, initial_state, config, resumable):
+    """Run the graph with `ainvoke` (with an async checkpointer when runs are resumable)."""
+    if not resumable:
+        app = build_graph(project_root=cfg_paths.project_root)
+        return await app.ainvoke(initial_state, config)
+    async with aopen_checkpointer(cfg_paths.checkpoint_db) as saver:
+        app = build_graph(project_root=cfg_paths.project_root, checkpointer=saver)
+        return await ainvoke_resumable(app, initial_state, config)
 
 def main():
     """Main execution flow - simple and clean."""
@@ -46,7 +60,7 @@ def main():
 
     # 2. Load data
     try:
-        sample_dict, bg_dict, ds_dict = load_data(cfg_paths, cfg_datasets)
+        sample_dict, bg_dict, ds_dict, profiles = load_data(cfg_paths, cfg_datasets)
     except FileNotFoundError as e:
         print(f"\n Error: {e}")
         print("\nMake sure these files exist:")
@@ -65,32 +79,41 @@ def main():
     validate_expected_columns_in_masters(ds_dict, ds_master_columns)
 
     # 4. Setup initial state
-    initial_state = {
-        "framework_def": cfg_datasets.get_framework_dict(),
-        "source_original_table": sample_dict,
-        "master_business_glossary": bg_dict,
-        "master_data_owner": ds_dict,
-        "RAG_cols_with_samples": {},
-        "RAG_company_context": "",
-        "entire_table_context": {},
-        "template_df": {},
-        "result": [],
-        "error_message": "",
-        "iterations": 0,
-        "review_history_validator": []
-    }
+    initial_state = build_initial_state(
+        framework_def=cfg_datasets.get_framework_dict(),
+        source_original_table=sample_dict,
+        master_business_glossary=bg_dict,
+        master_data_owner=ds_dict,
+        column_profiles=profiles,
+    )
 
     # 5. Run workflow
     print("\n" + "=" * 60)
     print("STARTING WORKFLOW")
     print("=" * 60 + "\n")
 
-    app = build_graph(project_root=cfg_paths.project_root)
+    # A failed run is resumed from its last completed node when started again
+    thread_id = None
+    resumable = cfg_agents.use_checkpointer and checkpointer_available()
+    if resumable:
+        thread_id = thread_id_for(
+            initial_state, cfg_agents.checkpoint_run_id, cfg_datasets.default_table_identity(),
+            run_inputs(cfg_agents.llm_model, cfg_rag),
+        )
+        print(f"Checkpoint thread: {thread_id}")
+    config = run_config(cfg_agents.recursion_limit, thread_id)
 
     try:
-        final_output = app.invoke(initial_state, {"recursion_limit": cfg_agents.recursion_limit})
+        if cfg_agents.use_async:
+            final_output = asyncio.run(run_async(cfg_paths, initial_state, config, resumable))
+        else:
+            checkpointer = open_checkpointer(cfg_paths.checkpoint_db) if resumable else None
+            app = build_graph(project_root=cfg_paths.project_root, checkpointer=checkpointer)
+            final_output = invoke_resumable(app, initial_state, config)
     except Exception as e:
         print(f"\n Workflow failed: {e}")
+        if thread_id:
+            print(" Run main.py again to resume from the last completed step.")
         return 1
 
     # 6. Save results
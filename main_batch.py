@@ -0,0 +1,124 @@
+import os
+import asyncio
+import argparse
+from pathlib import Path
+
+# Load environment variables
+from dotenv import load_dotenv
+
+load_dotenv(override=True)
+if not os.environ.get("OPENAI_API_KEY"):
+    print("Error: OPENAI_API_KEY not found")
+    exit(1)
+
+# Import loaders / helpers
+from utils.data_loader import load_master_files
+from utils.data_loader import validate_expected_columns_in_masters
+
+# Import the batch runner
+from src.batch_runner import BatchRunner, jobs_from_manifest, jobs_from_directory, jobs_from_sql
+from utils.sql_sources import open_connector
+
+# Import Configs
+from configs.config_paths import ConfigPaths
+from configs.config_datasets import ConfigDatasets
+from configs.config_agent import ConfigAgents
+from utils.api_scheduler import get_scheduler
+from src.nodes import hedged_invoker
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Fill business glossaries for many tables.",
+        epilog="Without a source option the manifest of ConfigPaths.batch_manifest is used.",
+    )
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--manifest", type=Path, help="CSV manifest: bucket_name;dataset_name;table_name;path")
+    source.add_argument("--datasets-dir", type=Path, help="Directory with one file (CSV, Parquet, Feather) per table")
+    source.add_argument("--sql", help="SQL source with one table per glossary, e.g. duckdb:///data/warehouse.duckdb")
+    parser.add_argument("--sql-schema", default=None, help="Only the tables of this schema of the --sql source")
+    parser.add_argument("--workers", type=int, default=None, help="Number of tables processed concurrently")
+    parser.add_argument("--run-id", default=None,
+                        help="Checkpoint run id; re-running with the same id resumes unfinished tables")
+    parser.add_argument("--async", dest="use_async", action="store_true", default=None,
+                        help="Run all tables on one event loop (graph.ainvoke)")
+    return parser
+
+
+def main():
+    """Batch execution flow - one warm graph for many tables."""
+    parser = build_parser()
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("BUSINESS GLOSSARY FILLING - BATCH WORKFLOW")
+    print("=" * 60)
+
+    # 1. Setup configuration
+    cfg_paths = ConfigPaths()
+    cfg_datasets = ConfigDatasets()
+    cfg_agents = ConfigAgents()
+
+    # 2. Collect the tables to process
+    connector = None
+    try:
+        if args.sql:
+            connector = open_connector(args.sql)
+            jobs = jobs_from_sql(connector, cfg_datasets, args.sql_schema)
+        elif args.datasets_dir:
+            jobs = jobs_from_directory(args.datasets_dir, cfg_datasets)
+        else:
+            jobs = jobs_from_manifest(args.manifest or cfg_paths.batch_manifest, cfg_paths)
+    except (FileNotFoundError, ValueError) as e:
+        if connector is not None:
+            connector.close()
+        print(f"\n Error: {e}\n")
+        parser.print_usage()
+        return 1
+
+    if not jobs:
+        print("\n No tables to process")
+        if connector is not None:
+            connector.close()
+        return 1
+
+    # 3. Load & validate master files once for the whole batch
+    try:
+        bg_dict, ds_dict = load_master_files(cfg_paths, cfg_datasets)
+    except FileNotFoundError as e:
+        print(f"\n Error: {e}")
+        return 1
+    validate_expected_columns_in_masters(bg_dict, cfg_datasets.column_mappings_master_bg)
+    validate_expected_columns_in_masters(ds_dict, cfg_datasets.column_mappings_master_data_owners)
+
+    # 4. Run all tables on a single compiled graph and warm retriever
+    runner = BatchRunner(cfg_paths, cfg_datasets, cfg_agents, bg_dict, ds_dict, run_id=args.run_id, connector=connector)
+    use_async = cfg_agents.use_async if args.use_async is None else args.use_async
+    try:
+        if use_async:
+            results = asyncio.run(runner.arun(jobs, max_concurrency=args.workers))
+        else:
+            results = runner.run(jobs, max_workers=args.workers)
+    finally:
+        if connector is not None:
+            connector.close()
+
+    # 5. Summary
+    failed = [r for r in results if not r.ok]
+    print("\n" + "-" * 60)
+    print(f"Tables processed: {len(results)} | succeeded: {len(results) - len(failed)} | failed: {len(failed)}")
+    print(f"📝 Saved to: {cfg_paths.output_dir}")
+    for r in failed:
+        print(f"  - {r.job.key}: {r.error}")
+    for api in ("chat", "embeddings"):
+        scheduler = get_scheduler(api)
+        print(f"API {api}: {scheduler.stats} | concurrency limit {scheduler.concurrency_limit}")
+    for kind, counters in hedged_invoker.counters.items():
+        print(f"LLM {kind}: {counters}")
+    print("-" * 60)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import json
+import math
+import re
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+from langchain_core.documents import Document
+
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:_[a-z0-9]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercased tokens. Snake_case identifiers are kept whole *and* split into parts,
+    so `street_nm` matches both `street_nm` and `street`.
+    """
+    tokens: List[str] = []
+    for tok in _TOKEN_RE.findall(str(text).lower()):
+        tokens.append(tok)
+        if "_" in tok:
+            tokens.extend(p for p in tok.split("_") if p)
+    return tokens
+
+
+class BM25Index:
+    """
+    Local inverted index with Okapi BM25 scoring, persisted as a single JSON file
+    (chunk ids, texts, metadata and postings). No embedding call is needed to query it.
+    """
+
+    def __init__(self, path: Path, k1: float = 1.5, b: float = 0.75):
+        self.path = Path(path)
+        self.k1 = k1
+        self.b = b
+        self.ids: List[str] = []
+        self.texts: List[str] = []
+        self.metadatas: List[Dict[str, Any]] = []
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        self._doc_len: List[int] = []
+        self._avgdl = 0.0
+
+    # ---------- Writing ----------
+    @classmethod
+    def write(
+        cls,
+        path: Path,
+        ids: Sequence[str],
+        texts: Sequence[str],
+        metadatas: Sequence[Dict[str, Any]],
+    ) -> "BM25Index":
+        """Build the index for the given chunks and persist it to `path`."""
+        index = cls(path)
+        index.ids, index.texts, index.metadatas = list(ids), list(texts), list(metadatas)
+        index._build_postings()
+
+        index.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = index.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps({
+            "created_at": datetime.now().isoformat(),
+            "ids": index.ids,
+            "texts": index.texts,
+            "metadatas": index.metadatas,
+        }, ensure_ascii=False), encoding="utf-8")
+        tmp_path.replace(index.path)
+        return index
+
+    def _build_postings(self) -> None:
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        self._doc_len = []
+        for i, text in enumerate(self.texts):
+            counts = Counter(tokenize(text))
+            self._doc_len.append(sum(counts.values()))
+            for term, tf in counts.items():
+                postings.setdefault(term, []).append((i, tf))
+        self._postings = postings
+        self._avgdl = (sum(self._doc_len) / len(self._doc_len)) if self._doc_len else 0.0
+
+    # ---------- Reading ----------
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def load(self) -> "BM25Index":
+        if not self.exists():
+            raise FileNotFoundError(f"BM25 index not found at {self.path}")
+        data = json.loads(self.path.read_text(encoding="utf-8"))
+        self.ids, self.texts, self.metadatas = data["ids"], data["texts"], data["metadatas"]
+        self._build_postings()
+        return self
+
+    def count(self) -> int:
+        return len(self.ids)
+
+    def search(self, query: str, k: int) -> List[Tuple[Document, float]]:
+        """Top-k chunks by BM25 score (only chunks sharing at least one term)."""
+        n = self.count()
+        if n == 0:
+            return []
+
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            posting = self._postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+            for i, tf in posting:
+                norm = self.k1 * (1 - self.b + self.b * self._doc_len[i] / self._avgdl)
+                scores[i] = scores.get(i, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        top = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:k]
+        return [
+            (Document(page_content=self.texts[i], metadata=self.metadatas[i]), score)
+            for i, score in top
+        ]
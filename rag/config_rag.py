@@ -17,6 +17,11 @@ class RAGConfig:
     excel_dirname: str = "data/master_business_glossary"
 
     persist_dirname: str = "vector_dbs/chroma_db"
+    numpy_index_dirname: str = "vector_dbs/numpy_index"
+    index_manifest_filename: str = "index_manifest.json"  # written by DBIndexer next to the index
+    # Kept outside persist_dirname so they survive wiped rebuilds
+    embedding_cache_filename: str = "vector_dbs/embedding_cache.sqlite"
+    retrieval_cache_filename: str = "vector_dbs/retrieval_cache.sqlite"
 
     # Model and chunking parameters
     collection_name: str = "business_glossary"
@@ -24,6 +29,29 @@ class RAGConfig:
     chunk_size: int = 300
     chunk_overlap: int = 50
     chunk_retrieve_default: int = 1
+
+    # Vector index backend: "chroma" or "numpy" (in-process, memory-mapped matrix)
+    vector_backend: str = "chroma"
+    numpy_index_dtype: str = "float32"  # "float32" | "float16" | "int8" (quantized)
+
+    # Retrieval mode: "vector" or "hybrid" (BM25 + vector, fused with reciprocal rank fusion)
+    retrieval_mode: str = "vector"
+    bm25_filename: str = "bm25_index.json"  # stored next to the vector index
+    hybrid_candidates: int = 5              # candidates taken from each ranking before fusion
+    hybrid_rrf_k: int = 60                  # reciprocal rank fusion constant
+    lexical_skip_vector: bool = True        # skip the vector lookup if the top BM25 hit contains the exact column name
+
+    # Context packing: max tokens of the RAG context sent to the Agents (0 = unlimited)
+    context_token_budget: int = 6000
+
+    # Retrieval performance
+    embed_batch_size: int = 256       # queries embedded per embedding request
+    retrieve_max_workers: int = 8     # parallel vector searches (1 = sequential)
+    use_embedding_cache: bool = True  # read embeddings through the persistent cache
+    embedding_cache_max_entries: int = 200_000
+    use_retrieval_cache: bool = True  # reuse retrieval results of identical column queries across tables
+    retrieval_cache_ttl_s: int = 7 * 24 * 3600
+    retrieval_cache_max_entries: int = 50_000
     separators: tuple = ("\n\n", "\n", " ", "")
 
     @property
@@ -40,6 +68,36 @@ class RAGConfig:
         """Directory where Chroma DB will be persisted"""
         return self.project_root / self.persist_dirname
 
+    @property
+    def numpy_index_dir(self) -> Path:
+        """Directory of the NumPy vector index (vector_backend="numpy")"""
+        return self.project_root / self.numpy_index_dirname
+
+    @property
+    def index_dir(self) -> Path:
+        """Directory of the index of the configured backend"""
+        return self.numpy_index_dir if self.vector_backend == "numpy" else self.persist_dir
+
+    @property
+    def bm25_index_path(self) -> Path:
+        """BM25 (lexical) index built next to the vector index"""
+        return self.index_dir / self.bm25_filename
+
+    @property
+    def index_manifest_path(self) -> Path:
+        """Manifest of the indexed files (incl. the index version)"""
+        return self.index_dir / self.index_manifest_filename
+
+    @property
+    def retrieval_cache_path(self) -> Path:
+        """SQLite file of the persistent retrieval result cache"""
+        return self.project_root / self.retrieval_cache_filename
+
+    @property
+    def embedding_cache_path(self) -> Path:
+        """SQLite file of the persistent embedding cache"""
+        return self.project_root / self.embedding_cache_filename
+
     def __post_init__(self):
         """Ensure project_root is a Path object"""
         if not isinstance(self.project_root, Path):
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
-from typing import List
+from typing import Callable, Dict, List, Tuple, Union
+import hashlib
+import json
+import uuid
 import shutil
 from pathlib import Path
 import pandas as pd
@@ -8,10 +11,13 @@ import pandas as pd
 from langchain_core.documents import Document
 from langchain_community.document_loaders import Docx2txtLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_openai import OpenAIEmbeddings
 from langchain_community.vectorstores import Chroma
 
 from rag.config_rag import RAGConfig
+from rag.embedding_cache import build_embeddings
+from rag.numpy_index import NumpyVectorIndex
+from rag.bm25_index import BM25Index
+from rag.retriever_registry import retriever_registry
 from datetime import datetime
 timestamp = datetime.now().strftime("%Y%m%d_%H%M")
 
@@ -19,9 +25,15 @@ timestamp = datetime.now().strftime("%Y%m%d_%H%M")
 class DBIndexer:
     """
     Offline-only.
-    Builds (or rebuilds) a persisted Chroma vector DB from docx files.
+    Builds (or rebuilds) a persisted vector DB (Chroma or the NumPy index, see
+    `RAGConfig.vector_backend`) from docx files.
+
+    `build` indexes the whole corpus, `update` only re-indexes new or changed files
+    and drops the chunks of removed files. Both keep a manifest of the indexed files
+    (hash, mtime, size, chunk IDs) next to the DB.
     """
 
+
     def __init__(self, cfg: RAGConfig):
         self.cfg = cfg
 
@@ -45,9 +57,8 @@ class DBIndexer:
             )
         ]
 
-    def load_documents(self) -> List[Document]:
-        docs: List[Document] = []
-
+    def source_files(self) -> List[Tuple[Path, Callable[[Path], List[Document]]]]:
+        """All supported source files with their loader function"""
         sources = {
             self.cfg.docs_dir: {".docx": self._load_docx},
             self.cfg.excel_dir: {".csv": self._load_csv},  # using same folder for csv
@@ -57,22 +68,26 @@ class DBIndexer:
             if not folder.exists():
                 raise FileNotFoundError(f"Source directory not found: {folder}")
 
-        file_count = 0
+        files = []
         for folder, handlers in sources.items():
             for ext, loader_fn in handlers.items():
-                files = list(folder.rglob(f"*{ext}"))
-                file_count += len(files)
-                print(f"Found {len(files)} {ext} file(s) in {folder}")
-                for path in files:
-                    docs.extend(loader_fn(path))
+                found = sorted(folder.rglob(f"*{ext}"))
+                print(f"Found {len(found)} {ext} file(s) in {folder}")
+                files.extend((path, loader_fn) for path in found)
 
-        if file_count == 0:
+        if not files:
             raise ValueError(
                 f"No supported files found in:\n"
                 f"- {self.cfg.docs_dir}\n"
                 f"- {self.cfg.excel_dir}"
             )
 
+        return files
+
+    def load_documents(self) -> List[Document]:
+        docs: List[Document] = []
+        for path, loader_fn in self.source_files():
+            docs.extend(loader_fn(path))
         return docs
 
     def split_documents(self, docs: List[Document]) -> List[Document]:
@@ -84,7 +99,126 @@ class DBIndexer:
         )
         return splitter.split_documents(docs)
 
-    def build(self, wipe: bool = False) -> Chroma:
+    @staticmethod
+    def _chunk_ids(chunks: List[Document]) -> List[str]:
+        """Stable chunk IDs: same source, position and text give the same ID"""
+        return [
+            hashlib.sha256(
+                f"{c.metadata.get('source', '')}\x00{i}\x00{c.page_content}".encode("utf-8")
+            ).hexdigest()
+            for i, c in enumerate(chunks)
+        ]
+
+    @staticmethod
+    def _file_hash(path: Path) -> str:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        return h.hexdigest()
+
+    def _file_entry(self, path: Path, chunk_ids: List[str], file_hash: str = None) -> Dict:
+        stat = path.stat()
+        return {
+            "sha256": file_hash or self._file_hash(path),
+            "mtime": stat.st_mtime,
+            "size": stat.st_size,
+            "chunk_ids": chunk_ids,
+        }
+
+    def _load_and_split_file(self, path: Path, loader_fn) -> Tuple[List[Document], List[str]]:
+        chunks = self.split_documents(loader_fn(path))
+        return chunks, self._chunk_ids(chunks)
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.cfg.index_manifest_path
+
+    def load_manifest(self) -> Dict:
+        if not self.manifest_path.exists():
+            return {"files": {}}
+        return json.loads(self.manifest_path.read_text(encoding="utf-8"))
+
+    def save_manifest(self, manifest: Dict, bump_version: bool = True) -> None:
+        """
+        Persist the manifest. A new `index_version` is issued whenever the indexed
+        content changed, which invalidates the retrieval cache.
+        """
+        self.cfg.index_dir.mkdir(parents=True, exist_ok=True)
+        if bump_version or "index_version" not in manifest:
+            manifest["index_version"] = uuid.uuid4().hex
+        manifest["updated_at"] = datetime.now().isoformat()
+        self.manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+    def _open_vector_db(self) -> Chroma:
+        return Chroma(
+            persist_directory=str(self.cfg.persist_dir),
+            collection_name=self.cfg.collection_name,
+            embedding_function=build_embeddings(self.cfg),
+        )
+
+    def _write_numpy_index(
+        self,
+        chunks: List[Document],
+        ids: List[str],
+        keep: NumpyVectorIndex = None,
+        drop_ids: List[str] = (),
+    ) -> NumpyVectorIndex:
+        """
+        (Re)write the NumPy index with `chunks`, plus the rows of `keep` whose IDs are
+        neither replaced nor in `drop_ids`. Embeddings come through the embedding cache.
+        """
+        embedding = build_embeddings(self.cfg)
+        new_vectors = embedding.embed_documents([c.page_content for c in chunks]) if chunks else []
+
+        all_ids, texts, metadatas, vectors = [], [], [], []
+        if keep is not None and keep.count():
+            replaced = set(ids) | set(drop_ids)
+            old_ids, old_texts, old_metas, old_vectors = keep.records()
+            for i, chunk_id in enumerate(old_ids):
+                if chunk_id not in replaced:
+                    all_ids.append(chunk_id)
+                    texts.append(old_texts[i])
+                    metadatas.append(old_metas[i])
+                    vectors.append(old_vectors[i].tolist())
+
+        all_ids.extend(ids)
+        texts.extend(c.page_content for c in chunks)
+        metadatas.extend(c.metadata for c in chunks)
+        vectors.extend(new_vectors)
+
+        return NumpyVectorIndex.write(
+            self.cfg.numpy_index_dir,
+            ids=all_ids,
+            texts=texts,
+            metadatas=metadatas,
+            vectors=vectors,
+            dtype=self.cfg.numpy_index_dtype,
+            embedding_model=self.cfg.embedding_model,
+        )
+
+    def _write_bm25_index(self, chunks: List[Document], ids: List[str], drop_ids: List[str] = (), incremental: bool = False) -> BM25Index:
+        """
+        (Re)write the BM25 index next to the vector index. With `incremental`, rows of the
+        existing index are kept unless replaced by `ids` or listed in `drop_ids`.
+        """
+        all_ids, texts, metadatas = [], [], []
+        existing = BM25Index(self.cfg.bm25_index_path)
+        if incremental and existing.exists():
+            existing.load()
+            replaced = set(ids) | set(drop_ids)
+            for chunk_id, text, meta in zip(existing.ids, existing.texts, existing.metadatas):
+                if chunk_id not in replaced:
+                    all_ids.append(chunk_id)
+                    texts.append(text)
+                    metadatas.append(meta)
+
+        all_ids.extend(ids)
+        texts.extend(c.page_content for c in chunks)
+        metadatas.extend(c.metadata for c in chunks)
+        return BM25Index.write(self.cfg.bm25_index_path, ids=all_ids, texts=texts, metadatas=metadatas)
+
+    def build(self, wipe: bool = False) -> Union[Chroma, NumpyVectorIndex]:
         """
         Build the vector database.
 
@@ -92,34 +226,47 @@ class DBIndexer:
             wipe: If True, delete existing database before building
 
         Returns:
-            The created Chroma vector database
+            The created vector database
         """
         # Wipe existing database if requested
-        if wipe and self.cfg.persist_dir.exists():
-            print(f"Wiping existing database at {self.cfg.persist_dir}")
-            shutil.rmtree(self.cfg.persist_dir, ignore_errors=True)
+        if wipe and self.cfg.index_dir.exists():
+            print(f"Wiping existing database at {self.cfg.index_dir}")
+            shutil.rmtree(self.cfg.index_dir, ignore_errors=True)
 
-        # Load and split documents
-        print("Loading documents...")
-        docs = self.load_documents()
+        # Load and split documents (per file, so chunk IDs can be tracked in the manifest)
+        print("Loading and splitting documents...")
+        chunks: List[Document] = []
+        ids: List[str] = []
+        manifest = {"files": {}}
         by_type = {}
-        for d in docs:
-            t = d.metadata.get("file_type", "unknown")
+        for path, loader_fn in self.source_files():
+            file_chunks, file_ids = self._load_and_split_file(path, loader_fn)
+            chunks.extend(file_chunks)
+            ids.extend(file_ids)
+            manifest["files"][str(path)] = self._file_entry(path, file_ids)
+            t = path.suffix.lstrip(".")
             by_type[t] = by_type.get(t, 0) + 1
-        print(f"Loaded {len(docs)} document(s): {by_type}")
-
-        print("Splitting into chunks...")
-        chunks = self.split_documents(docs)
+        print(f"Loaded {sum(by_type.values())} file(s): {by_type}")
         print(f"Created {len(chunks)} chunk(s)")
 
         # Create embeddings
         print(f"Creating embeddings using {self.cfg.embedding_model}...")
-        embedding = OpenAIEmbeddings(model=self.cfg.embedding_model)
+        if self.cfg.vector_backend == "numpy":
+            print(f"Building NumPy index ({self.cfg.numpy_index_dtype}) at {self.cfg.numpy_index_dir}...")
+            index = self._write_numpy_index(chunks, ids)
+            print(f"✓ Successfully built index with {index.count()} chunks")
+            self._write_bm25_index(chunks, ids)
+            self.save_manifest(manifest)
+            retriever_registry.invalidate(self.cfg)
+            return index
+
+        embedding = build_embeddings(self.cfg)  # unchanged chunks are read from the embedding cache
 
         # Build vector database
         print(f"Building Chroma database at {self.cfg.persist_dir}...")
         vector_db = Chroma.from_documents(
             documents=chunks,
+            ids=ids,  # stable IDs: rebuilding without wipe upserts instead of duplicating
             embedding=embedding,
             persist_directory=str(self.cfg.persist_dir),
             collection_name=self.cfg.collection_name,
@@ -134,4 +281,93 @@ class DBIndexer:
             )
 
         print(f"✓ Successfully built database with {count} chunks")
-        return vector_db
\ No newline at end of file
+        self._write_bm25_index(chunks, ids)
+        self.save_manifest(manifest)
+
+        # Warm retrievers of this process still point to the old collection
+        retriever_registry.invalidate(self.cfg)
+        return vector_db
+
+    def update(self) -> Union[Chroma, NumpyVectorIndex]:
+        """
+        Incrementally update the vector database.
+
+        Only new or changed files (by size/mtime, confirmed by hash) are loaded,
+        split and embedded; their previous chunks are replaced. Chunks of files which
+        no longer exist are deleted. Without a manifest, a full build is performed.
+
+        Returns:
+            The updated vector database
+        """
+        manifest = self.load_manifest()
+        if not self.cfg.index_dir.exists() or not manifest["files"]:
+            print("No index manifest found - performing a full build")
+            return self.build()
+
+        indexed = manifest["files"]
+        current = self.source_files()
+        current_paths = {str(path) for path, _ in current}
+
+        delete_ids: List[str] = []
+        new_chunks: List[Document] = []
+        new_ids: List[str] = []
+
+        added, changed, unchanged = 0, 0, 0
+        for path, loader_fn in current:
+            key = str(path)
+            entry = indexed.get(key)
+            stat = path.stat()
+
+            if entry and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+                unchanged += 1
+                continue
+
+            file_hash = self._file_hash(path)
+            if entry and entry["sha256"] == file_hash:
+                # Touched but identical - only refresh the metadata
+                indexed[key] = self._file_entry(path, entry["chunk_ids"], file_hash)
+                unchanged += 1
+                continue
+
+            chunks, ids = self._load_and_split_file(path, loader_fn)
+            if entry:
+                delete_ids.extend(set(entry["chunk_ids"]) - set(ids))
+            new_chunks.extend(chunks)
+            new_ids.extend(ids)
+            indexed[key] = self._file_entry(path, ids, file_hash)
+
+            if entry:
+                changed += 1
+            else:
+                added += 1
+
+        removed = [key for key in indexed if key not in current_paths]
+        for key in removed:
+            delete_ids.extend(indexed.pop(key)["chunk_ids"])
+
+        # Apply the changes to the configured backend
+        if self.cfg.vector_backend == "numpy":
+            vector_db = NumpyVectorIndex(self.cfg.numpy_index_dir).load()
+            if delete_ids or new_chunks:
+                vector_db = self._write_numpy_index(new_chunks, new_ids, keep=vector_db, drop_ids=delete_ids)
+            count = vector_db.count()
+        else:
+            vector_db = self._open_vector_db()
+            if delete_ids:
+                vector_db.delete(ids=delete_ids)
+            if new_chunks:
+                vector_db.add_documents(new_chunks, ids=new_ids)  # upsert by stable chunk ID
+            count = vector_db._collection.count()
+
+        if delete_ids or new_chunks:
+            self._write_bm25_index(new_chunks, new_ids, drop_ids=delete_ids, incremental=True)
+        self.save_manifest(manifest, bump_version=bool(added or changed or removed))
+        print(
+            f"✓ Incremental update: {added} added, {changed} changed, {len(removed)} removed, "
+            f"{unchanged} unchanged file(s) | {count} chunks in DB"
+        )
+
+        # Warm retrievers of this process still point to the old collection
+        if added or changed or removed:
+            retriever_registry.invalidate(self.cfg)
+        return vector_db
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, List
+
+from langchain_core.embeddings import Embeddings
+from langchain_openai import OpenAIEmbeddings
+
+from rag.config_rag import RAGConfig
+from utils.api_scheduler import get_scheduler
+from utils.token_counter import estimate_tokens
+
+
+class EmbeddingCache:
+    """
+    Persistent, content-addressed embedding store (SQLite).
+
+    Vectors are keyed by (embedding model, sha256 of the text) and stored as float32
+    blobs. When the cache grows over `max_entries`, the least recently used entries
+    are evicted.
+    """
+
+    def __init__(self, path: Path, max_entries: int = 200_000):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model     TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector    BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)")
+        self._conn.commit()
+
+    @staticmethod
+    def text_hash(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get_many(self, model: str, hashes: List[str]) -> Dict[str, List[float]]:
+        """Return the cached vectors for the given text hashes (missing hashes are skipped)."""
+        found: Dict[str, List[float]] = {}
+        if not hashes:
+            return found
+
+        unique = list(dict.fromkeys(hashes))
+        with self._lock:
+            # SQLite limits the number of bound parameters, so look up in slices
+            for start in range(0, len(unique), 500):
+                part = unique[start:start + 500]
+                marks = ",".join("?" * len(part))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({marks})",
+                    [model, *part],
+                ).fetchall()
+                for h, blob in rows:
+                    found[h] = array("f", blob).tolist()
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                    [(now, model, h) for h in found],
+                )
+                self._conn.commit()
+        return found
+
+    def put_many(self, model: str, items: Dict[str, List[float]]) -> None:
+        """Store vectors by text hash and evict the least recently used entries if needed."""
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, last_used) VALUES (?, ?, ?, ?)",
+                [(model, h, array("f", vec).tobytes(), now) for h, vec in items.items()],
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE rowid IN "
+                "(SELECT rowid FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+                (overflow,),
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper reading through an EmbeddingCache.
+    Only texts which are not cached yet are sent to the underlying model.
+    """
+
+    def __init__(self, inner: Embeddings, model: str, cache: EmbeddingCache):
+        self.inner = inner
+        self.model = model
+        self.cache = cache
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, texts: List[str]):
+        hashes = [EmbeddingCache.text_hash(t) for t in texts]
+        cached = self.cache.get_many(self.model, hashes)
+
+        # Embed each missing text only once, even if it is repeated in the input
+        missing: Dict[str, str] = {}
+        for h, t in zip(hashes, texts):
+            if h not in cached:
+                missing.setdefault(h, t)
+        return hashes, cached, missing
+
+    def _store(self, hashes, cached, missing, vectors) -> List[List[float]]:
+        if missing:
+            new_items = dict(zip(missing.keys(), vectors))
+            self.cache.put_many(self.model, new_items)
+            cached.update(new_items)
+
+        self.hits += len(hashes) - len(missing)
+        self.misses += len(missing)
+        return [cached[h] for h in hashes]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        hashes, cached, missing = self._lookup(texts)
+        vectors = self.inner.embed_documents(list(missing.values())) if missing else []
+        return self._store(hashes, cached, missing, vectors)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        hashes, cached, missing = self._lookup(texts)
+        vectors = await self.inner.aembed_documents(list(missing.values())) if missing else []
+        return self._store(hashes, cached, missing, vectors)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aembed_documents([text]))[0]
+
+
+class RateLimitedEmbeddings(Embeddings):
+    """Embeddings wrapper sending every request through the process-wide "embeddings" scheduler"""
+
+    def __init__(self, inner: Embeddings):
+        self.inner = inner
+        self.scheduler = get_scheduler("embeddings")
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        tokens = sum(estimate_tokens(t) for t in texts)
+        return self.scheduler.call(self.inner.embed_documents, texts, tokens=tokens)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        tokens = sum(estimate_tokens(t) for t in texts)
+        return await self.scheduler.acall(self.inner.aembed_documents, texts, tokens=tokens)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aembed_documents([text]))[0]
+
+
+_caches: Dict[Path, EmbeddingCache] = {}
+_caches_lock = threading.Lock()
+
+
+def build_embeddings(cfg: RAGConfig) -> Embeddings:
+    """
+    Embedding client for the configured model, reading through the persistent
+    embedding cache when `cfg.use_embedding_cache` is set. Requests which reach the
+    API are admitted by the process-wide rate limiter (it also owns the retries).
+    """
+    embedding = RateLimitedEmbeddings(OpenAIEmbeddings(model=cfg.embedding_model, max_retries=0))
+    if not cfg.use_embedding_cache:
+        return embedding
+
+    # One cache (SQLite connection) per file for the whole process
+    with _caches_lock:
+        cache = _caches.get(cfg.embedding_cache_path)
+        if cache is None:
+            cache = EmbeddingCache(cfg.embedding_cache_path, max_entries=cfg.embedding_cache_max_entries)
+            _caches[cfg.embedding_cache_path] = cache
+
+    return CachedEmbeddings(embedding, model=cfg.embedding_model, cache=cache)
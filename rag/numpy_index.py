@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import json
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+
+class NumpyVectorIndex:
+    """
+    In-process vector index: L2-normalized chunk embeddings in a memory-mapped .npy
+    matrix plus a JSON metadata sidecar (ids, texts, metadata).
+
+    Top-k is a vectorized dot product (= cosine similarity). Supported storage dtypes:
+        - float32: exact
+        - float16: half the memory
+        - int8:    a quarter of the memory, symmetric per-row quantization with a scale vector
+    """
+
+    vectors_filename = "vectors.npy"
+    scales_filename = "scales.npy"
+    meta_filename = "meta.json"
+    dtypes = ("float32", "float16", "int8")
+    # Rows converted to float32 at a time by `search` (bounds the memory of a query)
+    search_chunk_rows = 8192
+
+    def __init__(self, index_dir: Path):
+        self.index_dir = Path(index_dir)
+        self._vectors = None
+        self._scales = None
+        self._meta: Dict[str, Any] = {}
+
+    # ---------- Writing ----------
+    @classmethod
+    def write(
+        cls,
+        index_dir: Path,
+        ids: Sequence[str],
+        texts: Sequence[str],
+        metadatas: Sequence[Dict[str, Any]],
+        vectors: Any,
+        dtype: str = "float32",
+        embedding_model: str = "",
+    ) -> "NumpyVectorIndex":
+        """Write (overwrite) an index to `index_dir` and return it loaded."""
+        if dtype not in cls.dtypes:
+            raise ValueError(f"Unsupported dtype {dtype!r}, expected one of {cls.dtypes}")
+        if not (len(ids) == len(texts) == len(metadatas) == len(vectors)):
+            raise ValueError("ids, texts, metadatas and vectors must have the same length")
+
+        matrix = np.asarray(vectors, dtype=np.float32).reshape(len(ids), -1)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = matrix / np.where(norms == 0, 1.0, norms)
+
+        # Write to a temporary directory first so readers never see a half-written index
+        index_dir = Path(index_dir)
+        tmp_dir = index_dir.with_name(index_dir.name + ".tmp")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+
+        if dtype == "int8":
+            scales = np.abs(matrix).max(axis=1) / 127.0
+            scales = np.where(scales == 0, 1.0, scales).astype(np.float32)
+            stored = np.round(matrix / scales[:, None]).astype(np.int8)
+            np.save(tmp_dir / cls.scales_filename, scales)
+        else:
+            stored = matrix.astype(dtype)
+        np.save(tmp_dir / cls.vectors_filename, stored)
+
+        meta = {
+            "created_at": datetime.now().isoformat(),
+            "embedding_model": embedding_model,
+            "dtype": dtype,
+            "dim": int(matrix.shape[1]) if len(ids) else 0,
+            "ids": list(ids),
+            "texts": list(texts),
+            "metadatas": list(metadatas),
+        }
+        (tmp_dir / cls.meta_filename).write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+
+        shutil.rmtree(index_dir, ignore_errors=True)
+        tmp_dir.rename(index_dir)
+        return cls(index_dir).load()
+
+    # ---------- Reading ----------
+    def exists(self) -> bool:
+        return (self.index_dir / self.meta_filename).exists()
+
+    def load(self) -> "NumpyVectorIndex":
+        """Memory-map the vectors and read the metadata sidecar"""
+        if not self.exists():
+            raise FileNotFoundError(f"NumPy vector index not found at {self.index_dir}")
+
+        self._meta = json.loads((self.index_dir / self.meta_filename).read_text(encoding="utf-8"))
+        self._vectors = np.load(self.index_dir / self.vectors_filename, mmap_mode="r")
+        scales_path = self.index_dir / self.scales_filename
+        self._scales = np.load(scales_path, mmap_mode="r") if scales_path.exists() else None
+        return self
+
+    def count(self) -> int:
+        return len(self._meta.get("ids", []))
+
+    @property
+    def ids(self) -> List[str]:
+        return self._meta.get("ids", [])
+
+    def get(self, positions: Sequence[int]) -> List[Document]:
+        texts, metadatas = self._meta["texts"], self._meta["metadatas"]
+        return [Document(page_content=texts[i], metadata=metadatas[i]) for i in positions]
+
+    def records(self) -> Tuple[List[str], List[str], List[Dict[str, Any]], np.ndarray]:
+        """All stored (ids, texts, metadatas, float32 vectors), e.g. for rewriting the index"""
+        vectors = np.asarray(self._vectors, dtype=np.float32)
+        if self._scales is not None:
+            vectors = vectors * np.asarray(self._scales)[:, None]
+        return list(self.ids), list(self._meta["texts"]), list(self._meta["metadatas"]), vectors
+
+    def search(self, query_vectors: Any, k: int) -> List[List[Tuple[Document, float]]]:
+        """
+        Top-k chunks for each query vector.
+
+        Returns:
+            For every query (same order), a list of (chunk, cosine similarity) pairs
+        """
+        n = self.count()
+        if n == 0:
+            return [[] for _ in query_vectors]
+        k = min(k, n)
+
+        queries = np.asarray(query_vectors, dtype=np.float32)
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries = queries / np.where(norms == 0, 1.0, norms)
+
+        # The matrix is scanned in blocks of rows: only one block is converted to float32
+        # at a time, and a running top-k per query is kept across blocks
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        best_ids = np.empty((len(queries), 0), dtype=np.int64)
+        for start in range(0, n, self.search_chunk_rows):
+            stop = min(n, start + self.search_chunk_rows)
+            scores = queries @ np.asarray(self._vectors[start:stop], dtype=np.float32).T
+            if self._scales is not None:
+                scores *= np.asarray(self._scales[start:stop])[None, :]
+
+            # Unordered top-k of the block in O(rows), merged with the top-k so far
+            block_k = min(k, stop - start)
+            top = np.argpartition(-scores, block_k - 1, axis=1)[:, :block_k]
+            best_scores = np.concatenate([best_scores, np.take_along_axis(scores, top, axis=1)], axis=1)
+            best_ids = np.concatenate([best_ids, top + start], axis=1)
+            if best_scores.shape[1] > k:
+                keep = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                best_scores = np.take_along_axis(best_scores, keep, axis=1)
+                best_ids = np.take_along_axis(best_ids, keep, axis=1)
+
+        # Sort only the final k
+        results = []
+        for row_scores, row_ids in zip(best_scores, best_ids):
+            order = np.argsort(-row_scores, kind="stable")
+            results.append(list(zip(self.get(row_ids[order]), row_scores[order].tolist())))
+        return results
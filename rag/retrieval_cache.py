@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from rag.config_rag import RAGConfig
+
+
+def read_index_version(cfg: RAGConfig) -> str:
+    """
+    Version of the index the retrieval results depend on: the `index_version` issued by
+    DBIndexer plus the retrieval settings which change the results.
+    """
+    version = "unversioned"
+    if cfg.index_manifest_path.exists():
+        manifest = json.loads(cfg.index_manifest_path.read_text(encoding="utf-8"))
+        version = manifest.get("index_version", version)
+    return f"{version}|{cfg.vector_backend}|{cfg.retrieval_mode}|{cfg.embedding_model}"
+
+
+def normalize_column_name(column_name: str) -> str:
+    """`Client Name`, `client-name` and `CLIENT_NAME` all become `client_name`"""
+    return re.sub(r"[^a-z0-9]+", "_", str(column_name).lower()).strip("_")
+
+
+def sample_signature(sample_values: Any, max_values: int = 5) -> str:
+    """
+    Shape signature of the sample values (digits -> 9, letters -> a), so the same
+    physical column in different tables (`AC100000` / `AC200417`) shares a signature.
+    """
+    if sample_values is None or sample_values == "":
+        return ""
+    values = sample_values if isinstance(sample_values, list) else str(sample_values).split(", ")
+    shapes = set()
+    for v in values[:max_values]:
+        shape = re.sub(r"[0-9]", "9", str(v).strip().lower())
+        shapes.add(re.sub(r"[a-z]", "a", shape))
+    return "|".join(sorted(shapes))
+
+
+def hint_signature(hint: str) -> str:
+    """
+    Stable parts of a column profile hint (type, top shape): `integer, shape \\d{6}, ~1.2k distinct`
+    becomes `integer, shape \\d{6}`, as the distinct count differs between tables.
+    """
+    return ", ".join(part for part in str(hint or "").split(", ") if part and not part.endswith(" distinct"))
+
+
+class RetrievalCache:
+    """
+    Persistent cache of retrieval results (SQLite), keyed by
+    (index version, normalized column name, sample signature, k, profile hint signature).
+
+    Entries expire after `ttl_s`; above `max_entries` the least recently used are evicted.
+    Entries of older versions of the same index (same backend, retrieval mode and embedding
+    model, see read_index_version) are purged as soon as a new version is seen, so a rebuild
+    or incremental update of the index invalidates the cache automatically. Configurations
+    sharing the cache file keep each other's entries.
+    """
+
+    def __init__(self, path: Path, ttl_s: int = 7 * 24 * 3600, max_entries: int = 50_000):
+        self.path = Path(path)
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._current_version: Optional[str] = None
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS retrievals (
+                cache_key     TEXT PRIMARY KEY,
+                index_version TEXT NOT NULL,
+                query         TEXT NOT NULL,
+                hits          TEXT NOT NULL,
+                created_at    REAL NOT NULL,
+                last_used     REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_retrievals_last_used ON retrievals (last_used)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(index_version: str, column_name: str, sample_values: Any, k: int, hint: str = "") -> str:
+        raw = f"{index_version}\x00{normalize_column_name(column_name)}\x00{sample_signature(sample_values)}\x00{k}"
+        hint = hint_signature(hint)
+        if hint:  # column profile of the query (keys without one are unchanged)
+            raw += f"\x00{hint}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _purge_other_versions(self, index_version: str) -> None:
+        if self._current_version == index_version:
+            return
+        # `version|backend|mode|model`: only older versions of the same scope are dropped
+        scope = index_version.partition("|")[2]
+        deleted = self._conn.execute(
+            "DELETE FROM retrievals WHERE index_version != ? "
+            "AND substr(index_version, instr(index_version, '|') + 1) = ? AND created_at < ?",
+            (index_version, scope, time.time()),
+        ).rowcount
+        self._conn.commit()
+        if deleted:
+            print(f"Retrieval cache: dropped {deleted} entrie(s) of previous index versions")
+        self._current_version = index_version
+
+    def get_many(self, index_version: str, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Cached {"query", "hits"} per key (expired / missing keys are skipped)."""
+        found: Dict[str, Dict[str, Any]] = {}
+        if not keys:
+            return found
+        now = time.time()
+        with self._lock:
+            self._purge_other_versions(index_version)
+            for start in range(0, len(keys), 500):
+                part = keys[start:start + 500]
+                marks = ",".join("?" * len(part))
+                rows = self._conn.execute(
+                    f"SELECT cache_key, query, hits, created_at FROM retrievals WHERE cache_key IN ({marks})",
+                    part,
+                ).fetchall()
+                for key, query, hits, created_at in rows:
+                    if now - created_at <= self.ttl_s:
+                        found[key] = {"query": query, "hits": json.loads(hits)}
+            if found:
+                self._conn.executemany(
+                    "UPDATE retrievals SET last_used = ? WHERE cache_key = ?",
+                    [(now, key) for key in found],
+                )
+                self._conn.commit()
+        return found
+
+    def put_many(self, index_version: str, items: Dict[str, Dict[str, Any]]) -> None:
+        """Store {"query", "hits"} per key and evict expired / least recently used entries."""
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            self._purge_other_versions(index_version)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO retrievals (cache_key, index_version, query, hits, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (key, index_version, item["query"], json.dumps(item["hits"], ensure_ascii=False, default=str), now, now)
+                    for key, item in items.items()
+                ],
+            )
+            self._conn.execute("DELETE FROM retrievals WHERE created_at < ?", (now - self.ttl_s,))
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM retrievals").fetchone()
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM retrievals WHERE cache_key IN "
+                    "(SELECT cache_key FROM retrievals ORDER BY last_used ASC LIMIT ?)",
+                    (overflow,),
+                )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM retrievals")
+            self._conn.commit()
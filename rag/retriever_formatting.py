@@ -5,6 +5,9 @@ from typing import Any, Dict, List
 
 from rag.config_rag import RAGConfig
 from rag.vector_retriever import VectorRetriever
+from rag.bm25_index import BM25Index, tokenize
+from rag.retrieval_cache import RetrievalCache, read_index_version
+from utils.token_counter import estimate_tokens
 
 import pandas as pd
 import json
@@ -14,14 +17,15 @@ import json
 class RetrievedResults:
     column_name: str
     query: str
-    hits: List[Dict[str, Any]]  # Each hit has: {"page_content": str, "metadata": dict}
+    hits: List[Dict[str, Any]]  # Each hit has: {"page_content": str, "metadata": dict, "score": float | None}
 
 
 class PrepareRetrieval:
     """
     Set of tools which given a dataframe, can:
         - sample values from each column,
-        - retrieve relevant info for each column from vector DB,
+        - retrieve relevant info for each column from vector DB
+          (optionally fused with a local BM25 index, `retrieval_mode="hybrid"`),
         - and format it into a text prompt.
     """
 
@@ -30,43 +34,208 @@ class PrepareRetrieval:
         self.retriever = VectorRetriever(cfg)
         self.retriever.load_vector_db()
 
+        self.lexical = None
+        if cfg.retrieval_mode == "hybrid":
+            self.lexical = BM25Index(cfg.bm25_index_path).load()
+            print(f"✅ Loaded BM25 index with {self.lexical.count()} chunks")
 
-    ## 1st for each column call retriever (using retrieve_for_single_column)
-    def retrieve_for_all_columns(self, col_samples: Dict[str, List[str]]) -> Dict[str, RetrievedResults]:
-        results: Dict[str, RetrievedResults] = {}
+        self.cache = None
+        if cfg.use_retrieval_cache:
+            self.cache = RetrievalCache(
+                cfg.retrieval_cache_path,
+                ttl_s=cfg.retrieval_cache_ttl_s,
+                max_entries=cfg.retrieval_cache_max_entries,
+            )
+
+
+    ## 1st retrieve for all columns at once: queries are embedded in batches and searched in parallel
+    # `col_hints` (optional) describe each column in the queries, e.g. its profile "date, shape \d{4}-\d{2}-\d{2}"
+    def retrieve_for_all_columns(self, col_samples: Dict[str, List[str]], col_hints: Dict[str, str] = None) -> Dict[str, RetrievedResults]:
+        col_hints = col_hints or {}
+        if self.cache is None:
+            return self._retrieve_uncached(col_samples, col_hints)
+
+        results, misses, keys, version = self._lookup_cache(col_samples, col_hints)
+        if misses:
+            results.update(self._store_cache(version, keys, self._retrieve_uncached(misses, col_hints)))
+        return {col: results[col] for col in col_samples}
+
+    async def aretrieve_for_all_columns(self, col_samples: Dict[str, List[str]], col_hints: Dict[str, str] = None) -> Dict[str, RetrievedResults]:
+        """Async variant of `retrieve_for_all_columns` (embedding requests are awaited)"""
+        col_hints = col_hints or {}
+        if self.cache is None:
+            return await self._aretrieve_uncached(col_samples, col_hints)
+
+        results, misses, keys, version = self._lookup_cache(col_samples, col_hints)
+        if misses:
+            results.update(self._store_cache(version, keys, await self._aretrieve_uncached(misses, col_hints)))
+        return {col: results[col] for col in col_samples}
 
+    def _lookup_cache(self, col_samples: Dict[str, List[str]], col_hints: Dict[str, str]):
+        # Same (normalized) column + sample shape + profile type / shape + k on the same index version -> reuse the result
+        k = self.cfg.chunk_retrieve_default
+        version = read_index_version(self.cfg)
+        keys = {
+            col: RetrievalCache.make_key(version, col, samples, k, col_hints.get(col, ""))
+            for col, samples in col_samples.items()
+        }
+        cached = self.cache.get_many(version, list(keys.values()))
+
+        results: Dict[str, RetrievedResults] = {}
+        misses: Dict[str, Any] = {}
         for col, samples in col_samples.items():
-            results[col] = self.retrieve_for_single_column(column_name=col, sample_values=samples)
+            entry = cached.get(keys[col])
+            if entry is None:
+                misses[col] = samples
+            else:
+                results[col] = RetrievedResults(column_name=col, query=entry["query"], hits=entry["hits"])
+        print(f"Retrieval cache: {len(results)} hit(s), {len(misses)} miss(es)")
+        return results, misses, keys, version
 
-        print(f"\n✅ Retrieved all relevant contextual data chunks for {len(col_samples)} columns.")
+    def _store_cache(self, version: str, keys: Dict[str, str], fresh: Dict[str, RetrievedResults]) -> Dict[str, RetrievedResults]:
+        self.cache.put_many(version, {keys[col]: {"query": res.query, "hits": res.hits} for col, res in fresh.items()})
+        return fresh
+
+    def _retrieve_uncached(self, col_samples: Dict[str, List[str]], col_hints: Dict[str, str]) -> Dict[str, RetrievedResults]:
+        if self.lexical is not None:
+            return self.retrieve_hybrid(col_samples, col_hints)
+
+        columns = list(col_samples)
+        queries = [self.build_query(col, col_samples[col], col_hints.get(col, "")) for col in columns]
+        docs_per_query = self.retriever.retrieve_many(queries)
+        return self._vector_results(columns, queries, docs_per_query)
+
+    async def _aretrieve_uncached(self, col_samples: Dict[str, List[str]], col_hints: Dict[str, str]) -> Dict[str, RetrievedResults]:
+        if self.lexical is not None:
+            return await self.aretrieve_hybrid(col_samples, col_hints)
+
+        columns = list(col_samples)
+        queries = [self.build_query(col, col_samples[col], col_hints.get(col, "")) for col in columns]
+        docs_per_query = await self.retriever.aretrieve_many(queries)
+        return self._vector_results(columns, queries, docs_per_query)
+
+    def _vector_results(self, columns: List[str], queries: List[str], docs_per_query: List[Any]) -> Dict[str, RetrievedResults]:
+        results: Dict[str, RetrievedResults] = {
+            col: self._to_results(col, query, docs)
+            for col, query, docs in zip(columns, queries, docs_per_query)
+        }
+
+        print(f"\n✅ Retrieved all relevant contextual data chunks for {len(columns)} columns.")
         return results
 
     def retrieve_for_single_column(self, column_name: str, sample_values: Any, ) -> RetrievedResults:
-        if sample_values is None or sample_values == "":
-            examples = ""
-        else:
-            # If sample_values is already a string, use it directly
-            # Otherwise convert to string (for backward compatibility)
-            if isinstance(sample_values, list):
-                examples = ", ".join([str(v) for v in sample_values if v][:5])
+        if self.cache is not None or self.lexical is not None:
+            return self.retrieve_for_all_columns({column_name: sample_values})[column_name]
+
+        query = self.build_query(column_name, sample_values)
+        docs = self.retriever.retrieve(query=query)
+        return self._to_results(column_name, query, docs)
+
+    def retrieve_hybrid(self, col_samples: Dict[str, List[str]], col_hints: Dict[str, str] = None) -> Dict[str, RetrievedResults]:
+        """
+        BM25 + vector retrieval fused with reciprocal rank fusion.
+
+        Columns whose top lexical hit contains the exact column name (e.g. `street_nm`
+        in the master glossary) skip the vector lookup and its embedding call.
+        """
+        lexical_hits, vector_columns, queries, n_candidates = self._lexical_stage(col_samples, col_hints or {})
+        vector_hits = dict(zip(
+            vector_columns,
+            self.retriever.retrieve_many([queries[col] for col in vector_columns], k=n_candidates),
+        ))
+        return self._fuse(col_samples, lexical_hits, vector_hits, queries)
+
+    async def aretrieve_hybrid(self, col_samples: Dict[str, List[str]], col_hints: Dict[str, str] = None) -> Dict[str, RetrievedResults]:
+        """Async variant of `retrieve_hybrid` (the BM25 stage is in-process)"""
+        lexical_hits, vector_columns, queries, n_candidates = self._lexical_stage(col_samples, col_hints or {})
+        vector_hits = dict(zip(
+            vector_columns,
+            await self.retriever.aretrieve_many([queries[col] for col in vector_columns], k=n_candidates),
+        ))
+        return self._fuse(col_samples, lexical_hits, vector_hits, queries)
+
+    def _lexical_stage(self, col_samples: Dict[str, List[str]], col_hints: Dict[str, str]):
+        k = self.cfg.chunk_retrieve_default
+        n_candidates = max(k, self.cfg.hybrid_candidates)
+
+        lexical_hits = {
+            col: self.lexical.search(self.build_lexical_query(col, samples), k=n_candidates)
+            for col, samples in col_samples.items()
+        }
+
+        lexical_only = [
+            col for col, hits in lexical_hits.items()
+            if self.cfg.lexical_skip_vector and hits and col.lower() in tokenize(hits[0][0].page_content)
+        ]
+        vector_columns = [col for col in col_samples if col not in lexical_only]
+        print(f"Hybrid retrieval: {len(lexical_only)} column(s) answered lexically, "
+              f"{len(vector_columns)} column(s) with vector lookup")
+
+        queries = {col: self.build_query(col, col_samples[col], col_hints.get(col, "")) for col in col_samples}
+        return lexical_hits, vector_columns, queries, n_candidates
+
+    def _fuse(self, col_samples, lexical_hits, vector_hits, queries) -> Dict[str, RetrievedResults]:
+        k = self.cfg.chunk_retrieve_default
+        results: Dict[str, RetrievedResults] = {}
+        for col in col_samples:
+            if col not in vector_hits:
+                docs = lexical_hits[col][:k]
             else:
-                # Just use the first portion of the string if it's too long
-                examples = str(sample_values).split(", ")[:5]
-                examples = ", ".join(examples)
+                docs = self._rrf([vector_hits[col], lexical_hits[col]], k)
+            results[col] = self._to_results(col, queries[col], docs)
+
+        print(f"\n✅ Retrieved all relevant contextual data chunks for {len(col_samples)} columns.")
+        return results
 
-        query = (
+    def _rrf(self, rankings: List[List[Any]], k: int) -> List[Any]:
+        """Reciprocal rank fusion of (Document, score) rankings; returns (Document, fused score) pairs"""
+        fused: Dict[Any, float] = {}
+        docs: Dict[Any, Any] = {}
+        for ranking in rankings:
+            for rank, (doc, _) in enumerate(ranking, start=1):
+                key = (doc.metadata.get("source"), doc.page_content)
+                fused[key] = fused.get(key, 0.0) + 1.0 / (self.cfg.hybrid_rrf_k + rank)
+                docs.setdefault(key, doc)
+        top = sorted(fused.items(), key=lambda kv: kv[1], reverse=True)[:k]
+        return [(docs[key], score) for key, score in top]
+
+    @staticmethod
+    def _examples(sample_values: Any) -> str:
+        if sample_values is None or sample_values == "":
+            return ""
+        # If sample_values is already a string, use it directly
+        # Otherwise convert to string (for backward compatibility)
+        if isinstance(sample_values, list):
+            return ", ".join([str(v) for v in sample_values if v][:5])
+        # Just use the first portion of the string if it's too long
+        return ", ".join(str(sample_values).split(", ")[:5])
+
+    @classmethod
+    def build_lexical_query(cls, column_name: str, sample_values: Any) -> str:
+        """Query for the BM25 index: only the column name and the sample values"""
+        return f"{column_name} {cls._examples(sample_values)}"
+
+    @classmethod
+    def build_query(cls, column_name: str, sample_values: Any, hint: str = "") -> str:
+        examples = cls._examples(sample_values)
+
+        return (
             f'Find relevant information for the following variable: '
             f"Column Name: '{column_name}'. "
             f"Example Values: {examples}. "
+            + (f"Data Profile: {hint}. " if hint else "")
         )
 
-        docs = self.retriever.retrieve(query=query)
-
+    @staticmethod
+    def _to_results(column_name: str, query: str, docs: List[Any]) -> RetrievedResults:
+        """Docs can be plain Documents or (Document, score) pairs"""
         hits: List[Dict[str, Any]] = []
         for d in docs:
+            d, score = d if isinstance(d, tuple) else (d, None)
             hits.append({
                     "page_content": d.page_content,  # The text
                     "metadata": d.metadata,          # Dict with 'source', etc.
+                    "score": score,                  # Higher is better, scale depends on the backend (None if unknown)
              })
 
         return RetrievedResults(
@@ -77,27 +246,61 @@ class PrepareRetrieval:
 
     ## 2nd: build context prompt based on retrieved info
     @staticmethod
-    def build_prompt_and_format(results: Dict[str, RetrievedResults]) -> str:
-        payload = {"columns": []}
+    def build_prompt_and_format(results: Dict[str, RetrievedResults], token_budget: int = 0) -> str:
+        """
+        Pack the retrieved hits into a compact JSON context:
+            - every distinct chunk is stored once under an ID (`chunks`), sources once (`sources`),
+            - columns reference their chunks by ID (`columns`),
+            - with `token_budget` > 0, chunks are added best first (every column's top hit
+              before anyone's second hit) until the budget is used up.
+        Hits are packed by rank only: vector similarities, BM25 scores and RRF scores are
+        on different scales and are not compared across columns.
+        """
+        candidates = []
+        for res in results.values():
+            for rank, hit in enumerate(res.hits or []):
+                candidates.append((rank, res.column_name, hit))
+        candidates.sort(key=lambda c: c[0])
 
-        for col_key, res in results.items():
-            column_block = {
-                "column_name": res.column_name,
-                "hits": []
-            }
+        chunk_ids: Dict[Any, str] = {}
+        source_ids: Dict[str, str] = {}
+        payload = {
+            "sources": {},
+            "chunks": {},
+            "columns": {res.column_name: [] for res in results.values()},
+        }
+        used_tokens = estimate_tokens(json.dumps(payload, separators=(",", ":"), ensure_ascii=False))
+        dropped = 0
 
-            for idx, hit in enumerate(res.hits or [], start=1):
-                text = hit.get("page_content", "").replace("\n", " ").strip()
-                source = hit.get("metadata", {}).get("source", "unknown")
+        for _, column_name, hit in candidates:
+            text = hit.get("page_content", "").replace("\n", " ").strip()
+            source = hit.get("metadata", {}).get("source", "unknown")
+            key = (source, text)
 
-                column_block["hits"].append({
-                    "hit_id": f"{col_key}#{idx}",
-                    "text": text,
-                    "source": source
-                })
+            cost = 2  # reference of the chunk in the column list
+            new_source = source not in source_ids
+            if key not in chunk_ids:
+                cost += estimate_tokens(text) + 8
+                if new_source:
+                    cost += estimate_tokens(source) + 4
+            if token_budget and used_tokens + cost > token_budget:
+                dropped += 1
+                continue
 
-            payload["columns"].append(column_block)
+            if key not in chunk_ids:
+                if new_source:
+                    source_ids[source] = f"s{len(source_ids) + 1}"
+                    payload["sources"][source_ids[source]] = source
+                chunk_ids[key] = f"c{len(chunk_ids) + 1}"
+                payload["chunks"][chunk_ids[key]] = {"text": text, "source": source_ids[source]}
+            if chunk_ids[key] not in payload["columns"][column_name]:
+                payload["columns"][column_name].append(chunk_ids[key])
+            used_tokens += cost
 
-        print(f"Formatted context for {len(payload['columns'])} columns is ready for the Agent.")
+        print(
+            f"Formatted context for {len(payload['columns'])} columns is ready for the Agent: "
+            f"{len(payload['chunks'])} unique chunk(s) from {len(candidates)} hit(s), ~{used_tokens} tokens"
+            + (f", {dropped} hit(s) dropped by the token budget" if dropped else "")
+        )
 
-        return json.dumps(payload, indent=2, ensure_ascii=False)
+        return json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
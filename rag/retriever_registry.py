@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, Optional
+
+from rag.config_rag import RAGConfig
+from rag.retriever_formatting import PrepareRetrieval
+
+
+class RetrieverRegistry:
+    """
+    Process-level registry of warm retrievers, keyed by RAGConfig.
+
+    The persisted vector DB is loaded lazily on first use and then shared by every
+    graph run, batch worker and the review API of the same process.
+    Call `invalidate` after the index was rebuilt so the next access reloads it.
+    """
+
+    def __init__(self) -> None:
+        self._retrievers: Dict[RAGConfig, PrepareRetrieval] = {}
+        self._lock = threading.Lock()
+
+    def get(self, cfg: RAGConfig) -> PrepareRetrieval:
+        """Return the warm retriever for `cfg`, loading the vector DB on first access."""
+        prep = self._retrievers.get(cfg)
+        if prep is not None:
+            return prep
+
+        with self._lock:
+            # Another thread may have loaded it while we were waiting
+            prep = self._retrievers.get(cfg)
+            if prep is None:
+                prep = PrepareRetrieval(cfg)
+                self._retrievers[cfg] = prep
+        return prep
+
+    def is_loaded(self, cfg: RAGConfig) -> bool:
+        return cfg in self._retrievers
+
+    def health_check(self, cfg: RAGConfig, load: bool = False) -> Dict[str, Any]:
+        """
+        Report the state of the retriever for `cfg`.
+
+        Args:
+            cfg: RAG configuration
+            load: If True, load the vector DB when it is not loaded yet
+
+        Returns:
+            Dict with: loaded, ok, chunks, persist_dir (index directory of the backend), error
+        """
+        report: Dict[str, Any] = {
+            "loaded": self.is_loaded(cfg),
+            "ok": False,
+            "chunks": 0,
+            "persist_dir": str(cfg.index_dir),
+            "error": "",
+        }
+        try:
+            if not report["loaded"] and not load:
+                report["error"] = "Retriever not loaded yet"
+                return report
+            prep = self.get(cfg)
+            report["loaded"] = True
+            report["chunks"] = prep.retriever.count()
+            report["ok"] = report["chunks"] > 0
+            if not report["ok"]:
+                report["error"] = "Vector database is empty"
+        except Exception as e:
+            report["error"] = str(e)
+        return report
+
+    def invalidate(self, cfg: Optional[RAGConfig] = None) -> None:
+        """Drop the retriever for `cfg` (or all of them) so the next access reloads the index."""
+        with self._lock:
+            if cfg is None:
+                self._retrievers.clear()
+            else:
+                self._retrievers.pop(cfg, None)
+
+
+retriever_registry = RetrieverRegistry()
@@ -1,54 +1,73 @@
 from __future__ import annotations
 
-from typing import List, Optional
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple, Union
 
 from langchain_core.documents import Document
-from langchain_openai import OpenAIEmbeddings
+from langchain_core.embeddings import Embeddings
 from langchain_chroma import Chroma
 
 from rag.config_rag import RAGConfig
+from rag.embedding_cache import build_embeddings
+from rag.numpy_index import NumpyVectorIndex
 
 
 class VectorRetriever:
     """
-    Loads an existing persisted Chroma DB and retrieves relevant chunks.
+    Loads an existing persisted vector DB and retrieves relevant chunks.
+    The backend (Chroma or the in-process NumPy index) is selected by `RAGConfig.vector_backend`.
     """
 
     def __init__(self, cfg: RAGConfig):
         self.cfg = cfg
-        self._vector_db: Optional[Chroma] = None
+        self._vector_db: Optional[Union[Chroma, NumpyVectorIndex]] = None
+        self._embedding: Optional[Embeddings] = None
 
-    def load_vector_db(self) -> Chroma:
+    @property
+    def uses_numpy(self) -> bool:
+        return self.cfg.vector_backend == "numpy"
+
+    def load_vector_db(self) -> Union[Chroma, NumpyVectorIndex]:
         """Load the persisted vector database"""
         # Ensure persist directory exists
-        if not self.cfg.persist_dir.exists():
+        if not self.cfg.index_dir.exists():
             raise FileNotFoundError(
-                f"Vector database not found at {self.cfg.persist_dir}\n"
+                f"Vector database not found at {self.cfg.index_dir}\n"
                 f"Please run DBIndexer.build() first to create the database."
             )
 
         print("=== RAG ===")
-        print(f"Loading vector database from {self.cfg.persist_dir}...")
-        embedding = OpenAIEmbeddings(model=self.cfg.embedding_model)
-
-        self._vector_db = Chroma(
-            persist_directory=str(self.cfg.persist_dir),
-            collection_name=self.cfg.collection_name,
-            embedding_function=embedding,
-        )
+        print(f"Loading vector database from {self.cfg.index_dir}...")
+        self._embedding = build_embeddings(self.cfg)
+
+        if self.uses_numpy:
+            # A single mmap of the vector matrix + the metadata sidecar
+            self._vector_db = NumpyVectorIndex(self.cfg.numpy_index_dir).load()
+        else:
+            self._vector_db = Chroma(
+                persist_directory=str(self.cfg.persist_dir),
+                collection_name=self.cfg.collection_name,
+                embedding_function=self._embedding,
+            )
 
-        count = self._vector_db._collection.count()
-        print(f"✅ Loaded database with {count} chunks")
+        print(f"✅ Loaded database with {self.count()} chunks")
 
         return self._vector_db
 
     @property
-    def vector_db(self) -> Chroma:
+    def vector_db(self) -> Union[Chroma, NumpyVectorIndex]:
         """Lazy-load the vector database on first access"""
         if self._vector_db is None:
             self.load_vector_db()
         return self._vector_db
 
+    def count(self) -> int:
+        """Number of chunks in the loaded collection"""
+        if self.uses_numpy:
+            return self.vector_db.count()
+        return self.vector_db._collection.count()
+
     def retrieve(self, query: str, k: int = None) -> List[Document]:
         """
         Retrieve the k most similar chunks for a query.
@@ -66,7 +85,118 @@ class VectorRetriever:
             raise ValueError("k must be > 0")
 
         print(f"Retrieving {k} chunk(s) for query: '{query}'")
-        results = self.vector_db.similarity_search(query, k=k)
+        if self.uses_numpy:
+            results = [d for d, _ in self.vector_db.search([self._embedding.embed_query(query)], k=k)[0]]
+        else:
+            results = self.vector_db.similarity_search(query, k=k)
         print(f"✅ Retrieved {len(results)} chunk(s)")
 
-        return results
\ No newline at end of file
+        return results
+
+    def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """Embed all queries in batches of `embed_batch_size` (one request per batch)"""
+        _ = self.vector_db  # make sure the embedding client is initialized
+        batch_size = max(1, self.cfg.embed_batch_size)
+
+        vectors: List[List[float]] = []
+        for start in range(0, len(queries), batch_size):
+            vectors.extend(self._embedding.embed_documents(queries[start:start + batch_size]))
+        return vectors
+
+    def retrieve_many(self, queries: List[str], k: int = None) -> List[List[Tuple[Document, float]]]:
+        """
+        Retrieve the k most similar chunks for many queries at once.
+
+        Queries are embedded up front in batched requests, then the vector searches
+        run on the precomputed vectors (in parallel if `retrieve_max_workers` > 1).
+
+        Args:
+            queries: The search queries
+            k: Number of chunks to retrieve per query (uses config default if None)
+
+        Returns:
+            For every query (same order), a list of (chunk, relevance score) pairs, best
+            first; higher is better (cosine similarity for NumPy, Chroma distances are
+            converted by the collection's relevance function)
+        """
+        if k is None:
+            k = self.cfg.chunk_retrieve_default
+        if k <= 0:
+            raise ValueError("k must be > 0")
+        if not queries:
+            return []
+
+        print(f"Embedding {len(queries)} quer(ies) in batches of {self.cfg.embed_batch_size}...")
+        vectors = self.embed_queries(queries)
+
+        if self.uses_numpy:
+            # One matrix product for all queries
+            results = self.vector_db.search(vectors, k=k)
+            print(f"✅ Retrieved {k} chunk(s) for each of {len(queries)} quer(ies)")
+            return results
+
+        def search(vector: List[float]) -> List[Tuple[Document, float]]:
+            return self._chroma_search(vector, k)
+
+        workers = max(1, min(self.cfg.retrieve_max_workers, len(vectors)))
+        if workers == 1:
+            results = [search(v) for v in vectors]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(search, vectors))
+
+        print(f"✅ Retrieved {k} chunk(s) for each of {len(queries)} quer(ies)")
+        return results
+
+    def _chroma_search(self, vector: List[float], k: int) -> List[Tuple[Document, float]]:
+        """Chroma returns distances (lower is better): converted to relevance scores (higher is better)"""
+        relevance = self.vector_db._select_relevance_score_fn()
+        return [
+            (doc, relevance(distance))
+            for doc, distance in self.vector_db.similarity_search_by_vector_with_relevance_scores(vector, k=k)
+        ]
+
+    async def aembed_queries(self, queries: List[str]) -> List[List[float]]:
+        """Async variant of `embed_queries`: all batches are requested concurrently"""
+        _ = self.vector_db  # make sure the embedding client is initialized
+        batch_size = max(1, self.cfg.embed_batch_size)
+
+        batches = await asyncio.gather(*(
+            self._embedding.aembed_documents(queries[start:start + batch_size])
+            for start in range(0, len(queries), batch_size)
+        ))
+        return [vector for batch in batches for vector in batch]
+
+    async def aretrieve_many(self, queries: List[str], k: int = None) -> List[List[Tuple[Document, float]]]:
+        """
+        Async variant of `retrieve_many`.
+
+        The embedding requests are awaited on the event loop. The searches are local:
+        a single matrix product for the NumPy backend, and for Chroma at most
+        `retrieve_max_workers` searches at once, each in a worker thread.
+        """
+        if k is None:
+            k = self.cfg.chunk_retrieve_default
+        if k <= 0:
+            raise ValueError("k must be > 0")
+        if not queries:
+            return []
+
+        print(f"Embedding {len(queries)} quer(ies) in batches of {self.cfg.embed_batch_size}...")
+        vectors = await self.aembed_queries(queries)
+
+        if self.uses_numpy:
+            results = self.vector_db.search(vectors, k=k)
+            print(f"✅ Retrieved {k} chunk(s) for each of {len(queries)} quer(ies)")
+            return results
+
+        semaphore = asyncio.Semaphore(max(1, self.cfg.retrieve_max_workers))
+
+        async def search(vector: List[float]) -> List[Tuple[Document, float]]:
+            async with semaphore:
+                return await asyncio.to_thread(self._chroma_search, vector, k)
+
+        results = await asyncio.gather(*(search(v) for v in vectors))
+
+        print(f"✅ Retrieved {k} chunk(s) for each of {len(queries)} quer(ies)")
+        return list(results)
@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from configs.config_agent import ConfigAgents
+from configs.config_datasets import ConfigDatasets
+from configs.config_paths import ConfigPaths
+from rag.config_rag import RAGConfig
+from rag.retriever_formatting import PrepareRetrieval
+from src.graph import build_graph
+from src.checkpointing import (
+    checkpointer_available, open_checkpointer, aopen_checkpointer, thread_id_for, run_inputs, run_config,
+    invoke_resumable, ainvoke_resumable,
+)
+from src.state import TemplateOutput, build_initial_state
+from utils.data_loader import SOURCE_SUFFIXES, load_main_dataset, load_sql_table
+from utils.sql_sources import SQLConnector, SQLTable
+from utils.helpers import save_outputs
+
+
+@dataclass(frozen=True)
+class TableJob:
+    """A single table to be documented by the batch runner."""
+    bucket_name: str
+    dataset_name: str
+    table_name: str
+    path: Optional[Path] = None
+    sql_table: Optional[SQLTable] = None  # table of the BatchRunner's SQL source instead of a file
+
+    @property
+    def key(self) -> str:
+        return f"{self.bucket_name}.{self.dataset_name}.{self.table_name}"
+
+    def identity(self) -> Dict[str, str]:
+        return {
+            "bucket_name": self.bucket_name,
+            "dataset_name": self.dataset_name,
+            "table_name": self.table_name,
+        }
+
+
+@dataclass
+class TableRunResult:
+    """Outcome of one table in a batch run."""
+    job: TableJob
+    ok: bool
+    seconds: float
+    iterations: int = 0
+    files: Dict[str, Path] = field(default_factory=dict)
+    error: str = ""
+
+
+def jobs_from_manifest(manifest_path: Path, cfg_paths: ConfigPaths) -> List[TableJob]:
+    """
+    Read a manifest of tables to process.
+
+    The manifest is a CSV (same separator as the other inputs) with the columns
+    bucket_name, dataset_name, table_name and path. Relative paths are resolved
+    against the project root.
+    """
+    if not Path(manifest_path).exists():
+        raise FileNotFoundError(f"Batch manifest not found: {manifest_path}")
+
+    df = pd.read_csv(manifest_path, sep=cfg_paths.csv_separator, dtype=str)
+
+    expected = {"bucket_name", "dataset_name", "table_name", "path"}
+    missing = expected - set(df.columns)
+    if missing:
+        raise ValueError(f"Manifest {manifest_path} is missing columns: {', '.join(sorted(missing))}")
+
+    jobs = []
+    for rec in df.to_dict(orient="records"):
+        path = Path(rec["path"])
+        if not path.is_absolute():
+            path = cfg_paths.project_root / path
+        jobs.append(TableJob(rec["bucket_name"], rec["dataset_name"], rec["table_name"], path))
+    return jobs
+
+
+def jobs_from_directory(datasets_dir: Path, cfg_datasets: ConfigDatasets, pattern: str = None) -> List[TableJob]:
+    """
+    Treat every file matching `pattern` in `datasets_dir` as a table named after the file stem
+    (default: every CSV, Parquet and Feather / Arrow file). Bucket and dataset names are taken
+    from ConfigDatasets.
+    """
+    if not datasets_dir.exists():
+        raise FileNotFoundError(f"Datasets directory not found: {datasets_dir}")
+
+    paths = datasets_dir.glob(pattern) if pattern else (
+        path for path in datasets_dir.iterdir() if path.suffix.lower() in SOURCE_SUFFIXES
+    )
+    return [
+        TableJob(cfg_datasets.bucket_name_value, cfg_datasets.dataset_name_value, path.stem, path)
+        for path in sorted(paths)
+    ]
+
+
+def jobs_from_sql(connector: SQLConnector, cfg_datasets: ConfigDatasets, schema: str = None) -> List[TableJob]:
+    """
+    Treat every table and view of a SQL source (of `schema` only, if given) as a table to
+    document. Bucket and dataset names are taken from ConfigDatasets; tables outside the
+    default schema are named `schema.table`.
+    """
+    return [
+        TableJob(
+            cfg_datasets.bucket_name_value,
+            cfg_datasets.dataset_name_value,
+            table.name if table.schema == connector.default_schema else str(table),
+            sql_table=table,
+        )
+        for table in connector.list_tables(schema)
+    ]
+
+
+class BatchRunner:
+    """
+    Runs the glossary graph for many tables in a bounded worker pool.
+
+    The compiled graph and the master files are created once and shared by all tables;
+    the warm retriever comes from the process-level registry (loaded on first use).
+    Outputs of each table are written as soon as it finishes.
+
+    With `use_checkpointer`, every table runs in its own checkpoint thread of `run_id`:
+    re-running a batch with the same run id resumes failed tables; finished tables run again.
+    """
+
+    def __init__(
+        self,
+        cfg_paths: ConfigPaths,
+        cfg_datasets: ConfigDatasets,
+        cfg_agents: ConfigAgents,
+        bg_dict: Dict[str, List[Any]],
+        ds_dict: Dict[str, List[Any]],
+        prep: Optional[PrepareRetrieval] = None,
+        run_id: Optional[str] = None,
+        connector: Optional[SQLConnector] = None,
+    ):
+        self.cfg_paths = cfg_paths
+        self.cfg_datasets = cfg_datasets
+        self.cfg_agents = cfg_agents
+        self.bg_dict = bg_dict
+        self.ds_dict = ds_dict
+        self.prep = prep
+        self.run_id = run_id or cfg_agents.checkpoint_run_id
+        self.connector = connector
+        self.use_checkpointer = cfg_agents.use_checkpointer and checkpointer_available()
+        self.run_inputs = (
+            run_inputs(cfg_agents.llm_model, RAGConfig(project_root=cfg_paths.project_root))
+            if self.use_checkpointer else None
+        )
+        checkpointer = open_checkpointer(cfg_paths.checkpoint_db) if self.use_checkpointer else None
+        self.app = build_graph(project_root=cfg_paths.project_root, prep=self.prep, checkpointer=checkpointer)
+
+    def _initial_state(self, job: TableJob):
+        if job.sql_table is not None:
+            if self.connector is None:
+                raise ValueError(f"{job.key}: SQL table jobs need a BatchRunner connector")
+            sample_dict, profiles = load_sql_table(self.connector, job.sql_table, self.cfg_paths)
+        else:
+            sample_dict, profiles = load_main_dataset(job.path, self.cfg_paths)
+        return build_initial_state(
+            framework_def=self.cfg_datasets.get_framework_dict(),
+            source_original_table=sample_dict,
+            master_business_glossary=self.bg_dict,
+            master_data_owner=self.ds_dict,
+            table_identity=job.identity(),
+            column_profiles=profiles,
+        )
+
+    def _run_config(self, initial_state) -> Dict[str, Any]:
+        thread_id = None
+        if self.use_checkpointer:
+            thread_id = thread_id_for(
+                initial_state, self.run_id, self.cfg_datasets.default_table_identity(), self.run_inputs
+            )
+        return run_config(self.cfg_agents.recursion_limit, thread_id)
+
+    def _save(self, job: TableJob, final_output: Dict[str, Any], start: float) -> TableRunResult:
+        if not final_output or not final_output.get("result"):
+            raise RuntimeError("No results generated")
+
+        result_fetch: TemplateOutput = final_output["result"]
+        df_result = pd.DataFrame([c.model_dump() for c in result_fetch.rows])
+        files = save_outputs(
+            df_result=df_result,
+            context_text=final_output["RAG_company_context"],
+            table_summary_text=result_fetch.table_summary,
+            cfg_paths=self.cfg_paths,
+            filename_prefix=job.key,
+        )
+        return TableRunResult(
+            job=job,
+            ok=True,
+            seconds=time.perf_counter() - start,
+            iterations=final_output.get("iterations", 0),
+            files=files,
+        )
+
+    def run_table(self, job: TableJob) -> TableRunResult:
+        """Run the graph for one table and save its outputs."""
+        start = time.perf_counter()
+        try:
+            initial_state = self._initial_state(job)
+            final_output = invoke_resumable(self.app, initial_state, self._run_config(initial_state))
+            return self._save(job, final_output, start)
+        except Exception as e:
+            return TableRunResult(job=job, ok=False, seconds=time.perf_counter() - start, error=str(e))
+
+    async def arun_table(self, job: TableJob, app=None) -> TableRunResult:
+        """Async variant of `run_table` (file I/O runs in a worker thread)."""
+        start = time.perf_counter()
+        try:
+            initial_state = await asyncio.to_thread(self._initial_state, job)
+            final_output = await ainvoke_resumable(app or self.app, initial_state, self._run_config(initial_state))
+            return await asyncio.to_thread(self._save, job, final_output, start)
+        except Exception as e:
+            return TableRunResult(job=job, ok=False, seconds=time.perf_counter() - start, error=str(e))
+
+    @staticmethod
+    def _report(res: TableRunResult, done: int, total: int) -> None:
+        if res.ok:
+            print(f"✅ [{done}/{total}] {res.job.key} done in {res.seconds:.1f}s")
+        else:
+            print(f"❌ [{done}/{total}] {res.job.key} failed after {res.seconds:.1f}s: {res.error}")
+
+    def run(self, jobs: List[TableJob], max_workers: int = None) -> List[TableRunResult]:
+        """Process all jobs concurrently; results are returned in completion order."""
+        max_workers = max_workers or self.cfg_agents.batch_max_workers
+        results: List[TableRunResult] = []
+
+        print(f"⏳ Processing {len(jobs)} table(s) with {max_workers} worker(s)...")
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(self.run_table, job): job for job in jobs}
+            for future in as_completed(futures):
+                res = future.result()
+                results.append(res)
+                self._report(res, len(results), len(jobs))
+
+        return results
+
+    async def arun(self, jobs: List[TableJob], max_concurrency: int = None) -> List[TableRunResult]:
+        """
+        Process all jobs on one event loop, at most `max_concurrency` tables at a time;
+        results are returned in completion order.
+        """
+        if self.use_checkpointer:
+            # The SQLite checkpointer of `invoke` has no async API, ainvoke needs its own
+            async with aopen_checkpointer(self.cfg_paths.checkpoint_db) as saver:
+                app = build_graph(project_root=self.cfg_paths.project_root, prep=self.prep, checkpointer=saver)
+                return await self._arun(app, jobs, max_concurrency)
+        return await self._arun(self.app, jobs, max_concurrency)
+
+    async def _arun(self, app, jobs: List[TableJob], max_concurrency: int = None) -> List[TableRunResult]:
+        max_concurrency = max_concurrency or self.cfg_agents.batch_max_concurrency
+        semaphore = asyncio.Semaphore(max_concurrency)
+        results: List[TableRunResult] = []
+
+        async def run_one(job: TableJob) -> TableRunResult:
+            async with semaphore:
+                return await self.arun_table(job, app)
+
+        print(f"⏳ Processing {len(jobs)} table(s), up to {max_concurrency} at a time (async)...")
+        for future in asyncio.as_completed([run_one(job) for job in jobs]):
+            res = await future
+            results.append(res)
+            self._report(res, len(results), len(jobs))
+
+        return results
@@ -0,0 +1,163 @@
+import hashlib
+import json
+import sqlite3
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, Dict
+
+from rag.config_rag import RAGConfig
+from rag.retrieval_cache import read_index_version
+from src.state import AgentState
+
+try:
+    from langgraph.checkpoint.sqlite import SqliteSaver
+except ImportError:  # optional: pip install langgraph-checkpoint-sqlite
+    SqliteSaver = None
+
+
+_PROMPTS_PATH = Path(__file__).with_name("prompts.py")
+
+
+def checkpointer_available() -> bool:
+    """False (with a warning) when the optional SQLite checkpointer is not installed"""
+    if SqliteSaver is None:
+        print("⚠️ langgraph-checkpoint-sqlite is not installed - running without checkpoints "
+              "(pip install langgraph-checkpoint-sqlite)")
+        return False
+    return True
+
+
+def _require_sqlite_saver() -> None:
+    if SqliteSaver is None:
+        raise ImportError(
+            "Resumable runs need the SQLite checkpointer: pip install langgraph-checkpoint-sqlite "
+            "(or set ConfigAgents.use_checkpointer = False)"
+        )
+
+
+def open_checkpointer(path: Path):
+    """SQLite checkpointer for `invoke` (one connection shared by all threads of the process)"""
+    _require_sqlite_saver()
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return SqliteSaver(sqlite3.connect(str(path), check_same_thread=False))
+
+
+@asynccontextmanager
+async def aopen_checkpointer(path: Path):
+    """SQLite checkpointer for `ainvoke` (needs aiosqlite)"""
+    _require_sqlite_saver()
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    async with AsyncSqliteSaver.from_conn_string(str(path)) as saver:
+        yield saver
+
+
+def run_inputs(model: str, cfg_rag: RAGConfig) -> Dict[str, Any]:
+    """Inputs of a run outside the graph state: LLM model, RAG index version and prompts"""
+    return {
+        "model": model,
+        "index_version": read_index_version(cfg_rag),
+        "prompts": hashlib.sha256(_PROMPTS_PATH.read_bytes()).hexdigest(),
+    }
+
+
+def thread_id_for(
+    initial_state: AgentState,
+    run_id: str,
+    default_identity: Dict[str, str],
+    inputs: Dict[str, Any] = None,
+) -> str:
+    """
+    Checkpoint thread of one table in one run: `bucket.dataset.table:run_id:fingerprint`.
+
+    The fingerprint covers the sampled source table, its column profiles, the framework
+    definition, the master glossary and data stewards, and the `run_inputs` (model, index
+    version, prompts), so a changed input starts a new thread instead of resuming a stale one.
+    """
+    identity = {**default_identity, **(initial_state.get("table_identity") or {})}
+    table_key = ".".join(str(identity.get(k, "")) for k in ("bucket_name", "dataset_name", "table_name"))
+
+    raw = json.dumps(
+        [
+            initial_state.get("source_original_table"),
+            initial_state.get("framework_def"),
+            initial_state.get("column_profiles"),
+            initial_state.get("master_business_glossary"),
+            initial_state.get("master_data_owner"),
+            inputs,
+        ],
+        sort_keys=True, default=str,
+    )
+    fingerprint = hashlib.sha256(raw.encode("utf-8")).hexdigest()[:12]
+    return f"{table_key}:{run_id}:{fingerprint}"
+
+
+def run_config(recursion_limit: int, thread_id: str = None) -> Dict[str, Any]:
+    """`invoke` config; with a `thread_id` the run is checkpointed under that thread"""
+    config: Dict[str, Any] = {"recursion_limit": recursion_limit}
+    if thread_id:
+        config["configurable"] = {"thread_id": thread_id}
+    return config
+
+
+def _resume_plan(snapshot, thread_id: str) -> str:
+    if snapshot is None or not snapshot.values:
+        return "start"
+    if snapshot.next:
+        print(f"♻️ Resuming {thread_id} at node(s) {list(snapshot.next)} - earlier nodes are not recomputed")
+        return "resume"
+    return "done"
+
+
+def _rerun_config(config: Dict[str, Any], thread_id: str, attempt: int) -> Dict[str, Any]:
+    """Config of the `attempt`-th run of a thread whose earlier runs completed"""
+    rerun_id = f"{thread_id}#{attempt}"
+    print(f"♻️ {thread_id} already completed - running again as {rerun_id}")
+    return {**config, "configurable": {**config["configurable"], "thread_id": rerun_id}}
+
+
+def invoke_resumable(app, initial_state: AgentState, config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run the graph for the checkpoint thread of `config`:
+        - a new thread starts from `initial_state`,
+        - a thread which stopped midway (error, recursion limit) resumes from its last
+          completed node, reusing the stored retrieval context and generation result,
+        - a completed thread is not reused: the table runs again in a new thread
+          (`thread_id#2`, `#3`, ...).
+    Without a checkpointer (or thread id) this is a plain `invoke`.
+    """
+    thread_id = config.get("configurable", {}).get("thread_id")
+    if app.checkpointer is None or not thread_id:
+        return app.invoke(initial_state, config)
+
+    attempt = 1
+    run = config
+    while True:
+        plan = _resume_plan(app.get_state(run), run["configurable"]["thread_id"])
+        if plan == "resume":
+            return app.invoke(None, run)
+        if plan == "start":
+            return app.invoke(initial_state, run)
+        attempt += 1
+        run = _rerun_config(config, thread_id, attempt)
+
+
+async def ainvoke_resumable(app, initial_state: AgentState, config: Dict[str, Any]) -> Dict[str, Any]:
+    """Async variant of `invoke_resumable`"""
+    thread_id = config.get("configurable", {}).get("thread_id")
+    if app.checkpointer is None or not thread_id:
+        return await app.ainvoke(initial_state, config)
+
+    attempt = 1
+    run = config
+    while True:
+        plan = _resume_plan(await app.aget_state(run), run["configurable"]["thread_id"])
+        if plan == "resume":
+            return await app.ainvoke(None, run)
+        if plan == "start":
+            return await app.ainvoke(initial_state, run)
+        attempt += 1
+        run = _rerun_config(config, thread_id, attempt)
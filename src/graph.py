@@ -1,17 +1,27 @@
+import re
 from langgraph.graph import StateGraph, END
 from src.state import AgentState
 from src.nodes import (
     prepare_template_node,
     fill_master_business_glossary_node,
     fill_master_data_steward_node_and_rag_filter,
+    finalize_from_masters_node,
     rag_retrieval_node,
+    arag_retrieval_node,
     generator_node,
-    validator_node
+    agenerator_node,
+    pre_validator_node,
+    validator_node,
+    avalidator_node
 )
 from functools import partial
+from langchain_core.runnables import RunnableLambda
 from pathlib import Path
 from configs.config_agent import ConfigAgents
+from configs.config_datasets import ConfigDatasets
+from rag.retriever_formatting import PrepareRetrieval
 cfg_agents = ConfigAgents()
+cfg_datasets = ConfigDatasets()
 
 def router(state: AgentState):
     """Determines next step based on validation results."""
@@ -23,19 +33,64 @@ def router(state: AgentState):
         return "end"
     return "generate"
 
-def build_graph(project_root: Path):
-    """Constructs and compiles the StateGraph."""
+def coverage_router(state: AgentState):
+    """
+    Decides after the master files how much work is left:
+        - "complete": nothing to fill, finish from the master files
+        - "generate": only data steward fields are missing, no company context needed
+        - "retrieve": some RAG fields are missing
+    """
+    pattern = cfg_datasets.placeholder_pattern
+    table = state.get("entire_table_context") or {}
+    has_missing = any(
+        re.search(pattern, str(v))
+        for field, values in table.items() if field in cfg_datasets.placeholder_fields
+        for v in values
+    )
+
+    if not has_missing:
+        return "complete"
+    if not state.get("RAG_cols_with_samples"):
+        return "generate"
+    return "retrieve"
+
+def pre_validation_router(state: AgentState):
+    """Sends failed automated checks straight back to the generator, skipping the critic."""
+    if state.get("pre_validation_passed"):
+        return "validate"
+    return router(state)
+
+def build_graph(project_root: Path, prep: PrepareRetrieval = None, checkpointer=None):
+    """
+    Constructs and compiles the StateGraph.
+
+    The compiled graph supports `invoke` and `ainvoke`: nodes calling the LLM or the
+    retriever have an async variant which is used by `ainvoke`.
+
+    Args:
+        project_root: Root of the project (used to locate the vector DB)
+        prep: Optional retriever for every invocation of the compiled graph
+              (defaults to the warm retriever of the process-level registry)
+        checkpointer: Optional LangGraph checkpointer (see src/checkpointing.py);
+              runs invoked with a `thread_id` can then be resumed
+    """
     workflow = StateGraph(AgentState)
 
-    rag_node_with_path = partial(rag_retrieval_node, project_root=project_root)
+    rag_node_with_path = RunnableLambda(
+        partial(rag_retrieval_node, project_root=project_root, prep=prep),
+        afunc=partial(arag_retrieval_node, project_root=project_root, prep=prep),
+        name="RAG_retrieve",
+    )
 
     # Add Nodes
     workflow.add_node("prepare_template", prepare_template_node)
     workflow.add_node("fill_master_business_glossary", fill_master_business_glossary_node)
     workflow.add_node("fill_master_data_steward", fill_master_data_steward_node_and_rag_filter)
+    workflow.add_node("finalize_from_masters", finalize_from_masters_node)
     workflow.add_node("RAG_retrieve", rag_node_with_path)
-    workflow.add_node("generate", generator_node)
-    workflow.add_node("validate", validator_node)
+    workflow.add_node("generate", RunnableLambda(generator_node, afunc=agenerator_node, name="generate"))
+    workflow.add_node("pre_validate", pre_validator_node)
+    workflow.add_node("validate", RunnableLambda(validator_node, afunc=avalidator_node, name="validate"))
 
     # Set Entry Point
     workflow.set_entry_point("prepare_template")
@@ -43,11 +98,29 @@ def build_graph(project_root: Path):
     # Add Edges
     workflow.add_edge("prepare_template", "fill_master_business_glossary")
     workflow.add_edge("fill_master_business_glossary", "fill_master_data_steward")
-    workflow.add_edge("fill_master_data_steward", "RAG_retrieve")
+    workflow.add_edge("finalize_from_masters", END)
     workflow.add_edge("RAG_retrieve", "generate")
-    workflow.add_edge("generate", "validate")
+    workflow.add_edge("generate", "pre_validate")
 
     # Add Conditional Edges
+    workflow.add_conditional_edges(
+        "fill_master_data_steward",
+        coverage_router,
+        {
+            "complete": "finalize_from_masters",
+            "generate": "generate",
+            "retrieve": "RAG_retrieve"
+        }
+    )
+    workflow.add_conditional_edges(
+        "pre_validate",
+        pre_validation_router,
+        {
+            "validate": "validate",
+            "generate": "generate",
+            "end": END
+        }
+    )
     workflow.add_conditional_edges(
         "validate",
         router,
@@ -57,7 +130,7 @@ def build_graph(project_root: Path):
         }
     )
 
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
 
 # # Visualize the new nodes structure
 # try:
@@ -0,0 +1,232 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional
+
+from utils.api_scheduler import APIScheduler, CallTicket, bind_ticket, unbind_ticket
+
+# How often a hedge which is due is re-checked while the primary is queued or the API saturated
+_RECHECK_S = 0.25
+
+
+class NodeDeadlineExceeded(TimeoutError):
+    """An LLM call did not finish before the deadline of its graph node"""
+
+
+class LatencyTracker:
+    """Latencies of the last `window` successful calls of one kind"""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float, min_samples: int = 1) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < max(1, min_samples):
+            return None
+        index = min(len(samples) - 1, int(round(q / 100 * (len(samples) - 1))))
+        return samples[index]
+
+
+class HedgedInvoker:
+    """
+    Invoke an LLM Runnable with a hedge and a deadline.
+
+    When the primary call is still running after the `percentile`-th latency of
+    previous calls of the same kind, an identical hedge request is fired and the first
+    valid (non-empty) result wins. Until `min_samples` latencies are known,
+    `initial_delay_s` is used (None = no hedge). Calls still running at the deadline
+    raise NodeDeadlineExceeded.
+
+    With a `scheduler` (the APIScheduler the runnable goes through), latencies and the
+    hedge timer start when the scheduler admits the call, so time spent queued never
+    fires a hedge, and no hedge is fired while the scheduler is saturated (no free
+    slot, callers queued or paused after a 429). A losing call still queued is abandoned.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        percentile: float = 95,
+        min_samples: int = 8,
+        initial_delay_s: Optional[float] = None,
+        scheduler: Optional[APIScheduler] = None,
+    ):
+        self.enabled = enabled
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.initial_delay_s = initial_delay_s
+        self.scheduler = scheduler
+        self._latencies: Dict[str, LatencyTracker] = {}
+        self._lock = threading.Lock()
+        self.counters: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, kind: str, counter: str) -> None:
+        with self._lock:
+            counters = self.counters.setdefault(
+                kind, {"calls": 0, "hedges_fired": 0, "hedges_won": 0, "hedges_suppressed": 0, "deadline_exceeded": 0}
+            )
+            counters[counter] += 1
+
+    def _tracker(self, kind: str) -> LatencyTracker:
+        with self._lock:
+            return self._latencies.setdefault(kind, LatencyTracker())
+
+    def hedge_delay(self, kind: str) -> Optional[float]:
+        """Seconds after which the hedge is fired (None = never)"""
+        if not self.enabled:
+            return None
+        delay = self._tracker(kind).percentile(self.percentile, self.min_samples)
+        return self.initial_delay_s if delay is None else delay
+
+    def _started(self, ticket: CallTicket) -> Optional[float]:
+        """When the call started running: its admission by the scheduler (None while queued)"""
+        return ticket.admitted_at if self.scheduler is not None else ticket.created_at
+
+    def _hedge_at(self, delay: Optional[float], primary: CallTicket, not_before: float) -> Optional[float]:
+        """time.monotonic() at which the hedge is due (None = never)"""
+        if delay is None:
+            return None
+        started = self._started(primary)
+        if started is None:  # still queued in the scheduler: check again shortly
+            return max(not_before, time.monotonic() + _RECHECK_S)
+        return max(not_before, started + delay)
+
+    @staticmethod
+    def _timeout(hedge_at: Optional[float], deadline: Optional[float]) -> Optional[float]:
+        timeouts = [t for t in (hedge_at, deadline) if t is not None]
+        return max(0.0, min(timeouts) - time.monotonic()) if timeouts else None
+
+    def _may_hedge(self, primary: CallTicket) -> bool:
+        """The primary runs (admitted) and an extra request would not just wait in the queue"""
+        if self.scheduler is None:
+            return True
+        return primary.admitted_at is not None and not self.scheduler.saturated
+
+    def _won(self, kind: str, label: str, ticket: CallTicket) -> None:
+        self._tracker(kind).record(time.monotonic() - (self._started(ticket) or ticket.created_at))
+        if label == "hedge":
+            self._count(kind, "hedges_won")
+
+    def _expired(self, kind: str, deadline: Optional[float]) -> bool:
+        if deadline is not None and time.monotonic() >= deadline:
+            self._count(kind, "deadline_exceeded")
+            return True
+        return False
+
+    @staticmethod
+    def _run(ticket: CallTicket, fn, messages: List[Any]) -> Any:
+        token = bind_ticket(ticket)
+        try:
+            return fn(messages)
+        finally:
+            unbind_ticket(token)
+
+    @staticmethod
+    async def _arun(ticket: CallTicket, fn, messages: List[Any]) -> Any:
+        token = bind_ticket(ticket)
+        try:
+            return await fn(messages)
+        finally:
+            unbind_ticket(token)
+
+    def invoke(self, kind: str, runnable, messages: List[Any], deadline: Optional[float] = None) -> Any:
+        """Hedged `runnable.invoke(messages)`; `deadline` is a time.monotonic() timestamp"""
+        self._count(kind, "calls")
+        delay = self.hedge_delay(kind)
+        tickets = {"primary": CallTicket()}
+        errors: List[BaseException] = []
+
+        pool = ThreadPoolExecutor(max_workers=2)
+        pending = {pool.submit(self._run, tickets["primary"], runnable.invoke, messages): "primary"}
+        try:
+            not_before = 0.0
+            while pending:
+                hedge_at = None if "hedge" in tickets else self._hedge_at(delay, tickets["primary"], not_before)
+                done, _ = wait(pending, timeout=self._timeout(hedge_at, deadline), return_when=FIRST_COMPLETED)
+                for future in done:
+                    label = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as exc:
+                        errors.append(exc)
+                        continue
+                    if result is None:
+                        errors.append(ValueError(f"{kind}: empty structured result"))
+                        continue
+                    self._won(kind, label, tickets[label])
+                    return result
+                if done:
+                    continue
+                if self._expired(kind, deadline):
+                    raise NodeDeadlineExceeded(f"{kind}: no result within the node deadline")
+                if hedge_at is None or time.monotonic() < hedge_at:
+                    continue
+                if not self._may_hedge(tickets["primary"]):
+                    if not not_before:
+                        self._count(kind, "hedges_suppressed")
+                    not_before = time.monotonic() + _RECHECK_S
+                    continue
+                self._count(kind, "hedges_fired")
+                tickets["hedge"] = CallTicket()
+                pending[pool.submit(self._run, tickets["hedge"], runnable.invoke, messages)] = "hedge"
+            raise errors[0]
+        finally:
+            # A losing call still queued in the scheduler gives up; one already sent cannot
+            # be interrupted and its result is discarded
+            for future, label in pending.items():
+                tickets[label].cancelled.set()
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    async def ainvoke(self, kind: str, runnable, messages: List[Any], deadline: Optional[float] = None) -> Any:
+        """Async variant of `invoke`; the losing call is cancelled"""
+        self._count(kind, "calls")
+        delay = self.hedge_delay(kind)
+        tickets = {"primary": CallTicket()}
+        errors: List[BaseException] = []
+
+        pending = {asyncio.ensure_future(self._arun(tickets["primary"], runnable.ainvoke, messages)): "primary"}
+        try:
+            not_before = 0.0
+            while pending:
+                hedge_at = None if "hedge" in tickets else self._hedge_at(delay, tickets["primary"], not_before)
+                done, _ = await asyncio.wait(
+                    pending, timeout=self._timeout(hedge_at, deadline), return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    label = pending.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as exc:
+                        errors.append(exc)
+                        continue
+                    if result is None:
+                        errors.append(ValueError(f"{kind}: empty structured result"))
+                        continue
+                    self._won(kind, label, tickets[label])
+                    return result
+                if done:
+                    continue
+                if self._expired(kind, deadline):
+                    raise NodeDeadlineExceeded(f"{kind}: no result within the node deadline")
+                if hedge_at is None or time.monotonic() < hedge_at:
+                    continue
+                if not self._may_hedge(tickets["primary"]):
+                    if not not_before:
+                        self._count(kind, "hedges_suppressed")
+                    not_before = time.monotonic() + _RECHECK_S
+                    continue
+                self._count(kind, "hedges_fired")
+                tickets["hedge"] = CallTicket()
+                pending[asyncio.ensure_future(self._arun(tickets["hedge"], runnable.ainvoke, messages))] = "hedge"
+            raise errors[0]
+        finally:
+            for task in pending:
+                task.cancel()
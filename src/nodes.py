@@ -1,19 +1,35 @@
-import json
+import asyncio
+import time
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
 from pathlib import Path
+from langchain_core.messages import BaseMessage
 from langchain_openai import ChatOpenAI
 
 # Internal Imports
-from src.state import AgentState, TemplateOutput, ValidationResult
+from src.state import AgentState, TemplateOutput, TableSummaryOutput, ValidationResult
 from rag.config_rag import RAGConfig
-from rag.retriever_formatting import PrepareRetrieval
+from rag.retriever_formatting import PrepareRetrieval, RetrievedResults
+from rag.retriever_registry import retriever_registry
 from utils.helpers import template_enricher
 # from config_paths import ConfigPaths
 from configs.config_agent import ConfigAgents
-from src.prompts import GENERATOR_PROMPT, VALIDATOR_PROMPT
+from src.prompts import GENERATOR_PROMPT, GENERATOR_MISSING_ROWS_PROMPT, VALIDATOR_PROMPT, TABLE_SUMMARY_PROMPT
 from configs.config_datasets import ConfigDatasets
-from src.state import ColumnDefInput
+from src.state import ColumnDefInput, ColumnDefOutput
 from utils.helpers import check_columns_with_pydantic
+from utils.helpers import split_rows_by_placeholder, merge_generated_rows
+from src.validation_rules import run_prevalidation_rules, format_violations
+from src.prompt_encoding import encode_table, print_encoding_report
+from src.prompt_cache_probe import prefix_probe
+from src.sharding import plan_shards, select_rows
+from utils.api_scheduler import get_scheduler, rate_limited
+from src.hedging import HedgedInvoker
+from utils.llm_cache import CachedLLM, get_llm_cache
+from configs.config_paths import ConfigPaths
+from utils.column_profiler import frequent_values, profile_hint, profiles_table
 
 # --- LLM Setup ---
 # config = ConfigPaths()
@@ -21,9 +37,32 @@ cfg_agent = ConfigAgents()
 gpt_model = cfg_agent.llm_model
 cfg_dataset = ConfigDatasets()
 
-llm = ChatOpenAI(model=gpt_model, temperature=0)
-structured_llm = llm.with_structured_output(TemplateOutput)
-critic_llm = llm.with_structured_output(ValidationResult)
+# Every call goes through the process-wide rate limiter, which also owns the retries
+llm = ChatOpenAI(model=gpt_model, temperature=0, max_retries=0)
+structured_llm = rate_limited(llm.with_structured_output(TemplateOutput))
+critic_llm = rate_limited(llm.with_structured_output(ValidationResult))
+summary_llm = rate_limited(llm.with_structured_output(TableSummaryOutput))
+
+# Deterministic response cache per call kind (opt-in, see ConfigAgents.llm_cache_mode)
+_llm_cache = None
+if cfg_agent.llm_cache_mode != "off":
+    _llm_cache = get_llm_cache(ConfigPaths().llm_cache_path, max_entries=cfg_agent.llm_cache_max_entries)
+_llm_cache_id = f"{gpt_model}|temperature=0"
+response_caches = {
+    "generator": CachedLLM(_llm_cache, _llm_cache_id, TemplateOutput, cfg_agent.llm_cache_mode),
+    "validator": CachedLLM(_llm_cache, _llm_cache_id, ValidationResult, cfg_agent.llm_cache_mode),
+    "summary": CachedLLM(_llm_cache, _llm_cache_id, TableSummaryOutput, cfg_agent.llm_cache_mode),
+}
+
+# Slow calls get a hedged duplicate request, see ConfigAgents; timed from their admission
+# by the chat scheduler which `rate_limited` LLMs go through
+hedged_invoker = HedgedInvoker(
+    enabled=cfg_agent.hedge_requests,
+    percentile=cfg_agent.hedge_latency_percentile,
+    min_samples=cfg_agent.hedge_min_samples,
+    initial_delay_s=cfg_agent.hedge_initial_delay_s,
+    scheduler=get_scheduler("chat"),
+)
 
 
 # --- NODE 1: Prepare Template ---
@@ -32,8 +71,14 @@ def prepare_template_node(state: AgentState) -> AgentState:
     print("⏳ Fetching the template...")
 
     original_sample_dict = state["source_original_table"]
+    table_identity = state.get("table_identity") or {}
 
-    df_template = cfg_dataset.build_template(original_sample_dict)
+    df_template = cfg_dataset.build_template(
+        original_sample_dict,
+        bucket=table_identity.get("bucket_name"),
+        dataset=table_identity.get("dataset_name"),
+        table=table_identity.get("table_name"),
+    )
 
     # Check if the template you built matches the Pydantic schema the Agent expects
     check_columns_with_pydantic(df_template, ColumnDefInput)
@@ -92,15 +137,22 @@ def fill_master_data_steward_node_and_rag_filter(state: AgentState) -> AgentStat
     # (keep only rows with placeholders in RAG columns) - this will be used for retrieval and building
     # the context for the generator
 
-    # Restrict RAG to only columns that still contain placeholders (extract rows which contains tag <...>)
-    pattern = r"<.*?>"
+    # Restrict RAG to only columns that still contain placeholders in the RAG fields (extract rows which
+    # contain an <agent> / <ds_master> tag). Rows missing only the data steward fields don't need any company context.
+    pattern = cfg_dataset.placeholder_pattern
+    rag_fields = framework_def['search_with_RAG']
     df_missing = df_template_updated[
-        df_template_updated.apply(lambda row: row.astype(str).str.contains(pattern).any(), axis=1)
+        df_template_updated[rag_fields].apply(lambda row: row.astype(str).str.contains(pattern).any(), axis=1)
     ]
 
     ## Below object will be used to perform RAG searches (column name + sample values,
-    # e.g. Account_number: [12345, 67890, 111213])
-    dict_for_RAG_search = dict(zip(df_missing["column_name"], df_missing["sample_values"]))
+    # e.g. Account_number: [12345, 67890, 111213]). The most frequent values of the whole
+    # table are better examples than the sampled rows when the column has any.
+    profiles = state.get("column_profiles") or {}
+    dict_for_RAG_search = {
+        col: [value for value, _ in frequent_values(profiles.get(col))] or samples
+        for col, samples in zip(df_missing["column_name"], df_missing["sample_values"])
+    }
 
     return {
         "template_df": full_dict, # in fact doesn't need to be retrieved but returned as updated object for clarity
@@ -109,104 +161,564 @@ def fill_master_data_steward_node_and_rag_filter(state: AgentState) -> AgentStat
     }
 
 
+# --- NODE 3b: Fast Path (table fully covered by the master files) ---
+def finalize_from_masters_node(state: AgentState) -> AgentState:
+    """
+    Build the final result directly from the template when the master files left no
+    placeholder. No retrieval and no LLM call is made.
+    """
+    print("✅ All fields are covered by the master files - skipping RAG and Agents.")
+
+    table = state.get("entire_table_context")
+    rows = merge_generated_rows(
+        template_dict=table,
+        generated_rows=[],
+        join_keys=cfg_dataset.define_columns_to_fill['key_columns'],
+        pattern=cfg_dataset.placeholder_pattern,
+        row_schema=ColumnDefOutput,
+        fields=cfg_dataset.placeholder_fields,
+    )
+
+    first = rows[0] if rows else None
+    table_summary = (
+        f"Table '{first.table_name}' of dataset '{first.dataset_name}' ({first.bucket_name}) is fully documented "
+        f"in the Master Business Glossary ({len(rows)} columns: {', '.join(r.column_name for r in rows)})."
+        if first else "Empty table."
+    )
+
+    return {
+        "result": TemplateOutput(rows=rows, table_summary=table_summary),
+        "error_message": "none",
+        "review_history_validator": ["Fast path: all fields filled from the master files."]
+    }
+
+
 # --- NODE 4: RAG Retrieval ---
-def rag_retrieval_node(state: AgentState, project_root: Path) -> AgentState:
-    """Perform retrieval and build context prompt."""
+def rag_retrieval_node(state: AgentState, project_root: Path, prep: PrepareRetrieval = None) -> AgentState:
+    """
+    Perform retrieval and build context prompt.
+
+    A specific `prep` instance can be supplied; otherwise the warm retriever of the
+    process-level registry is used, so the vector DB is loaded once per process.
+    """
     col_samples = state.get("RAG_cols_with_samples")
 
     # Initialize RAG (assuming paths are relative to root where script is run)
-    cfg_rag = RAGConfig(project_root=project_root)
-    prep = PrepareRetrieval(cfg_rag)
+    if prep is None:
+        cfg_rag = RAGConfig(project_root=project_root)
+        prep = retriever_registry.get(cfg_rag)
+
+    results = prep.retrieve_for_all_columns(col_samples, _profile_hints(state))
+    return _retrieval_update(prep, results)
 
-    results = prep.retrieve_for_all_columns(col_samples)
-    company_context_prompt = prep.build_prompt_and_format(results)
 
-    return {"RAG_company_context": company_context_prompt}
+async def arag_retrieval_node(state: AgentState, project_root: Path, prep: PrepareRetrieval = None) -> AgentState:
+    """Async variant of `rag_retrieval_node` (embedding requests are awaited, not run in threads)"""
+    col_samples = state.get("RAG_cols_with_samples")
+
+    if prep is None:
+        cfg_rag = RAGConfig(project_root=project_root)
+        # Loading the vector DB happens once per process, keep it off the event loop
+        prep = await asyncio.to_thread(retriever_registry.get, cfg_rag)
+
+    results = await prep.aretrieve_for_all_columns(col_samples, _profile_hints(state))
+    return _retrieval_update(prep, results)
+
+
+def _profile_hints(state: AgentState) -> Dict[str, str]:
+    """Column profile summary added to the retrieval query of each column"""
+    profiles = state.get("column_profiles") or {}
+    return {col: profile_hint(profiles[col]) for col in state.get("RAG_cols_with_samples") or {} if col in profiles}
+
+
+def _column_profiles_context(state: AgentState, columns: List[str] = None) -> str:
+    profiles = state.get("column_profiles") or {}
+    table = profiles_table(profiles, columns)
+    if not table["column_name"]:
+        return "No column profiles available."
+    return encode_table(table, cfg_agent.prompt_table_encoding)
+
+
+def _retrieval_update(prep: PrepareRetrieval, results: Dict[str, RetrievedResults]) -> AgentState:
+    company_context_prompt = prep.build_prompt_and_format(results, token_budget=prep.cfg.context_token_budget)
+
+    return {
+        "RAG_company_context": company_context_prompt,
+        # Raw hits are kept so wide tables can pack a context per shard
+        "RAG_results": {col: {"query": res.query, "hits": res.hits} for col, res in results.items()},
+    }
+
+
+def _shared_prompt_context(state: AgentState) -> Dict[str, str]:
+    """
+    Variables of the shared prompt prefix (TARGET_TABLE + COMPANY_CONTEXT + COLUMN_PROFILES).
+    Built the same way for every iteration and both agents, so the prefix stays byte-identical.
+    """
+    return {
+        "full_table_context": encode_table(state.get('entire_table_context'), cfg_agent.prompt_table_encoding),
+        "rag_company_context": state.get('RAG_company_context') or "No additional context provided.",
+        "column_profiles": _column_profiles_context(state),
+    }
+
+
+def _table_shards(state: AgentState) -> List[List[str]]:
+    """`column_name`s of the table split into token-budgeted shards (a single shard unless the table is wide)"""
+    table = state.get('entire_table_context') or {}
+    if not cfg_agent.shard_wide_tables:
+        return [list(table.get('column_name', []))]
+    return plan_shards(table, cfg_agent.shard_token_budget, cfg_agent.prompt_table_encoding, gpt_model)
+
+
+def _shard_prompt_context(state: AgentState, columns: List[str], index: int, n_shards: int) -> Dict[str, str]:
+    """
+    Shared prompt prefix of one shard: its rows of the template, plus a RAG context and
+    column profiles for its columns only. Generator and validator of a shard share this prefix.
+    """
+    table = state.get('entire_table_context')
+    wanted = set(columns)
+    shard_results = {
+        col: RetrievedResults(column_name=col, **res)
+        for col, res in (state.get('RAG_results') or {}).items()
+        if col in wanted
+    }
+    rag_context = ""
+    if shard_results:
+        rag_context = PrepareRetrieval.build_prompt_and_format(shard_results, token_budget=cfg_agent.shard_rag_token_budget)
+
+    header = f"Part {index + 1}/{n_shards} of the table ({len(columns)} of {len(table['column_name'])} columns):\n"
+    return {
+        "full_table_context": header + encode_table(select_rows(table, columns), cfg_agent.prompt_table_encoding),
+        "rag_company_context": rag_context or "No additional context provided.",
+        "column_profiles": _column_profiles_context(state, columns),
+    }
+
+
+def _record_prompts(node_name: str, messages_list: List[List[BaseMessage]]) -> None:
+    if cfg_agent.report_prompt_prefix:
+        for formatted_messages in messages_list:
+            prefix_probe.record(node_name, formatted_messages)
+
+
+def _node_deadline(graph_node: str) -> Optional[float]:
+    """time.monotonic() deadline of a graph node run starting now (None = no deadline)"""
+    seconds = cfg_agent.node_deadlines_s.get(graph_node)
+    return time.monotonic() + seconds if seconds else None
+
+
+def _invoke_many(node_name: str, runnable, messages_list: List[List[BaseMessage]], deadline: float = None) -> List[Any]:
+    """
+    Invoke an Agent once per prompt (concurrently for shards), answers in prompt order.
+    Cached responses are reused; other calls are hedged and bounded by `deadline`.
+    """
+    _record_prompts(node_name, messages_list)
+
+    def call(formatted_messages):
+        return response_caches[node_name].invoke(
+            formatted_messages,
+            lambda: hedged_invoker.invoke(node_name, runnable, formatted_messages, deadline),
+        )
+
+    if len(messages_list) <= 1:
+        return [call(m) for m in messages_list]
+    with ThreadPoolExecutor(max_workers=min(cfg_agent.shard_max_workers, len(messages_list))) as pool:
+        return list(pool.map(call, messages_list))
+
+
+async def _ainvoke_many(node_name: str, runnable, messages_list: List[List[BaseMessage]], deadline: float = None) -> List[Any]:
+    """Async variant of `_invoke_many`"""
+    _record_prompts(node_name, messages_list)
+    semaphore = asyncio.Semaphore(max(1, cfg_agent.shard_max_workers))
+
+    async def call(formatted_messages):
+        async with semaphore:
+            return await response_caches[node_name].ainvoke(
+                formatted_messages,
+                lambda: hedged_invoker.ainvoke(node_name, runnable, formatted_messages, deadline),
+            )
+
+    return list(await asyncio.gather(*(call(m) for m in messages_list)))
 
 
 # --- NODE 5: Generator Agent ---
+@dataclass
+class _GenerationPlan:
+    """Prompts of one generator step and how to assemble their answers"""
+    messages: List[List[BaseMessage]]
+    critic_feedback: str
+    full_table: bool = False                  # GENERATOR_PROMPT: the answer is the complete table
+    sharded: bool = False                     # one prompt per shard, the table summary is reduced afterwards
+    only_columns: Optional[List[str]] = None  # rows rejected by the critic, all other rows are pinned
+    summary_only: bool = False                # every row was accepted, only the table summary is redone
+
+
 def generator_node(state: AgentState):
     """5. Define the Generator Agent logic"""
-
+    deadline = _node_deadline("generate")
+    plan = _plan_generation(state)
+    if plan.summary_only:
+        summary = _invoke_many("summary", summary_llm, plan.messages, deadline)[0].table_summary
+        return _generation_update(state, TemplateOutput(rows=list(state['result'].rows), table_summary=summary))
+
+    responses = _invoke_many("generator", structured_llm, plan.messages, deadline)
+    result = _assemble_generation(state, plan, responses)
+
+    if plan.sharded:
+        summary_messages = _summary_messages(result.rows, [r.table_summary for r in responses], plan.critic_feedback)
+        result.table_summary = _invoke_many("summary", summary_llm, [summary_messages], deadline)[0].table_summary
+
+    return _generation_update(state, result)
+
+
+async def agenerator_node(state: AgentState):
+    """5. Async variant of `generator_node` (shards are generated concurrently on the event loop)"""
+    deadline = _node_deadline("generate")
+    plan = _plan_generation(state)
+    if plan.summary_only:
+        summary = (await _ainvoke_many("summary", summary_llm, plan.messages, deadline))[0].table_summary
+        return _generation_update(state, TemplateOutput(rows=list(state['result'].rows), table_summary=summary))
+
+    responses = await _ainvoke_many("generator", structured_llm, plan.messages, deadline)
+    result = _assemble_generation(state, plan, responses)
+
+    if plan.sharded:
+        summary_messages = _summary_messages(result.rows, [r.table_summary for r in responses], plan.critic_feedback)
+        result.table_summary = (await _ainvoke_many("summary", summary_llm, [summary_messages], deadline))[0].table_summary
+
+    return _generation_update(state, result)
+
+
+def _plan_generation(state: AgentState) -> _GenerationPlan:
+    """
+    Build the Generator prompts of this iteration:
+        - rows rejected by the critic are regenerated, accepted rows are shown read-only,
+        - when every row was accepted and only the table summary was rejected, only the
+          summary is rewritten,
+        - otherwise only rows which still hold placeholders are requested
+          (`generate_missing_rows_only`), or the complete table is re-emitted,
+        - wide tables get one prompt per shard (map); the shard summaries are reduced
+          into one table summary afterwards.
+    """
     print(f"--- GENERATOR: Filling the template (Attempt {state['iterations'] + 1}) ---")
 
-    # Bring context from state
-    full_table_context = json.dumps(state.get('entire_table_context'), indent=2) # Convert dict to JSON on the fly so it's better formatted when supplying to the Agent
-    rag_company_context = (state.get('RAG_company_context', "No additional context provided."))
+    # Bring context from state (shared prompt prefix)
+    shared_context = _shared_prompt_context(state)
 
     # Prepare critic feedback if available
     critic_feedback = ""
     if state['error_message'] != "none":
         critic_feedback = f"\n\nCRITIC FEEDBACK FROM PREVIOUS ATTEMPT:\n{state['error_message']}\nPlease fix these issues."
 
-    # Format the prompt using LangChain's template
-    formatted_messages = GENERATOR_PROMPT.format_messages(
-        full_table_context=full_table_context,
-        rag_company_context=rag_company_context,
+    rejected_columns = state.get('rejected_columns') or {}
+    previous_result = state.get('result')
+    regenerate = bool(rejected_columns and previous_result)
+
+    if previous_result and not rejected_columns and _all_rows_accepted(state):
+        print("All rows accepted, rewriting the table summary only")
+        summary_messages = _summary_messages(previous_result.rows, [previous_result.table_summary], critic_feedback)
+        return _GenerationPlan(messages=[summary_messages], critic_feedback=critic_feedback, summary_only=True)
+
+    if cfg_agent.report_encoding_savings and state['iterations'] == 0:
+        print_encoding_report(state.get('entire_table_context'), cfg_agent.prompt_table_encoding, gpt_model)
+
+    shards = _table_shards(state)
+    if not regenerate and not cfg_agent.generate_missing_rows_only and len(shards) == 1:
+        # Format the prompt using LangChain's template
+        formatted_messages = GENERATOR_PROMPT.format_messages(
+            **shared_context,
+            critic_feedback=critic_feedback
+            )
+        return _GenerationPlan(messages=[formatted_messages], critic_feedback=critic_feedback, full_table=True)
+
+    only_columns = None
+    readonly_rows = None
+    if regenerate:
+        # Partial regeneration: only rows rejected by the critic, accepted rows stay pinned
+        only_columns = list(rejected_columns)
+        readonly_rows = [r.model_dump() for r in previous_result.rows if r.column_name not in rejected_columns]
+        row_feedback = "\n".join(f"- {col}: {fb}" for col, fb in rejected_columns.items())
+        critic_feedback = f"{critic_feedback}\n\nROWS REJECTED BY THE CRITIC:\n{row_feedback}"
+
+    rows_to_fill, filled_rows = split_rows_by_placeholder(
+        state.get('entire_table_context'), cfg_dataset.placeholder_pattern, cfg_dataset.placeholder_fields
+    )
+    if only_columns is not None:
+        rows_to_fill = [r for r in rows_to_fill if r["column_name"] in only_columns]
+        if not rows_to_fill:
+            # Rejected rows filled entirely by the master files (e.g. `master_modified`) need
+            # no LLM call: the merge restores them from the template
+            print(f"Rejected row(s) restored from the master files: {only_columns}")
+            return _GenerationPlan(messages=[], critic_feedback=critic_feedback, only_columns=only_columns)
+    print(f"Rows to generate: {len(rows_to_fill)} | rows already filled: {len(filled_rows)}")
+
+    if len(shards) == 1:
+        messages = [_rows_messages(shared_context, rows_to_fill, critic_feedback, readonly_rows)]
+    else:
+        messages = []
+        for index, columns in enumerate(shards):
+            wanted = set(columns)
+            shard_rows = [r for r in rows_to_fill if r["column_name"] in wanted]
+            if not shard_rows:
+                continue
+            shard_readonly = [r for r in (readonly_rows or []) if r["column_name"] in wanted]
+            shard_context = _shard_prompt_context(state, columns, index, len(shards))
+            messages.append(_rows_messages(shard_context, shard_rows, critic_feedback, shard_readonly))
+        print(f"Sharded generation: {len(messages)} of {len(shards)} shard(s) to generate")
+
+    return _GenerationPlan(
+        messages=messages,
+        critic_feedback=critic_feedback,
+        sharded=len(shards) > 1,
+        only_columns=only_columns,
+    )
+
+
+def _all_rows_accepted(state: AgentState) -> bool:
+    """True if the previous result has every template row and the critic accepted all of them"""
+    accepted_columns = set(state.get('accepted_columns') or [])
+    rows = state['result'].rows
+    n_template_rows = len(next(iter(state.get('entire_table_context', {}).values()), []))
+    return bool(rows) and len(rows) == n_template_rows and all(r.column_name in accepted_columns for r in rows)
+
+
+def _rows_messages(
+    shared_context: Dict[str, str],
+    rows_to_fill: List[Dict[str, Any]],
+    critic_feedback: str,
+    readonly_rows: List[Dict[str, Any]] = None,
+) -> List[BaseMessage]:
+    """Generator prompt asking only for `rows_to_fill`; `readonly_rows` are shown as context"""
+    readonly_context = [
+        {c: r.get(c) for c in cfg_dataset.readonly_context_columns}
+        for r in (readonly_rows or [])
+    ]
+
+    return GENERATOR_MISSING_ROWS_PROMPT.format_messages(
+        **shared_context,
+        rows_to_fill=encode_table(rows_to_fill, cfg_agent.prompt_table_encoding),
+        filled_rows_context=encode_table(readonly_context, cfg_agent.prompt_table_encoding) or "None",
         critic_feedback=critic_feedback
-        )
+    )
+
+
+def _summary_messages(rows: List[ColumnDefOutput], shard_summaries: List[str], critic_feedback: str) -> List[BaseMessage]:
+    """Reduce step of sharded generation: one table summary from the summaries of the shards"""
+    columns_overview = [{"column_name": r.column_name, "business_name": r.business_name} for r in rows]
+
+    return TABLE_SUMMARY_PROMPT.format_messages(
+        table_name=rows[0].table_name if rows else "",
+        shard_summaries="\n".join(f"{i + 1}. {s}" for i, s in enumerate(shard_summaries)),
+        columns_overview=encode_table(columns_overview, cfg_agent.prompt_table_encoding),
+        critic_feedback=critic_feedback
+    )
+
+
+def _assemble_generation(state: AgentState, plan: _GenerationPlan, responses: List[TemplateOutput]) -> TemplateOutput:
+    """
+    Merge the generated rows back into the template by the key columns. When only
+    rejected rows were regenerated, all other rows of the previous result are kept.
+    """
+    if plan.full_table:
+        return responses[0]
+
+    merged_rows = merge_generated_rows(
+        template_dict=state.get('entire_table_context'),
+        generated_rows=[row for response in responses for row in response.rows],
+        join_keys=cfg_dataset.define_columns_to_fill['key_columns'],
+        pattern=cfg_dataset.placeholder_pattern,
+        row_schema=ColumnDefOutput,
+        fields=cfg_dataset.placeholder_fields,
+    )
+    # Sharded: the table summary is produced by the reduce step
+    table_summary = responses[0].table_summary if responses and not plan.sharded else ""
+
+    if plan.only_columns is None:
+        return TemplateOutput(rows=merged_rows, table_summary=table_summary)
+    if not responses:
+        table_summary = state['result'].table_summary
+
+    regenerated_by_col = {r.column_name: r for r in merged_rows if r.column_name in plan.only_columns}
+    rows = [regenerated_by_col.get(r.column_name, r) for r in state['result'].rows]
+    print(f"Regenerated {len(regenerated_by_col)} rejected row(s), {len(rows) - len(regenerated_by_col)} pinned")
+    return TemplateOutput(rows=rows, table_summary=table_summary)
+
+
+def _generation_update(state: AgentState, response: TemplateOutput) -> AgentState:
+    # Rows accepted by the critic in a previous iteration stay pinned
+    accepted_columns = state.get('accepted_columns') or []
+    previous_result = state.get('result')
+    if accepted_columns and previous_result:
+        pinned = {r.column_name: r for r in previous_result.rows if r.column_name in accepted_columns}
+        response.rows = [pinned.get(r.column_name, r) for r in response.rows]
 
-    response = structured_llm.invoke(formatted_messages)
     return {
         "result": response,
         "iterations": state['iterations'] + 1
     }
 
 
-# --- NODE 6: Validator Agent ---
+# --- NODE 6: Deterministic Pre-Validation ---
+def pre_validator_node(state: AgentState):
+    """
+    6. Mechanical checks of the generated rows against the template (row count, empty
+    fields, leftover placeholders, modified master values). Failures go straight back
+    to the generator without calling the critic LLM.
+    """
+    print("--- PRE-VALIDATION: Running automated checks... ---")
+
+    rows = [r.model_dump() for r in state['result'].rows]
+    violations = run_prevalidation_rules(
+        template_dict=state.get('entire_table_context', {}),
+        rows=rows,
+        join_keys=cfg_dataset.define_columns_to_fill['key_columns'],
+        pattern=cfg_dataset.placeholder_pattern,
+        fields=cfg_dataset.placeholder_fields,
+    )
+
+    if not violations:
+        print("✅ Automated checks passed")
+        return {"pre_validation_passed": True}
+
+    feedback = format_violations(violations)
+    print(f"--- PRE-VALIDATION FEEDBACK:\n {feedback} ---")
+
+    # Table-level problems (missing / extra rows) need a full regeneration,
+    # otherwise only the offending rows are regenerated
+    table_level = any(not v.column_name for v in violations)
+    rejected_columns: Dict[str, str] = {}
+    if not table_level:
+        for v in violations:
+            rejected_columns[v.column_name] = f"{rejected_columns.get(v.column_name, '')} {v.message}".strip()
+
+    accepted_columns = [c for c in (state.get('accepted_columns') or []) if c not in rejected_columns]
+
+    return {
+        "pre_validation_passed": False,
+        "error_message": feedback,
+        "accepted_columns": accepted_columns,
+        "rejected_columns": rejected_columns,
+        "review_history_validator": [f"Step {state['iterations']} Automated checks: {len(violations)} violation(s)"]
+    }
+
+
+# --- NODE 7: Validator Agent ---
+@dataclass
+class _ValidationPlan:
+    """Prompts of one critic step (one per shard for wide tables)"""
+    current_work: List[Dict[str, Any]]
+    accepted_columns: List[str]
+    messages: List[List[BaseMessage]]
+    shard_labels: List[str]  # "Part i/n" per prompt, empty for a single prompt
+
+
 def validator_node(state: AgentState):
-    """6. Define the Validator Agent logic"""
+    """7. Define the Validator Agent logic (semantic review only, mechanical checks ran in node 6)"""
+    deadline = _node_deadline("validate")
+    plan = _plan_validation(state)
+    reviews = _invoke_many("validator", critic_llm, plan.messages, deadline)
+    return _validation_update(state, plan, _combine_reviews(plan, reviews))
+
+
+async def avalidator_node(state: AgentState):
+    """7. Async variant of `validator_node` (shards are reviewed concurrently on the event loop)"""
+    deadline = _node_deadline("validate")
+    plan = _plan_validation(state)
+    reviews = await _ainvoke_many("validator", critic_llm, plan.messages, deadline)
+    return _validation_update(state, plan, _combine_reviews(plan, reviews))
+
 
+def _plan_validation(state: AgentState) -> _ValidationPlan:
     print("--- CRITIC: Reviewing... ---")
 
     model_generation = state['result']
     model_generation_rows = model_generation.rows
     model_generation_summary = model_generation.table_summary
 
-    # Calculate counts to make sure the generator did not lose any row
-    input_table = state.get('entire_table_context', {})
-    expected_rows_count = len(list(input_table.values())[0]) # get number of rows from 1st column in the input table
-    generator_rows_count = len(model_generation_rows) # get number of rows
-    # create a message if there is no match
-    if True:
-        if expected_rows_count != generator_rows_count:
-            mismatch_message = (
-                f"we have row count mismatch: expected {expected_rows_count}, "
-                f"but generated {generator_rows_count}."
-                f'Set is_valid = False and state "Missing columns in output".'
-            )
-        else:
-            mismatch_message = " it is great, row count matches expected number."
+    # Rows accepted in a previous iteration are pinned and not reviewed again. Rows filled
+    # entirely by the master files are the source of truth: never reviewed, always pinned
+    _, master_rows = split_rows_by_placeholder(
+        state.get('entire_table_context'), cfg_dataset.placeholder_pattern, cfg_dataset.placeholder_fields
+    )
+    accepted_columns = list(dict.fromkeys(
+        list(state.get('accepted_columns') or []) + [r["column_name"] for r in master_rows]
+    ))
 
     # Format the current work of the Generator
     current_work = [{"row_number": i + 1, **c.model_dump()}
-                    for i, c in enumerate(model_generation_rows)]
-
-    # Bring context from state
-    rag_company_context = state.get('RAG_company_context', "No additional context provided.")
-    full_table_context = state.get('entire_table_context', {})
-
-    # Format the prompt using LangChain's template
-    formatted_messages = VALIDATOR_PROMPT.format_messages(
-        rag_company_context=rag_company_context,
-        full_table_context=full_table_context,
-        current_work=current_work,
-        current_work_table_summary = model_generation_summary,
-        mismatch_message=mismatch_message
+                    for i, c in enumerate(model_generation_rows)
+                    if c.column_name not in accepted_columns]
+
+    shards = _table_shards(state)
+    if len(shards) == 1:
+        # Format the prompt using LangChain's template (same shared prefix as the generator)
+        formatted_messages = VALIDATOR_PROMPT.format_messages(
+            **_shared_prompt_context(state),
+            current_work=encode_table(current_work, cfg_agent.prompt_table_encoding),
+            current_work_table_summary = model_generation_summary,
+        )
+        return _ValidationPlan(current_work, accepted_columns, [formatted_messages], [""])
+
+    # Wide tables: every shard is reviewed with the same shard prefix as the generator
+    messages, labels = [], []
+    for index, columns in enumerate(shards):
+        wanted = set(columns)
+        shard_work = [r for r in current_work if r["column_name"] in wanted]
+        if not shard_work:
+            continue
+        messages.append(VALIDATOR_PROMPT.format_messages(
+            **_shard_prompt_context(state, columns, index, len(shards)),
+            current_work=encode_table(shard_work, cfg_agent.prompt_table_encoding),
+            current_work_table_summary=model_generation_summary,
+        ))
+        labels.append(f"Part {index + 1}/{len(shards)}")
+    print(f"Sharded validation: {len(messages)} of {len(shards)} shard(s) to review")
+
+    return _ValidationPlan(current_work, accepted_columns, messages, labels)
+
+
+def _combine_reviews(plan: _ValidationPlan, reviews: List[ValidationResult]) -> ValidationResult:
+    """Single review as-is; shard reviews combined (valid only if every shard is valid)"""
+    if len(reviews) == 1 and not plan.shard_labels[0]:
+        return reviews[0]
+
+    return ValidationResult(
+        is_valid=all(review.is_valid for review in reviews),
+        feedback="\n".join(f"{label}: {review.feedback}" for label, review in zip(plan.shard_labels, reviews) if review.feedback),
+        row_verdicts=[v for review in reviews for v in review.row_verdicts],
     )
 
-    review = critic_llm.invoke(formatted_messages)
+
+def _validation_update(state: AgentState, plan: _ValidationPlan, review: ValidationResult) -> AgentState:
+    # Row-level verdicts: only rows explicitly accepted get pinned, rejected rows get regenerated
+    reviewed_columns = [row["column_name"] for row in plan.current_work]
+    verdicts = {v.column_name: v for v in review.row_verdicts if v.column_name in reviewed_columns}
+    rejected_columns = {c: v.feedback for c, v in verdicts.items() if not v.is_valid}
+    if review.is_valid and not rejected_columns:
+        accepted_columns = plan.accepted_columns + reviewed_columns
+    else:
+        accepted_columns = plan.accepted_columns + [c for c, v in verdicts.items() if v.is_valid]
+
+    if not review.is_valid and not verdicts:
+        # Failed review without row verdicts: every reviewed row is regenerated
+        rejected_columns = {c: "See the critic feedback." for c in reviewed_columns}
 
     # if false (i.e. not valid):
-    if not review.is_valid:
+    if not review.is_valid or rejected_columns:
         print(f"--- CRITIC FEEDBACK:\n {review.feedback} ---")
+        if rejected_columns:
+            print(f"--- Rows rejected: {list(rejected_columns)} | rows pinned: {len(accepted_columns)} ---")
+        elif set(reviewed_columns) <= set(accepted_columns):
+            print("--- All rows accepted, table summary rejected ---")
         return {
-            "error_message": review.feedback,
+            "error_message": review.feedback or "Some rows were rejected.",
+            "accepted_columns": accepted_columns,
+            "rejected_columns": rejected_columns,
             "review_history_validator": [f"Step {state['iterations']} Critic: {review.feedback}"]
         }
 
     # if all good and no feedback:
     return {
         "error_message": "none",
+        "accepted_columns": accepted_columns,
+        "rejected_columns": {},
         "review_history_validator": [f"Critique (Passed): {review.feedback}"]
-    }
\ No newline at end of file
+    }
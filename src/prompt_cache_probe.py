@@ -0,0 +1,53 @@
+import os
+import threading
+from collections import deque
+from typing import Dict, Sequence
+
+from utils.token_counter import estimate_tokens
+
+
+def render_messages(messages: Sequence) -> str:
+    """Flatten chat messages into the text the provider sees (role + content, in order)"""
+    return "".join(f"<{m.type}>\n{m.content}\n" for m in messages)
+
+
+class PrefixReuseProbe:
+    """
+    Measurement hook for provider-side prompt caching.
+
+    For every LLM call, reports the longest prefix the prompt shares with one of the
+    last `history` prompts of this process (across iterations, agents and tables).
+    `stats` keeps running totals per node (calls, shared and total prompt tokens).
+    """
+
+    def __init__(self, history: int = 16):
+        self._recent = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def record(self, node_name: str, messages: Sequence) -> int:
+        """
+        Record a prompt and print its shared-prefix length.
+
+        Returns:
+            Estimated number of tokens in the shared prefix
+        """
+        text = render_messages(messages)
+        with self._lock:
+            shared_chars = max((len(os.path.commonprefix([text, prev])) for prev in self._recent), default=0)
+            self._recent.append(text)
+
+        shared_tokens = estimate_tokens(text[:shared_chars])
+        total_tokens = estimate_tokens(text)
+        with self._lock:
+            totals = self.stats.setdefault(node_name, {"calls": 0, "shared_tokens": 0, "total_tokens": 0})
+            totals["calls"] += 1
+            totals["shared_tokens"] += shared_tokens
+            totals["total_tokens"] += total_tokens
+
+        share = 100 * shared_tokens / total_tokens if total_tokens else 0.0
+        print(f"[prompt prefix] {node_name}: ~{shared_tokens}/{total_tokens} tokens shared with a previous prompt ({share:.0f}%)")
+        return shared_tokens
+
+
+prefix_probe = PrefixReuseProbe()
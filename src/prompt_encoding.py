@@ -0,0 +1,90 @@
+import csv
+import io
+import json
+from typing import Any, Callable, Dict, List, Union
+
+import pandas as pd
+
+from utils.token_counter import estimate_tokens
+
+# A table is either column oriented ({column: [values]}) or a list of row records
+Table = Union[Dict[str, List[Any]], List[Dict[str, Any]]]
+
+
+def _to_records(table: Table) -> List[Dict[str, Any]]:
+    if isinstance(table, dict):
+        return pd.DataFrame(table).to_dict(orient="records") if table else []
+    return list(table)
+
+
+def _clean(value: Any) -> Any:
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return ""
+    return value
+
+
+def encode_json_indent(table: Table) -> str:
+    """Legacy format: pretty-printed JSON as-is (column oriented for the template)"""
+    return json.dumps(table, indent=2, ensure_ascii=False, default=str)
+
+
+def encode_json_records(table: Table) -> str:
+    """Minified JSON list of row objects"""
+    records = [{k: _clean(v) for k, v in r.items()} for r in _to_records(table)]
+    return json.dumps(records, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def encode_json_columns(table: Table) -> str:
+    """Minified JSON object with the field names once and rows as lists of values"""
+    records = _to_records(table)
+    columns = list(records[0].keys()) if records else []
+    payload = {"columns": columns, "rows": [[_clean(r.get(c)) for c in columns] for r in records]}
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def encode_delimited(table: Table) -> str:
+    """Pipe-delimited table with one header row (CSV quoting rules for values containing '|')"""
+    records = _to_records(table)
+    if not records:
+        return ""
+    columns = list(records[0].keys())
+    buf = io.StringIO()
+    writer = csv.writer(buf, delimiter="|", lineterminator="\n")
+    writer.writerow(columns)
+    for r in records:
+        writer.writerow([str(_clean(r.get(c))).replace("\n", " ") for c in columns])
+    return buf.getvalue().rstrip("\n")
+
+
+TABLE_ENCODERS: Dict[str, Callable[[Table], str]] = {
+    "json_indent": encode_json_indent,
+    "json_records": encode_json_records,
+    "json_columns": encode_json_columns,
+    "delimited": encode_delimited,
+}
+
+
+def encode_table(table: Table, encoding: str) -> str:
+    """Serialize a table for a prompt with the selected encoder (see TABLE_ENCODERS)"""
+    try:
+        encoder = TABLE_ENCODERS[encoding]
+    except KeyError:
+        raise ValueError(f"Unknown prompt table encoding {encoding!r}, expected one of {list(TABLE_ENCODERS)}")
+    return encoder(table)
+
+
+def encoding_token_report(table: Table, model: str = None) -> Dict[str, int]:
+    """Tokens needed by every available encoding for the same table"""
+    kwargs = {"model": model} if model else {}
+    return {name: estimate_tokens(encoder(table), **kwargs) for name, encoder in TABLE_ENCODERS.items()}
+
+
+def print_encoding_report(table: Table, selected: str, model: str = None) -> Dict[str, int]:
+    """Print the token cost of every encoding relative to the legacy `json_indent` format"""
+    report = encoding_token_report(table, model)
+    baseline = report["json_indent"] or 1
+    print("Prompt table encodings (tokens, saving vs json_indent):")
+    for name, tokens in sorted(report.items(), key=lambda kv: kv[1]):
+        marker = " <- selected" if name == selected else ""
+        print(f"  {name:<13} {tokens:>7}  {100 * (baseline - tokens) / baseline:5.1f}%{marker}")
+    return report
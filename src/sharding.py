@@ -0,0 +1,40 @@
+from typing import Any, Dict, List, Sequence
+
+import pandas as pd
+
+from src.prompt_encoding import encode_table
+from utils.token_counter import estimate_tokens
+
+
+def plan_shards(table_dict: Dict[str, List[Any]], token_budget: int, encoding: str, model: str = None) -> List[List[str]]:
+    """
+    Split the rows of a (column oriented) Business Glossary table into shards of
+    `column_name`s, each costing about `token_budget` prompt tokens in `encoding`.
+
+    Shards keep the table order so related neighbouring columns stay together. The
+    cost of a row is measured with its own header, which slightly overestimates the
+    size of a shard. A single row larger than the budget gets a shard of its own.
+    """
+    records = pd.DataFrame(table_dict).to_dict(orient="records") if table_dict else []
+    kwargs = {"model": model} if model else {}
+
+    shards: List[List[str]] = []
+    current: List[str] = []
+    used = 0
+    for rec in records:
+        cost = estimate_tokens(encode_table([rec], encoding), **kwargs)
+        if current and used + cost > token_budget:
+            shards.append(current)
+            current, used = [], 0
+        current.append(rec["column_name"])
+        used += cost
+    if current:
+        shards.append(current)
+    return shards
+
+
+def select_rows(table_dict: Dict[str, List[Any]], columns: Sequence[str]) -> Dict[str, List[Any]]:
+    """Rows of a column oriented table whose `column_name` is in `columns`, still column oriented"""
+    df = pd.DataFrame(table_dict)
+    return df[df["column_name"].isin(list(columns))].to_dict(orient="list")
+
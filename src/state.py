@@ -47,11 +47,27 @@ class TemplateOutput(BaseModel):
     table_summary: str = Field("Table Level summary of the entire table which would provide a high-level information what this table is about, what kind of information it contains, and what is the main purpose of this table. This summary should be concise, ideally not more than 2-3 sentences.")
 
 
+class TableSummaryOutput(BaseModel):
+    table_summary: str = Field(
+        description="Table Level summary of the entire table which would provide a high-level information what this table is about, what kind of information it contains, and what is the main purpose of this table. This summary should be concise, ideally not more than 2-3 sentences.")
+
+
+class RowVerdict(BaseModel):
+    column_name: str = Field(
+        description="The exact `column_name` of the reviewed row.")
+    is_valid: bool = Field(
+        description="True if the definitions of this row are sensible and complete.")
+    feedback: str = Field(default='',
+        description="If is_valid is False, provide specific instructions on what to fix in this row.")
+
+
 class ValidationResult(BaseModel):
     is_valid: bool = Field(
         description="True if all definitions are sensible and all columns are present.")
     feedback: str = Field(
         description="If is_valid is False, provide specific instructions on what to fix.")
+    row_verdicts: List[RowVerdict] = Field(default_factory=list,
+        description="One verdict for every reviewed row of the Data Table.")
 
 
 # --- LangGraph State Definition ---
@@ -59,13 +75,16 @@ class ValidationResult(BaseModel):
 class AgentState(TypedDict, total=False):
     # Configuration & Inputs
     framework_def: Dict[str, Any]
+    table_identity: Dict[str, str]
     source_original_table: Dict[str, List[Any]]
+    column_profiles: Dict[str, Dict[str, Any]]  # column_name -> profile of the whole source table (utils.column_profiler)
     master_business_glossary: Dict[str, List[Any]]
     master_data_owner: Dict[str, List[Any]]
 
     # Intermediate RAG Data
     RAG_cols_with_samples: Dict[str, List[Any]]
     RAG_company_context: str
+    RAG_results: Dict[str, Dict[str, Any]]  # column_name -> {"query", "hits"}, repacked per shard for wide tables
 
     # Working Context
     entire_table_context: Dict[str, List[Any]]
@@ -75,4 +94,44 @@ class AgentState(TypedDict, total=False):
     result: TemplateOutput
     error_message: str
     iterations: int
-    review_history_validator: Annotated[List[str], operator.add]
\ No newline at end of file
+    pre_validation_passed: bool
+    accepted_columns: List[str]        # rows accepted by the critic, pinned in later iterations
+    rejected_columns: Dict[str, str]   # column_name -> critic feedback, regenerated in the next iteration
+    review_history_validator: Annotated[List[str], operator.add]
+
+
+def build_initial_state(
+    framework_def: Dict[str, Any],
+    source_original_table: Dict[str, List[Any]],
+    master_business_glossary: Dict[str, List[Any]],
+    master_data_owner: Dict[str, List[Any]],
+    table_identity: Dict[str, str] = None,
+    column_profiles: Dict[str, Dict[str, Any]] = None,
+) -> AgentState:
+    """
+    Build the initial state of a single graph run.
+
+    `table_identity` holds the bucket_name / dataset_name / table_name of the table
+    being documented. When empty, the defaults from ConfigDatasets are used.
+    `column_profiles` are the per-column statistics computed while sampling (optional).
+    """
+    return {
+        "framework_def": framework_def,
+        "table_identity": table_identity or {},
+        "source_original_table": source_original_table,
+        "column_profiles": column_profiles or {},
+        "master_business_glossary": master_business_glossary,
+        "master_data_owner": master_data_owner,
+        "RAG_cols_with_samples": {},
+        "RAG_company_context": "",
+        "RAG_results": {},
+        "entire_table_context": {},
+        "template_df": {},
+        "result": [],
+        "error_message": "",
+        "iterations": 0,
+        "pre_validation_passed": False,
+        "accepted_columns": [],
+        "rejected_columns": {},
+        "review_history_validator": []
+    }
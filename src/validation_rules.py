@@ -0,0 +1,110 @@
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+import pandas as pd
+
+from utils.helpers import has_placeholder
+
+
+@dataclass
+class RuleViolation:
+    """A single failed mechanical check."""
+    rule: str
+    message: str
+    column_name: str = ""   # empty for table-level violations (e.g. row count)
+
+
+def _clean(value: Any) -> str:
+    return "" if value is None or (isinstance(value, float) and pd.isna(value)) else str(value).strip()
+
+
+def run_prevalidation_rules(
+    template_dict: Dict[str, List[Any]],
+    rows: List[Dict[str, Any]],
+    join_keys: List[str],
+    pattern: str,
+    fields: List[str] = None,
+) -> List[RuleViolation]:
+    """
+    Deterministic checks of the generated rows against the pre-generation template.
+
+    Rules:
+        - row_count:        every template row is present exactly once, no extra rows
+        - empty_field:      no field is left empty (unless it was empty in the template)
+        - placeholder_left: no <agent> / <ds_master> tag is left in the output
+        - master_modified:  fields already filled in the template are returned unchanged
+
+    Args:
+        template_dict: Column-oriented template (entire_table_context)
+        rows: Generated rows as dicts (model_dump of ColumnDefOutput)
+        join_keys: Columns identifying a row
+        pattern: Regex matching placeholder tags
+        fields: Fields which can hold a placeholder (all fields if None)
+
+    Returns:
+        List of violations (empty if all rules pass)
+    """
+    violations: List[RuleViolation] = []
+
+    template_rows = pd.DataFrame(template_dict).to_dict(orient="records")
+    template_by_key = {tuple(_clean(r[k]) for k in join_keys): r for r in template_rows}
+
+    # Rule 1: row count / keys
+    seen = set()
+    for row in rows:
+        key = tuple(_clean(row.get(k)) for k in join_keys)
+        if key not in template_by_key:
+            violations.append(RuleViolation("row_count", f"Unexpected row {key[-1]!r} which is not in the input table."))
+        elif key in seen:
+            violations.append(RuleViolation("row_count", f"Row {key[-1]!r} returned more than once."))
+        seen.add(key)
+    missing = [k[-1] for k in template_by_key if k not in seen]
+    if missing:
+        violations.append(RuleViolation(
+            "row_count",
+            f"Row count mismatch: expected {len(template_rows)}, generated {len(rows)}. "
+            f"Missing columns in output: {', '.join(missing)}."
+        ))
+
+    # Rules 2-4: per row and field
+    for row in rows:
+        key = tuple(_clean(row.get(k)) for k in join_keys)
+        template_row = template_by_key.get(key)
+        if template_row is None:
+            continue
+        column_name = key[-1]
+
+        for field, value in row.items():
+            value = _clean(value)
+            template_value = _clean(template_row.get(field)) if field in template_row else None
+            placeholder_field = fields is None or field in fields
+
+            if placeholder_field and has_placeholder(value, pattern):
+                violations.append(RuleViolation(
+                    "placeholder_left", f"Field '{field}' still holds the placeholder {value!r}.", column_name))
+            elif not value and template_value != "":
+                violations.append(RuleViolation(
+                    "empty_field", f"Empty definition for field '{field}'.", column_name))
+            elif template_value and not (placeholder_field and has_placeholder(template_value, pattern)) \
+                    and value != template_value:
+                violations.append(RuleViolation(
+                    "master_modified",
+                    f"Field '{field}' was already filled with {template_value!r} and must not be modified.",
+                    column_name))
+
+    return violations
+
+
+def format_violations(violations: List[RuleViolation]) -> str:
+    """Structured feedback for the generator, grouped by row."""
+    lines = [f"- [{v.rule}] {v.message}" for v in violations if not v.column_name]
+
+    by_column: Dict[str, List[RuleViolation]] = {}
+    for v in violations:
+        if v.column_name:
+            by_column.setdefault(v.column_name, []).append(v)
+    for column_name, items in by_column.items():
+        lines.append(f"- Row '{column_name}':")
+        lines.extend(f"    - [{v.rule}] {v.message}" for v in items)
+
+    return "AUTOMATED CHECKS FAILED:\n" + "\n".join(lines)
@@ -0,0 +1,108 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from utils.api_scheduler import APIScheduler
+
+
+def _scheduler(**kwargs) -> APIScheduler:
+    params = dict(name="test", rpm=0, tpm=0, min_concurrency=1, max_concurrency=8, initial_concurrency=4, backoff_s=0.01)
+    params.update(kwargs)
+    return APIScheduler(**params)
+
+
+def test_cancelled_acall_releases_its_slot():
+    scheduler = _scheduler()
+    started = asyncio.Event()
+
+    async def slow():
+        started.set()
+        await asyncio.sleep(10)
+
+    async def run():
+        task = asyncio.create_task(scheduler.acall(slow))
+        await started.wait()
+        assert scheduler._in_flight == 1
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert scheduler._in_flight == 0
+
+
+def test_interrupted_call_releases_its_slot():
+    scheduler = _scheduler()
+
+    def interrupted():
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        scheduler.call(interrupted)
+    assert scheduler._in_flight == 0
+
+
+class _APIError(Exception):
+    def __init__(self, status_code, retry_after=None):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers={"retry-after": retry_after} if retry_after else {})
+
+
+def _failing(errors):
+    """Raises the given errors one after the other, then returns "ok" """
+    errors = list(errors)
+
+    def fn():
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+    return fn
+
+
+def test_slots_are_released_after_success_and_failure():
+    scheduler = _scheduler(max_retries=0)
+    assert scheduler.call(lambda: "ok") == "ok"
+    with pytest.raises(ValueError):
+        scheduler.call(_failing([ValueError("bad request")]))
+    assert scheduler._in_flight == 0
+    assert scheduler.stats["calls"] == 2
+
+
+def test_rate_limit_halves_concurrency_pauses_and_retries():
+    scheduler = _scheduler(initial_concurrency=8)
+    start = time.monotonic()
+    assert scheduler.call(_failing([_APIError(429, retry_after="0.2")])) == "ok"
+
+    assert time.monotonic() - start >= 0.2  # the retry waited for the global pause
+    assert scheduler.stats["rate_limited"] == 1 and scheduler.stats["retries"] == 1
+    assert scheduler.concurrency_limit == 4  # 8 / 2, then + 1/4 for the successful retry
+    assert scheduler._in_flight == 0
+
+
+def test_overload_halves_concurrency_without_pausing_everyone():
+    scheduler = _scheduler(initial_concurrency=8)
+    assert scheduler.call(_failing([_APIError(529)])) == "ok"
+    assert scheduler.stats["overloaded"] == 1
+    assert scheduler.concurrency_limit == 4
+    assert scheduler._paused_until == 0.0
+
+
+def test_slow_calls_do_not_shrink_concurrency():
+    scheduler = _scheduler(initial_concurrency=4)
+    for _ in range(3):
+        scheduler.call(time.sleep, 0.05)
+    assert scheduler.concurrency_limit >= 4
+
+
+def test_concurrency_recovers_after_back_off():
+    scheduler = _scheduler(min_concurrency=1, max_concurrency=6, initial_concurrency=2, max_retries=0)
+    with pytest.raises(_APIError):
+        scheduler.call(_failing([_APIError(503)]))
+    assert scheduler.concurrency_limit == 1
+
+    for _ in range(30):
+        scheduler.call(lambda: None)
+    assert scheduler.concurrency_limit == 6  # additive increase, capped at max_concurrency
@@ -0,0 +1,48 @@
+from types import SimpleNamespace
+
+from src.checkpointing import invoke_resumable, run_config, thread_id_for
+
+IDENTITY = {"bucket_name": "b", "dataset_name": "d", "table_name": "t"}
+
+
+class FakeApp:
+    """Records the invocations; `snapshots` maps thread id -> (values, next nodes)"""
+
+    checkpointer = object()
+
+    def __init__(self, snapshots):
+        self.snapshots = snapshots
+        self.calls = []
+
+    def get_state(self, config):
+        values, next_nodes = self.snapshots.get(config["configurable"]["thread_id"], ({}, ()))
+        return SimpleNamespace(values=values, next=next_nodes)
+
+    def invoke(self, state, config):
+        self.calls.append((state, config["configurable"]["thread_id"]))
+        return {"result": "fresh"}
+
+
+def test_unfinished_thread_is_resumed():
+    app = FakeApp({"t1": ({"iterations": 1}, ("validate",))})
+    invoke_resumable(app, {"x": 1}, run_config(20, "t1"))
+    assert app.calls == [(None, "t1")]
+
+
+def test_completed_thread_runs_again_in_a_new_thread():
+    app = FakeApp({"t1": ({"result": "old"}, ()), "t1#2": ({"result": "old"}, ())})
+    output = invoke_resumable(app, {"x": 1}, run_config(20, "t1"))
+    assert output == {"result": "fresh"}
+    assert app.calls == [({"x": 1}, "t1#3")]
+
+
+def test_fingerprint_covers_master_data_and_run_inputs():
+    state = {"source_original_table": {"a": [1]}, "master_business_glossary": {"term": ["x"]}}
+    base = thread_id_for(state, "run", IDENTITY, {"model": "m1", "index_version": "v1"})
+
+    assert base.startswith("b.d.t:run:")
+    assert base == thread_id_for(dict(state), "run", IDENTITY, {"model": "m1", "index_version": "v1"})
+    assert base != thread_id_for({**state, "master_business_glossary": {"term": ["y"]}}, "run", IDENTITY,
+                                 {"model": "m1", "index_version": "v1"})
+    assert base != thread_id_for(state, "run", IDENTITY, {"model": "m2", "index_version": "v1"})
+    assert base != thread_id_for(state, "run", IDENTITY, {"model": "m1", "index_version": "v2"})
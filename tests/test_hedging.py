@@ -0,0 +1,54 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from src.hedging import HedgedInvoker
+from utils.api_scheduler import APIScheduler
+
+
+def _scheduler() -> APIScheduler:
+    return APIScheduler(
+        name="test", rpm=0, tpm=0, min_concurrency=1, max_concurrency=1, initial_concurrency=1, backoff_s=0.01
+    )
+
+
+def _runnable(scheduler: APIScheduler, seconds: float):
+    def invoke(messages):
+        return scheduler.call(lambda: (time.sleep(seconds), "ok")[1])
+
+    return SimpleNamespace(invoke=invoke)
+
+
+def test_queued_call_does_not_fire_a_hedge():
+    scheduler = _scheduler()
+    release = threading.Event()
+    holder = threading.Thread(target=scheduler.call, args=(release.wait,))
+    holder.start()
+    while scheduler._in_flight == 0:
+        time.sleep(0.01)
+
+    invoker = HedgedInvoker(initial_delay_s=0.05, scheduler=scheduler)
+    threading.Timer(0.5, release.set).start()
+    assert invoker.invoke("test", _runnable(scheduler, 0), []) == "ok"
+    holder.join()
+
+    assert invoker.counters["test"]["hedges_fired"] == 0
+    # queue time is not latency
+    assert invoker._tracker("test").percentile(50) < 0.25
+
+
+def test_admitted_slow_call_fires_a_hedge():
+    scheduler = APIScheduler(name="test", rpm=0, tpm=0, min_concurrency=1, max_concurrency=2, initial_concurrency=2)
+    invoker = HedgedInvoker(initial_delay_s=0.05, scheduler=scheduler)
+
+    assert invoker.invoke("test", _runnable(scheduler, 0.3), []) == "ok"
+    assert invoker.counters["test"]["hedges_fired"] == 1
+
+
+def test_no_hedge_while_the_scheduler_is_saturated():
+    scheduler = _scheduler()
+    invoker = HedgedInvoker(initial_delay_s=0.05, scheduler=scheduler)
+
+    # the primary holds the only slot: a hedge would just queue behind it
+    assert invoker.invoke("test", _runnable(scheduler, 0.3), []) == "ok"
+    assert invoker.counters["test"]["hedges_fired"] == 0
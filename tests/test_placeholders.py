@@ -0,0 +1,66 @@
+import re
+
+from pydantic import BaseModel
+
+from configs.config_datasets import ConfigDatasets
+from src.validation_rules import run_prevalidation_rules
+from utils.helpers import merge_generated_rows, split_rows_by_placeholder
+
+cfg = ConfigDatasets()
+KEYS = cfg.define_columns_to_fill["key_columns"]
+
+
+class Row(BaseModel):
+    bucket_name: str
+    dataset_name: str
+    table_name: str
+    column_name: str
+    sample_values: str
+    business_name: str
+    data_owner_name: str
+
+
+def _template(sample_values, business_name=cfg.rag_placeholder):
+    return {
+        "bucket_name": ["b"], "dataset_name": ["d"], "table_name": ["t"], "column_name": ["c"],
+        "sample_values": [sample_values], "business_name": [business_name], "data_owner_name": ["Ann"],
+    }
+
+
+def test_pattern_matches_only_the_placeholder_tags():
+    pattern = cfg.placeholder_pattern
+    assert re.search(pattern, "<agent>") and re.search(pattern, "<ds_master>")
+    assert not re.search(pattern, "<NA>")
+    assert not re.search(pattern, "0 < x and y > 1")
+
+
+def test_sample_values_are_not_placeholders():
+    template = _template("1, <NA>, 3", business_name="Amount")
+    rows_to_fill, filled = split_rows_by_placeholder(template, cfg.placeholder_pattern, cfg.placeholder_fields)
+    assert not rows_to_fill and len(filled) == 1
+
+    template = _template("<agent>", business_name="Amount")
+    merged = merge_generated_rows(template, [], KEYS, cfg.placeholder_pattern, Row, fields=cfg.placeholder_fields)
+    assert merged[0].sample_values == "<agent>"
+
+
+def test_generated_rows_keep_sample_values():
+    template = _template("1, <NA>, 3")
+    generated = Row(bucket_name="b", dataset_name="d", table_name="t", column_name="c",
+                    sample_values="1, 2, 3", business_name="Amount", data_owner_name="Ann")
+    merged = merge_generated_rows(template, [generated], KEYS, cfg.placeholder_pattern, Row,
+                                  fields=cfg.placeholder_fields)
+    assert merged[0].sample_values == "1, <NA>, 3"
+    assert merged[0].business_name == "Amount"
+
+
+def test_placeholder_left_ignores_angle_brackets_in_content():
+    template = _template("1, <NA>, 3")
+    row = {k: v[0] for k, v in template.items()}
+    row["business_name"] = "Ratio where 0 < x and y > 1"
+    violations = run_prevalidation_rules(template, [row], KEYS, cfg.placeholder_pattern, cfg.placeholder_fields)
+    assert violations == []
+
+    row["business_name"] = cfg.rag_placeholder
+    violations = run_prevalidation_rules(template, [row], KEYS, cfg.placeholder_pattern, cfg.placeholder_fields)
+    assert [v.rule for v in violations] == ["placeholder_left"]
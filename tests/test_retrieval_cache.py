@@ -0,0 +1,36 @@
+from rag.retrieval_cache import RetrievalCache
+
+
+def _item(query: str):
+    return {"query": query, "hits": [{"page_content": query, "metadata": {}, "score": 1.0}]}
+
+
+def test_new_index_version_purges_only_its_own_scope(tmp_path):
+    cache = RetrievalCache(tmp_path / "cache.sqlite")
+    numpy_v1, chroma_v1 = "v1|numpy|hybrid|model-a", "v1|chroma|vector|model-a"
+    cache.put_many(numpy_v1, {"n1": _item("numpy")})
+
+    # Another configuration sharing the file keeps the entries of the first one
+    other = RetrievalCache(tmp_path / "cache.sqlite")
+    other.put_many(chroma_v1, {"c1": _item("chroma")})
+    assert set(cache.get_many(numpy_v1, ["n1"])) == {"n1"}
+
+    # A rebuilt numpy index drops its older entries only
+    numpy_v2 = "v2|numpy|hybrid|model-a"
+    assert cache.get_many(numpy_v2, ["n1"]) == {}
+    assert cache.get_many(numpy_v1, ["n1"]) == {}
+    assert set(other.get_many(chroma_v1, ["c1"])) == {"c1"}
+
+
+def test_make_key_depends_on_version_and_column_shape():
+    key = RetrievalCache.make_key("v1|numpy|hybrid|m", "Client Name", ["AC100000"], 4)
+    assert key == RetrievalCache.make_key("v1|numpy|hybrid|m", "client_name", ["AC200417"], 4)
+    assert key != RetrievalCache.make_key("v2|numpy|hybrid|m", "client_name", ["AC200417"], 4)
+
+
+def test_make_key_ignores_the_distinct_count_of_the_profile():
+    version = "v1|numpy|hybrid|m"
+    small = RetrievalCache.make_key(version, "client_id", ["100000"], 4, "integer, shape \\d{6}, 312 distinct")
+    large = RetrievalCache.make_key(version, "client_id", ["200417"], 4, "integer, shape \\d{6}, ~1.2k distinct")
+    assert small == large
+    assert small != RetrievalCache.make_key(version, "client_id", ["200417"], 4, "string, shape \\d{6}, 312 distinct")
@@ -0,0 +1,163 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.sampling import ReservoirSampler, sample_arrow, sample_csv, sample_parquet
+
+N_ROWS = 1_000
+
+
+@pytest.fixture
+def table() -> pd.DataFrame:
+    return pd.DataFrame({
+        "id": np.arange(N_ROWS),
+        "name": [f"name_{i:04d}" for i in range(N_ROWS)],
+        "amount": np.linspace(0.0, 1.0, N_ROWS),
+    })
+
+
+def _chunks(df: pd.DataFrame, size: int):
+    for start in range(0, len(df), size):
+        yield df.iloc[start:start + size]
+
+
+def test_reservoir_sampler_is_uniform():
+    df = pd.DataFrame({"id": np.arange(100)})
+    counts = np.zeros(100)
+    trials = 500
+    for seed in range(trials):
+        sampler = ReservoirSampler(10, seed=seed)
+        for chunk in _chunks(df, 7):
+            sampler.add(chunk)
+        counts[sampler.sample()["id"].to_numpy()] += 1
+
+    # Every row is drawn with probability 10/100: 50 expected draws each (sd ~6.7)
+    assert counts.sum() == 10 * trials
+    assert counts.min() > 20 and counts.max() < 80
+    # Early and late rows are equally likely (no bias towards the head of the stream)
+    assert abs(counts[:50].sum() - counts[50:].sum()) < 0.1 * counts.sum()
+
+
+def test_reservoir_sampler_is_seeded_and_keeps_the_original_order():
+    df = pd.DataFrame({"id": np.arange(500)})
+
+    def draw(seed):
+        sampler = ReservoirSampler(20, seed=seed)
+        for chunk in _chunks(df, 64):
+            sampler.add(chunk)
+        return sampler.sample()["id"].tolist()
+
+    assert draw(1) == draw(1)
+    assert draw(1) != draw(2)
+    assert draw(1) == sorted(draw(1))
+
+
+def test_reservoir_sampler_smaller_stream_than_sample():
+    sampler = ReservoirSampler(10, seed=0)
+    sampler.add(pd.DataFrame({"id": [1, 2, 3]}))
+    assert sampler.sample()["id"].tolist() == [1, 2, 3]
+    assert sampler.seen == 3
+
+
+# --- CSV ---
+def test_sample_csv_max_rows_cut_off(tmp_path, table):
+    path = tmp_path / "table.csv"
+    table.to_csv(path, sep=";", index=False)
+
+    sample, report = sample_csv(path, sep=";", sample_size=10, max_rows=200, chunksize=64, seed=0)
+    assert len(sample) == 10
+    assert report.rows_scanned == 200 and report.truncated
+    assert sample["id"].max() < 200
+
+
+def test_sample_csv_max_bytes_cut_off(tmp_path, table):
+    path = tmp_path / "table.csv"
+    table.to_csv(path, sep=";", index=False)
+
+    sample, report = sample_csv(path, sep=";", sample_size=10, max_bytes=1, chunksize=100, seed=0)
+    assert report.truncated and report.chunks == 1
+    assert report.rows_scanned < N_ROWS
+    assert sample["id"].max() < report.rows_scanned
+
+    _, full = sample_csv(path, sep=";", sample_size=10, chunksize=100, seed=0)
+    assert full.rows_scanned == N_ROWS and not full.truncated
+
+
+def test_sample_csv_projection_and_seed(tmp_path, table):
+    path = tmp_path / "table.csv"
+    table.to_csv(path, sep=";", index=False)
+
+    sample, _ = sample_csv(path, sep=";", sample_size=5, columns=["name", "id"], chunksize=100, seed=3)
+    again, _ = sample_csv(path, sep=";", sample_size=5, columns=["name", "id"], chunksize=100, seed=3)
+    assert list(sample.columns) == ["name", "id"]
+    assert sample.equals(again)
+
+    head, _ = sample_csv(path, sep=";", sample_size=5, method="head", columns=["amount"])
+    assert list(head.columns) == ["amount"] and len(head) == 5
+
+
+# --- Parquet / Arrow ---
+@pytest.fixture
+def columnar(tmp_path, table):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    arrow_table = pa.Table.from_pandas(table, preserve_index=False)
+
+    parquet_path = tmp_path / "table.parquet"
+    pq.write_table(arrow_table, parquet_path, row_group_size=100)
+    arrow_path = tmp_path / "table.arrow"
+    with pa.ipc.new_file(str(arrow_path), arrow_table.schema) as writer:
+        for batch in arrow_table.to_batches(max_chunksize=100):
+            writer.write_batch(batch)
+    return {"parquet": (sample_parquet, parquet_path), "arrow": (sample_arrow, arrow_path)}
+
+
+@pytest.mark.parametrize("source", ["parquet", "arrow"])
+def test_columnar_full_scan_and_seed(columnar, source):
+    sample_fn, path = columnar[source]
+    sample, report = sample_fn(path, sample_size=10, chunksize=64, seed=0)
+    again, _ = sample_fn(path, sample_size=10, chunksize=64, seed=0)
+
+    assert len(sample) == 10 and sample.equals(again)
+    assert report.rows_scanned == N_ROWS and not report.truncated
+    assert sample["id"].is_monotonic_increasing
+
+
+@pytest.mark.parametrize("source", ["parquet", "arrow"])
+def test_columnar_max_rows_cut_off(columnar, source):
+    sample_fn, path = columnar[source]
+    sample, report = sample_fn(path, sample_size=10, max_rows=250, seed=0)
+
+    assert report.rows_scanned == 250 and report.truncated
+    assert len(sample) == 10
+    # Row groups of 100 rows are picked at random: whole groups plus the cut one
+    groups = set(sample["id"] // 100)
+    assert len(groups) <= 3
+
+
+@pytest.mark.parametrize("source", ["parquet", "arrow"])
+def test_columnar_max_bytes_cut_off(columnar, source):
+    sample_fn, path = columnar[source]
+    sample, report = sample_fn(path, sample_size=10, max_bytes=1, seed=0)
+
+    assert report.truncated
+    assert report.rows_scanned == 100  # a single row group / record batch
+    assert sample["id"].nunique() == 10 and (sample["id"] // 100).nunique() == 1
+
+
+@pytest.mark.parametrize("source", ["parquet", "arrow"])
+def test_columnar_projection(columnar, source):
+    sample_fn, path = columnar[source]
+    sample, _ = sample_fn(path, sample_size=5, columns=["amount", "id"], seed=0)
+    assert list(sample.columns) == ["amount", "id"]
+
+    with pytest.raises(ValueError):
+        sample_fn(path, sample_size=5, columns=["missing"])
+
+
+@pytest.mark.parametrize("source", ["parquet", "arrow"])
+def test_columnar_head(columnar, source):
+    sample_fn, path = columnar[source]
+    sample, report = sample_fn(path, sample_size=5, method="head")
+    assert sample["id"].tolist() == [0, 1, 2, 3, 4]
+    assert not report.truncated
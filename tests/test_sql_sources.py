@@ -0,0 +1,47 @@
+import sqlite3
+
+import pytest
+
+from utils.sql_sources import SQLConnector, SQLiteConnector, SQLTable, open_connector
+
+
+@pytest.fixture
+def sqlite_path(tmp_path):
+    path = tmp_path / "source.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE accounts (id INTEGER PRIMARY KEY, name TEXT, balance REAL)")
+    conn.executemany("INSERT INTO accounts VALUES (?, ?, ?)", [(i, f"name_{i}", i / 10) for i in range(1, 2001)])
+    conn.execute("DELETE FROM accounts WHERE id % 3 = 0")  # gaps in the rowids
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_connector_interface_is_abstract():
+    with pytest.raises(TypeError):
+        SQLConnector()
+
+    class Incomplete(SQLConnector):
+        def list_tables(self, schema=None):
+            return []
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_sqlite_catalog_and_seeded_sample(sqlite_path):
+    with open_connector(f"sqlite:///{sqlite_path}") as connector:
+        assert isinstance(connector, SQLiteConnector)
+        assert connector.list_tables() == [SQLTable("main", "accounts")]
+        assert [c.name for c in connector.table_schema(connector.resolve("accounts"))] == ["id", "name", "balance"]
+
+        table = connector.resolve("main.accounts")
+        sample = connector.sample(table, 25, columns=["name", "id"], seed=7)
+        assert list(sample.columns) == ["name", "id"]
+        assert len(sample) == 25 and sample["id"].is_unique
+        assert (sample["id"] % 3 != 0).all()
+        assert sample["id"].is_monotonic_increasing
+        assert sample.equals(connector.sample(table, 25, columns=["name", "id"], seed=7))
+
+        with pytest.raises(ValueError):
+            connector.sample(table, 5, columns=["missing"])
@@ -0,0 +1,355 @@
+import asyncio
+import random
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from configs.config_rate_limits import ConfigRateLimits
+from utils.token_counter import estimate_tokens
+
+# Lower value = admitted first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+
+_POLL_S = 0.05
+_MAX_SLEEP_S = 1.0
+
+
+class CallCancelled(Exception):
+    """A queued call was abandoned before the scheduler admitted it (e.g. a losing hedge)"""
+
+
+class CallTicket:
+    """
+    Handle of one logical call across the scheduler: when it was admitted (None while
+    queued) and whether its caller gave up on it. Bound to the calls of the current
+    context with `bind_ticket`.
+    """
+
+    def __init__(self):
+        self.created_at = time.monotonic()
+        self.admitted_at: Optional[float] = None
+        self.cancelled = threading.Event()
+
+    def admit(self) -> None:
+        if self.admitted_at is None:  # retries keep the first admission
+            self.admitted_at = time.monotonic()
+
+
+_current_ticket: ContextVar[Optional[CallTicket]] = ContextVar("api_call_ticket", default=None)
+
+
+def bind_ticket(ticket: Optional[CallTicket]):
+    """Bind `ticket` to the scheduler calls of the current context; returns the reset token"""
+    return _current_ticket.set(ticket)
+
+
+def unbind_ticket(token) -> None:
+    _current_ticket.reset(token)
+
+
+class TokenBucket:
+    """Continuously refilled bucket of `per_minute` units (0 = unlimited)"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` units are available (0 = available now)"""
+        if not self.capacity:
+            return 0.0
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.capacity / 60.0)
+        self.updated = now
+        # A request larger than the bucket waits for a full bucket
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) * 60.0 / self.capacity
+
+    def take(self, amount: float) -> None:
+        if self.capacity:
+            self.level -= min(amount, self.capacity)
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    code = getattr(exc, "status_code", None)
+    if code is None:
+        code = getattr(getattr(exc, "response", None), "status_code", None)
+    return code
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    return _status_code(exc) == 429 or type(exc).__name__ == "RateLimitError"
+
+
+def is_overload_error(exc: BaseException) -> bool:
+    """The API is over capacity (503 / 529): fewer calls in flight, like a 429"""
+    return _status_code(exc) in (503, 529) or type(exc).__name__ in {"OverloadedError", "ServiceUnavailableError"}
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    code = _status_code(exc)
+    return (code is not None and code >= 500) or type(exc).__name__ in {
+        "APITimeoutError", "APIConnectionError", "InternalServerError",
+    }
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class APIScheduler:
+    """
+    Admission control for all calls of the process to one API.
+
+        - requests-per-minute and tokens-per-minute token buckets, charged with the
+          token estimate of a call before it is sent,
+        - adaptive concurrency (AIMD): the number of calls in flight grows with every
+          successful call and is halved on every 429 or overload (503 / 529) response.
+          Latency is not a signal: long structured generations are slow but not
+          a sign of saturation,
+        - a 429 pauses every caller for the backoff period, instead of letting each
+          worker retry on its own,
+        - interactive callers are admitted before batch callers.
+
+    Works for threads (`call`) and asyncio (`acall`) in the same process.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rpm: int,
+        tpm: int,
+        min_concurrency: int = 1,
+        max_concurrency: int = 32,
+        initial_concurrency: int = 8,
+        max_retries: int = 4,
+        backoff_s: float = 2.0,
+    ):
+        self.name = name
+        self.min_concurrency = max(1, min_concurrency)
+        self.max_concurrency = max(self.min_concurrency, max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_s = backoff_s
+
+        self._requests = TokenBucket(rpm)
+        self._tokens = TokenBucket(tpm)
+        self._limit = float(min(max(initial_concurrency, self.min_concurrency), self.max_concurrency))
+        self._in_flight = 0
+        self._waiting = {PRIORITY_INTERACTIVE: 0, PRIORITY_BATCH: 0}
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self.stats: Dict[str, float] = {"calls": 0, "rate_limited": 0, "overloaded": 0, "retries": 0, "wait_s": 0.0}
+
+    @property
+    def concurrency_limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def saturated(self) -> bool:
+        """No free slot, callers queued or paused after a 429: an extra request would only wait"""
+        with self._lock:
+            return (
+                self._in_flight >= int(self._limit)
+                or any(self._waiting.values())
+                or time.monotonic() < self._paused_until
+            )
+
+    # --- admission ---
+    def _try_acquire(self, tokens: int, priority: int) -> float:
+        """Admit the call (returns 0) or return how long to wait before trying again"""
+        now = time.monotonic()
+        with self._lock:
+            if now < self._paused_until:
+                return self._paused_until - now
+            if any(count for p, count in self._waiting.items() if p < priority):
+                return _POLL_S
+            if self._in_flight >= int(self._limit):
+                return _POLL_S
+            wait = max(self._requests.wait_time(1, now), self._tokens.wait_time(tokens, now))
+            if wait > 0:
+                return wait
+            self._requests.take(1)
+            self._tokens.take(tokens)
+            self._in_flight += 1
+            self.stats["calls"] += 1
+            return 0.0
+
+    def _enter_queue(self, priority: int) -> float:
+        with self._lock:
+            self._waiting[priority] += 1
+        return time.monotonic()
+
+    def _leave_queue(self, priority: int, start: float) -> None:
+        with self._lock:
+            self._waiting[priority] -= 1
+            self.stats["wait_s"] += time.monotonic() - start
+
+    def acquire(self, tokens: int, priority: int = PRIORITY_BATCH) -> None:
+        ticket = _current_ticket.get()
+        start = self._enter_queue(priority)
+        try:
+            while True:
+                if ticket is not None and ticket.cancelled.is_set():
+                    raise CallCancelled(f"{self.name}: call abandoned while queued")
+                wait = self._try_acquire(tokens, priority)
+                if wait <= 0:
+                    break
+                time.sleep(min(wait, _MAX_SLEEP_S) * random.uniform(1.0, 1.1))
+        finally:
+            self._leave_queue(priority, start)
+        if ticket is not None:
+            ticket.admit()
+
+    async def aacquire(self, tokens: int, priority: int = PRIORITY_BATCH) -> None:
+        ticket = _current_ticket.get()
+        start = self._enter_queue(priority)
+        try:
+            while True:
+                wait = self._try_acquire(tokens, priority)
+                if wait <= 0:
+                    break
+                await asyncio.sleep(min(wait, _MAX_SLEEP_S) * random.uniform(1.0, 1.1))
+        finally:
+            self._leave_queue(priority, start)
+        if ticket is not None:
+            ticket.admit()
+
+    # --- feedback ---
+    def _succeeded(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._limit = min(self.max_concurrency, self._limit + 1.0 / self._limit)
+
+    def _abandoned(self) -> None:
+        """Release the slot of a call interrupted by cancellation (losing hedge, deadline)"""
+        with self._lock:
+            self._in_flight -= 1
+
+    def _failed(self, exc: BaseException, attempt: int) -> Tuple[bool, float]:
+        """Release the slot of a failed call; returns (retry?, seconds to wait before the retry)"""
+        rate_limited = is_rate_limit_error(exc)
+        overloaded = not rate_limited and is_overload_error(exc)
+        backoff = _retry_after(exc) or self.backoff_s * (2 ** attempt) * random.uniform(1.0, 1.5)
+        with self._lock:
+            self._in_flight -= 1
+            if rate_limited or overloaded:
+                self.stats["rate_limited" if rate_limited else "overloaded"] += 1
+                self._limit = max(self.min_concurrency, self._limit / 2)
+            if rate_limited:
+                self._paused_until = max(self._paused_until, time.monotonic() + backoff)
+
+        retry = (rate_limited or is_transient_error(exc)) and attempt < self.max_retries
+        if not retry:
+            return False, 0.0
+        with self._lock:
+            self.stats["retries"] += 1
+        if rate_limited:
+            print(f"⚠️ {self.name}: rate limited, pausing {backoff:.1f}s (concurrency limit {int(self._limit)})")
+            return True, 0.0  # the global pause already delays the retry
+        return True, backoff
+
+    # --- calls ---
+    def call(self, fn: Callable[..., Any], *args, tokens: int = 0, priority: int = PRIORITY_BATCH, **kwargs) -> Any:
+        """Run `fn(*args, **kwargs)` once admitted; 429 and transient errors are retried"""
+        attempt = 0
+        while True:
+            self.acquire(tokens, priority)
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as exc:
+                retry, wait = self._failed(exc, attempt)
+                if not retry:
+                    raise
+                time.sleep(wait)
+                attempt += 1
+                continue
+            except BaseException:  # KeyboardInterrupt, SystemExit: the slot must not leak
+                self._abandoned()
+                raise
+            self._succeeded()
+            return result
+
+    async def acall(self, fn: Callable[..., Any], *args, tokens: int = 0, priority: int = PRIORITY_BATCH, **kwargs) -> Any:
+        """Async variant of `call`; `fn` returns an awaitable"""
+        attempt = 0
+        while True:
+            await self.aacquire(tokens, priority)
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as exc:
+                retry, wait = self._failed(exc, attempt)
+                if not retry:
+                    raise
+                await asyncio.sleep(wait)
+                attempt += 1
+                continue
+            except BaseException:  # CancelledError of a losing hedge or a node deadline
+                self._abandoned()
+                raise
+            self._succeeded()
+            return result
+
+
+def estimate_messages_tokens(messages: Any) -> int:
+    """Prompt tokens of a list of chat messages (or a plain prompt)"""
+    if isinstance(messages, (list, tuple)):
+        return sum(estimate_tokens(getattr(m, "content", m)) for m in messages)
+    return estimate_tokens(getattr(messages, "content", messages))
+
+
+def rate_limited(runnable, api: str = "chat", priority: int = PRIORITY_BATCH):
+    """
+    Wrap a chat Runnable so every `invoke` / `ainvoke` (and so `batch` / `abatch`)
+    goes through the process-wide scheduler of `api`.
+    """
+    from langchain_core.runnables import RunnableLambda
+
+    scheduler = get_scheduler(api)
+    output_tokens = ConfigRateLimits().chat_output_tokens_estimate
+
+    def _call(messages):
+        tokens = estimate_messages_tokens(messages) + output_tokens
+        return scheduler.call(runnable.invoke, messages, tokens=tokens, priority=priority)
+
+    async def _acall(messages):
+        tokens = estimate_messages_tokens(messages) + output_tokens
+        return await scheduler.acall(runnable.ainvoke, messages, tokens=tokens, priority=priority)
+
+    return RunnableLambda(_call, afunc=_acall, name=f"rate_limited_{api}")
+
+
+_schedulers: Dict[str, APIScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(api: str) -> APIScheduler:
+    """Process-wide scheduler of an API ("chat" or "embeddings"), configured by ConfigRateLimits"""
+    with _schedulers_lock:
+        scheduler = _schedulers.get(api)
+        if scheduler is None:
+            cfg = ConfigRateLimits()
+            limits = {
+                "chat": (cfg.chat_rpm, cfg.chat_tpm),
+                "embeddings": (cfg.embeddings_rpm, cfg.embeddings_tpm),
+            }
+            if api not in limits:
+                raise ValueError(f"Unknown API {api!r}, expected one of {list(limits)}")
+            rpm, tpm = limits[api]
+            scheduler = APIScheduler(
+                name=api,
+                rpm=rpm,
+                tpm=tpm,
+                min_concurrency=cfg.min_concurrency,
+                max_concurrency=cfg.max_concurrency,
+                initial_concurrency=cfg.initial_concurrency,
+                max_retries=cfg.max_retries,
+                backoff_s=cfg.backoff_s,
+            )
+            _schedulers[api] = scheduler
+        return scheduler
@@ -0,0 +1,287 @@
+from itertools import groupby
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Share of the non-null values which must match for a type to be inferred
+_TYPE_THRESHOLD = 0.95
+# Values longer than this are cut before their shape is computed
+_SHAPE_MAX_CHARS = 40
+
+# Types are inferred from the shapes (digits -> 9), so no regex runs on the values themselves
+_SHAPE_TABLE = str.maketrans(
+    "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz",
+    "9" * 10 + "A" * 26 + "a" * 26,
+)
+_NUMERIC_SHAPE = r"[-+]?9+([.,]9+)?"
+_DATE_SHAPE = r"9999-99-99|99[./]99[./]9999"
+_DATETIME_SHAPE = r"9999-99-99[ T]99:99"
+_BOOLEANS = {"true", "false", "yes", "no", "y", "n"}
+
+_SHAPE_CLASSES = {"9": r"\d", "A": "[A-Z]", "a": "[a-z]"}
+_REGEX_SPECIALS = set(".^$*+?{}[]\\|()")
+
+
+def _literal(text: str) -> str:
+    return "".join("\\" + c if c in _REGEX_SPECIALS else c for c in text)
+
+
+def shape_to_regex(shape: str, prefix: str = "") -> str:
+    """
+    Regex of a shape mask (digits -> 9, upper -> A, lower -> a, '*' = cut value),
+    e.g. "AA999999" with prefix "AC" -> `AC\\d{6}`. The prefix is only kept when
+    the shape has more than the prefix (plain words stay generic).
+    """
+    body, cut = (shape[:-1], True) if shape.endswith("*") else (shape, False)
+    if len(prefix) >= len(body):
+        prefix = ""
+    parts = [_literal(prefix)] if prefix else []
+    for char, run in groupby(body[len(prefix):]):
+        n = len(list(run))
+        token = _SHAPE_CLASSES.get(char, _literal(char))
+        parts.append(token if n == 1 else f"{token}{{{n}}}")
+    if cut:
+        parts.append(".*")
+    return "".join(parts)
+
+
+def _shapes(values: pd.Series) -> pd.Series:
+    """Shape mask of every value (digits -> 9, upper -> A, lower -> a, '*' = cut value)"""
+    shapes = values.str.slice(0, _SHAPE_MAX_CHARS).str.translate(_SHAPE_TABLE)
+    return shapes.where(values.str.len() <= _SHAPE_MAX_CHARS, shapes + "*")
+
+
+def _merge_counts(current: pd.Series, chunk_counts: pd.Series, capacity: int) -> pd.Series:
+    """
+    Bounded frequency table: only the `capacity` most frequent items of the chunk are
+    merged and the table is truncated back to `capacity` (heavy hitters survive, the
+    long tail of IDs does not grow the memory).
+    """
+    merged = current.add(chunk_counts.head(capacity), fill_value=0)
+    return merged.nlargest(capacity)
+
+
+class _ColumnProfile:
+    """Running statistics of one column"""
+
+    def __init__(self, top_k: int, sketch_size: int, max_shapes: int):
+        self.top_k = top_k
+        self.sketch_size = sketch_size
+        self.max_shapes = max_shapes
+        self.rows = 0
+        self.nulls = 0
+        self.numeric = 0
+        self.integers = 0
+        self.dates = 0
+        self.datetimes = 0
+        self.booleans = 0
+        self.num_min: Optional[float] = None
+        self.num_max: Optional[float] = None
+        self.str_min: Optional[str] = None
+        self.str_max: Optional[str] = None
+        self.hashes = np.empty(0, dtype=np.uint64)  # k minimum values sketch of the distinct count
+        self.values = pd.Series(dtype="float64")
+        self.shapes = pd.Series(dtype="float64")
+        self.shape_prefixes: Dict[str, str] = {}  # shape -> leading letters shared by all its values ("" = none)
+
+    def add(self, series: pd.Series) -> None:
+        self.rows += len(series)
+        # Every statistic is computed once per distinct value and weighted by its count
+        counts = series.value_counts(dropna=True)
+        counts = counts.groupby(counts.index.astype(str).str.strip()).sum()
+        counts = counts[counts.index != ""].sort_values(ascending=False)
+        self.nulls += len(series) - int(counts.sum())
+        if counts.empty:
+            return
+
+        unique = counts.index.to_series(index=counts.index)
+        shapes = _shapes(unique)
+        shape_counts = counts.groupby(shapes.to_numpy()).sum().sort_values(ascending=False)
+        self._add_types(unique, shapes, shape_counts, counts)
+        self._add_distinct(unique)
+        self._add_values(counts)
+        self._add_shapes(unique, shapes, shape_counts)
+
+    def _add_types(self, unique: pd.Series, shapes: pd.Series, shape_counts: pd.Series, counts: pd.Series) -> None:
+        kinds = shape_counts.index.to_series()
+        count_of = lambda pattern: int(shape_counts[kinds.str.fullmatch(pattern).to_numpy()].sum())
+        self.dates += count_of(_DATE_SHAPE)
+        self.datetimes += count_of(_DATETIME_SHAPE)
+
+        numeric = shapes.isin(kinds[kinds.str.fullmatch(_NUMERIC_SHAPE)]).to_numpy()
+        numbers = pd.to_numeric(unique[numeric].str.replace(",", ".", regex=False), errors="coerce").dropna()
+        self.numeric += int(counts[numbers.index].sum())
+        self.integers += int(counts[numbers.index[numbers % 1 == 0]].sum())
+        if len(numbers):
+            low, high = float(numbers.min()), float(numbers.max())
+            self.num_min = low if self.num_min is None else min(self.num_min, low)
+            self.num_max = high if self.num_max is None else max(self.num_max, high)
+
+        words = shapes.isin(kinds[kinds.str.fullmatch(r"[Aa]{1,5}")]).to_numpy()
+        self.booleans += int(counts[words][unique[words].str.lower().isin(_BOOLEANS).to_numpy()].sum())
+
+        low, high = unique.min(), unique.max()
+        self.str_min = low if self.str_min is None else min(self.str_min, low)
+        self.str_max = high if self.str_max is None else max(self.str_max, high)
+
+    def _add_distinct(self, unique: pd.Series) -> None:
+        hashes = pd.util.hash_pandas_object(unique, index=False).to_numpy(dtype=np.uint64)
+        merged = np.unique(np.concatenate([self.hashes, hashes]))  # sorted
+        self.hashes = merged[:self.sketch_size]
+
+    def _add_values(self, counts: pd.Series) -> None:
+        capacity = self.top_k * 20
+        frequent = counts.head(capacity)
+        frequent = frequent.groupby(frequent.index.str.slice(0, 80)).sum().sort_values(ascending=False)
+        self.values = _merge_counts(self.values, frequent, capacity)
+
+    def _add_shapes(self, unique: pd.Series, shapes: pd.Series, shape_counts: pd.Series) -> None:
+        capacity = self.max_shapes * 10
+        self.shapes = _merge_counts(self.shapes, shape_counts, capacity)
+
+        for shape in shape_counts.index[:capacity]:
+            n_letters = len(shape) - len(shape.lstrip("Aa"))
+            leads = unique[(shapes == shape).to_numpy()].str.slice(0, n_letters).unique() if n_letters else []
+            prefix = leads[0] if len(leads) == 1 else ""
+            if self.shape_prefixes.get(shape, prefix) != prefix:
+                prefix = ""
+            self.shape_prefixes[shape] = prefix
+
+    def _distinct(self) -> Dict[str, Any]:
+        if len(self.hashes) < self.sketch_size:
+            return {"distinct": int(len(self.hashes)), "distinct_exact": True}
+        # KMV estimate: (k - 1) / (k-th smallest hash as a fraction of the hash space)
+        kth = float(self.hashes[-1]) / float(2 ** 64)
+        return {"distinct": int(round((self.sketch_size - 1) / kth)), "distinct_exact": False}
+
+    def _type(self, non_null: int) -> str:
+        if not non_null:
+            return "empty"
+        share = lambda count: count / non_null >= _TYPE_THRESHOLD
+        if share(self.booleans):
+            return "boolean"
+        if share(self.datetimes):
+            return "datetime"
+        if share(self.dates):
+            return "date"
+        if share(self.numeric):
+            return "integer" if self.integers == self.numeric else "decimal"
+        return "string"
+
+    def result(self) -> Dict[str, Any]:
+        non_null = self.rows - self.nulls
+        col_type = self._type(non_null)
+        if col_type in ("integer", "decimal"):
+            low, high = self.num_min, self.num_max
+            if col_type == "integer" and low is not None:
+                low, high = int(low), int(high)
+        else:
+            low, high = self.str_min, self.str_max
+
+        shapes = [
+            [shape_to_regex(shape, self.shape_prefixes.get(shape, "")), round(float(count) / non_null, 3)]
+            for shape, count in self.shapes.head(self.max_shapes).items()
+        ] if non_null else []
+
+        return {
+            "type": col_type,
+            "rows": int(self.rows),
+            "non_null": int(non_null),
+            "null_rate": round(self.nulls / self.rows, 3) if self.rows else 0.0,
+            **self._distinct(),
+            "min": low,
+            "max": high,
+            "top_values": [[value, int(count)] for value, count in self.values.head(self.top_k).items()],
+            "shapes": shapes,
+        }
+
+
+class ColumnProfiler:
+    """
+    Compact per-column statistics of a table, computed in one streaming pass over
+    DataFrame chunks (vectorized per chunk):
+        - inferred type (integer / decimal / date / datetime / boolean / string),
+        - null rate, distinct count (exact up to `sketch_size`, then a KMV estimate),
+        - min / max, `top_k` most frequent values,
+        - regex shape signatures of the values (e.g. `AC\\d{6}`, `\\d{4}-\\d{2}-\\d{2}`).
+
+    Memory is bounded per column (sketch + truncated frequency tables), not by the
+    number of rows. Counts of the top values and shapes are approximate for columns
+    whose frequent values are spread across chunks.
+    """
+
+    def __init__(self, top_k: int = 5, sketch_size: int = 1024, max_shapes: int = 3):
+        self.top_k = top_k
+        self.sketch_size = sketch_size
+        self.max_shapes = max_shapes
+        self._columns: Dict[str, _ColumnProfile] = {}
+
+    def add(self, chunk: pd.DataFrame) -> None:
+        for column in chunk.columns:
+            profile = self._columns.get(column)
+            if profile is None:
+                profile = _ColumnProfile(self.top_k, self.sketch_size, self.max_shapes)
+                self._columns[column] = profile
+            profile.add(chunk[column])
+
+    def profiles(self) -> Dict[str, Dict[str, Any]]:
+        """Column name -> profile (JSON serializable, kept in the graph state)"""
+        return {column: profile.result() for column, profile in self._columns.items()}
+
+
+# --- Prompt / query formatting ---
+def _compact_number(n: int) -> str:
+    for size, suffix in ((1_000_000_000, "B"), (1_000_000, "M"), (1_000, "k")):
+        if n >= size:
+            return f"{n / size:.1f}{suffix}"
+    return str(n)
+
+
+def profile_hint(profile: Dict[str, Any]) -> str:
+    """One-line description of a column profile, e.g. `integer, shape \\d{6}, ~1.2k distinct`"""
+    if not profile:
+        return ""
+    parts = [profile["type"]]
+    if profile.get("shapes"):
+        parts.append(f"shape {profile['shapes'][0][0]}")
+    distinct = _compact_number(profile["distinct"])
+    parts.append(f"{distinct if profile.get('distinct_exact') else '~' + distinct} distinct")
+    return ", ".join(parts)
+
+
+def frequent_values(profile: Dict[str, Any], min_share: float = 0.01) -> List[Tuple[str, float]]:
+    """
+    (value, share of the non-null rows) of the most frequent values of a column. Values
+    under `min_share` and values of mostly unique columns (IDs, amounts) say nothing about
+    the column, its range and shape do.
+    """
+    non_null = max(1, (profile or {}).get("non_null", 0))
+    if (profile or {}).get("distinct", 0) >= 0.5 * non_null:
+        return []
+    return [
+        (str(value), count / non_null)
+        for value, count in (profile or {}).get("top_values", [])
+        if count / non_null >= min_share
+    ]
+
+
+def profiles_table(profiles: Dict[str, Dict[str, Any]], columns: List[str] = None) -> Dict[str, List[Any]]:
+    """Column oriented table of the profiles of `columns` (all by default), for encode_table"""
+    table: Dict[str, List[Any]] = {
+        "column_name": [], "type": [], "null_rate": [], "distinct": [], "range": [], "top_values": [], "shapes": [],
+    }
+    for column in (profiles if columns is None else columns):
+        profile = profiles.get(column)
+        if not profile:
+            continue
+        distinct = _compact_number(profile["distinct"])
+        table["column_name"].append(column)
+        table["type"].append(profile["type"])
+        table["null_rate"].append(f"{profile['null_rate']:.0%}")
+        table["distinct"].append(distinct if profile["distinct_exact"] else f"~{distinct}")
+        table["range"].append("" if profile["min"] is None else f"{profile['min']} .. {profile['max']}")
+        frequent = [f"{value} ({share:.0%})" for value, share in frequent_values(profile)]
+        table["top_values"].append(", ".join(frequent) or "(no frequent value)")
+        table["shapes"].append(", ".join(f"{regex} ({share:.0%})" for regex, share in profile["shapes"]))
+    return table
@@ -1,6 +1,15 @@
+from pathlib import Path
+
 import pandas as pd
 from configs.config_paths import ConfigPaths#, BigQueryConfig
 from configs.config_datasets import ConfigDatasets
+from utils.sampling import ReservoirSampler, sample_csv, sample_parquet, sample_arrow
+from utils.column_profiler import ColumnProfiler
+from utils.sql_sources import SQLConnector, SQLTable, open_connector
+
+PARQUET_SUFFIXES = (".parquet", ".pq")
+ARROW_SUFFIXES = (".feather", ".arrow", ".ipc")
+SOURCE_SUFFIXES = (".csv",) + PARQUET_SUFFIXES + ARROW_SUFFIXES
 
 def validate_expected_columns_in_masters(
     dict_loaded: dict,
@@ -39,27 +48,116 @@ def validate_expected_columns_in_masters(
     return True
 
 
-def load_csv_data(config: ConfigPaths, config_datasets: ConfigDatasets):
+def load_main_dataset(path, config: ConfigPaths):
     """
-    Load data from CSV files.
+    Load the sample rows and the column profiles of a single source table.
+
+    The file is streamed once in chunks: a bounded reservoir keeps the sampled rows and
+    the column profiler keeps per-column statistics, so memory does not grow with the
+    table (see the sample_* and profile_* settings of ConfigPaths). Parquet and
+    Feather / Arrow files are read column-projected, from randomly chosen row groups
+    only (metadata + sampled row groups, never the whole file).
 
     Args:
-        config: Configuration object with file paths
-        config_datasets : Configuration for the datasets structure and naming
+        path: Path to the source table (CSV, Parquet, Feather / Arrow IPC)
+        config: Configuration object with the CSV, sampling and profiling settings
 
     Returns:
-        Tuple of (original_sample_dict, bg_glossary_dict, ds_master_dict)
+        Tuple of (sample as a column-oriented dict, column profiles: column -> profile dict)
     """
-    print("⏳ Loading data from CSV files...")
-
-    ### 1. Load main dataset
-    df_main = pd.read_csv(config.main_dataset, sep=config.csv_separator)
-    df_sample = df_main.head(3) ## <---- define how rows will have the sample data on input
+    profiler = _profiler(config)
+    df_sample, report = _sample_source(path, config, profiler)
     original_sample_dict = df_sample.to_dict(orient='list')
-    print(f"✅ Loaded sample dataset: {len(df_main)} rows")
+    column_profiles = profiler.profiles() if profiler is not None else {}
+    print(f"✅ Loaded sample dataset: {report.summary()}"
+          + (f", {len(column_profiles)} column(s) profiled" if column_profiles else ""))
+    if report.truncated:
+        print(f"⚠️ Sample and profiles cover only the {report.rows_scanned} scanned row(s) "
+              f"(the head of a CSV file) - raise sample_max_bytes / sample_max_rows to cover the whole table")
+    return original_sample_dict, column_profiles
+
+
+def _profiler(config: ConfigPaths):
+    if not config.profile_columns:
+        return None
+    return ColumnProfiler(
+        top_k=config.profile_top_k,
+        sketch_size=config.profile_sketch_size,
+        max_shapes=config.profile_max_shapes,
+    )
+
+
+def _sample_source(path, config: ConfigPaths, profiler):
+    """Sampling backend by file type"""
+    options = dict(
+        sample_size=config.sample_size,
+        method=config.sample_method,
+        max_rows=config.sample_max_rows,
+        max_bytes=config.sample_max_bytes,
+        chunksize=config.sample_chunksize,
+        seed=config.sample_seed,
+        profiler=profiler,
+        columns=config.source_columns,
+    )
+    suffix = Path(path).suffix.lower()
+    if suffix in PARQUET_SUFFIXES:
+        return sample_parquet(path, **options)
+    if suffix in ARROW_SUFFIXES:
+        return sample_arrow(path, **options)
+    return sample_csv(path, sep=config.csv_separator, decimal=config.csv_decimal, **options)
+
+
+def read_table(path, config: ConfigPaths) -> pd.DataFrame:
+    """Read a whole (small) table, e.g. a master file, from CSV, Parquet or Feather / Arrow"""
+    suffix = Path(path).suffix.lower()
+    if suffix in PARQUET_SUFFIXES:
+        return pd.read_parquet(path)
+    if suffix in ARROW_SUFFIXES:
+        return pd.read_feather(path)
+    return pd.read_csv(path, sep=config.csv_separator)
+
+
+def load_sql_table(connector: SQLConnector, table: SQLTable, config: ConfigPaths):
+    """
+    Load the sample rows and the column profiles of a table of a SQL source.
+
+    Sampling runs in the database (see SQLConnector.sample): `sql_profile_rows` random
+    rows are fetched for the column profiles and the sample is drawn from them.
+
+    Returns:
+        Tuple of (sample as a column-oriented dict, column profiles: column -> profile dict)
+    """
+    profiler = _profiler(config)
+    n_rows = max(config.sample_size, config.sql_profile_rows) if profiler is not None else config.sample_size
+    df_rows = connector.sample(table, n_rows, columns=config.source_columns, seed=config.sample_seed)
+
+    sampler = ReservoirSampler(config.sample_size, seed=config.sample_seed)
+    sampler.add(df_rows)
+    df_sample = sampler.sample() if len(df_rows) else df_rows
+    column_profiles = {}
+    if profiler is not None:
+        profiler.add(df_rows)
+        column_profiles = profiler.profiles()
+
+    print(f"✅ Loaded sample of {connector.dialect} table {table}: {len(df_sample)} row(s) "
+          f"from {len(df_rows)} sampled in the database"
+          + (f", {len(column_profiles)} column(s) profiled" if column_profiles else ""))
+    return df_sample.to_dict(orient='list'), column_profiles
+
+
+def load_master_files(config: ConfigPaths, config_datasets: ConfigDatasets):
+    """
+    Load the master files shared by every table (business glossary & data stewards).
 
-    ### 2. Load master business glossary & rename columns
-    df_glossary = pd.read_csv(config.master_glossary, sep=config.csv_separator)
+    Args:
+        config: Configuration object with file paths
+        config_datasets : Configuration for the datasets structure and naming
+
+    Returns:
+        Tuple of (bg_glossary_dict, ds_master_dict)
+    """
+    ### 1. Load master business glossary & rename columns
+    df_glossary = read_table(config.master_glossary, config)
 
     # Drop unwanted columns
     # cols_to_drop = [col for col in config_datasets.columns_to_drop if col in df_glossary.columns]
@@ -69,13 +167,57 @@ def load_csv_data(config: ConfigPaths, config_datasets: ConfigDatasets):
     bg_glossary_dict = df_glossary.to_dict(orient='list')
     print(f"✅ Loaded master glossary: {len(df_glossary)} rows")
 
-    ### 3. Load data stewards & rename columns
-    df_stewards = pd.read_csv(config.data_stewards, sep=config.csv_separator)
+    ### 2. Load data stewards & rename columns
+    df_stewards = read_table(config.data_stewards, config)
     df_stewards = df_stewards.rename(columns=config_datasets.column_mappings_master_data_owners)
     ds_master_dict = df_stewards.to_dict(orient='list')
     print(f"✅ Loaded data stewards: {len(df_stewards)} rows")
 
-    return original_sample_dict, bg_glossary_dict, ds_master_dict
+    return bg_glossary_dict, ds_master_dict
+
+
+def load_csv_data(config: ConfigPaths, config_datasets: ConfigDatasets):
+    """
+    Load data from files (CSV, Parquet or Feather / Arrow, by extension).
+
+    Args:
+        config: Configuration object with file paths
+        config_datasets : Configuration for the datasets structure and naming
+
+    Returns:
+        Tuple of (original_sample_dict, bg_glossary_dict, ds_master_dict, column_profiles)
+    """
+    print("⏳ Loading data from files...")
+
+    ### 1. Load main dataset
+    original_sample_dict, column_profiles = load_main_dataset(config.main_dataset, config)
+
+    ### 2. Load master files
+    bg_glossary_dict, ds_master_dict = load_master_files(config, config_datasets)
+
+    return original_sample_dict, bg_glossary_dict, ds_master_dict, column_profiles
+
+
+def load_sql_data(config: ConfigPaths, config_datasets: ConfigDatasets):
+    """
+    Load the main table from the SQL source `config.sql_source` (table `config.sql_table`)
+    and the master files.
+
+    Returns:
+        Tuple of (original_sample_dict, bg_glossary_dict, ds_master_dict, column_profiles)
+    """
+    if not config.sql_table:
+        raise ValueError("ConfigPaths.sql_table must be set together with sql_source")
+    print(f"⏳ Loading data from {config.sql_source}...")
+
+    ### 1. Sample the main table in the database
+    with open_connector(config.sql_source) as connector:
+        original_sample_dict, column_profiles = load_sql_table(connector, connector.resolve(config.sql_table), config)
+
+    ### 2. Load master files
+    bg_glossary_dict, ds_master_dict = load_master_files(config, config_datasets)
+
+    return original_sample_dict, bg_glossary_dict, ds_master_dict, column_profiles
 
 
 def load_data(config: ConfigPaths, config_datasets: ConfigDatasets):
@@ -88,9 +230,10 @@ def load_data(config: ConfigPaths, config_datasets: ConfigDatasets):
         config_datasets : Configuration for the datasets structure and naming
 
     Returns:
-        Tuple of (original_sample_dict, bg_glossary_dict, ds_master_dict)
+        Tuple of (original_sample_dict, bg_glossary_dict, ds_master_dict, column_profiles)
     """
     # if isinstance(config, BigQueryConfig) and config.use_bigquery:
     #     return load_bigquery_data(config)
-    # else:
+    if config.sql_source:
+        return load_sql_data(config, config_datasets)
     return load_csv_data(config, config_datasets)
\ No newline at end of file
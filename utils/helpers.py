@@ -1,5 +1,6 @@
+import re
 import pandas as pd
-from typing import Iterable, List, Dict
+from typing import Iterable, List, Dict, Tuple, Any
 from pydantic import BaseModel
 from typing import Type
 from datetime import datetime
@@ -85,15 +86,96 @@ def check_columns_with_pydantic(df: pd.DataFrame, schema: Type[BaseModel]) -> bo
 
 
 
-def save_outputs(df_result, context_text, table_summary_text, cfg_paths):
+def has_placeholder(value: Any, pattern: str) -> bool:
+    """True if a cell still contains a placeholder tag (e.g. <agent>, <ds_master>)."""
+    return bool(re.search(pattern, str(value)))
+
+
+def row_has_placeholder(row: Dict[str, Any], pattern: str, fields: List[str] = None) -> bool:
+    """True if any of `fields` (all fields if None) of a row still holds a placeholder tag."""
+    return any(has_placeholder(v, pattern) for k, v in row.items() if fields is None or k in fields)
+
+
+def split_rows_by_placeholder(
+    table_dict: Dict[str, List[Any]],
+    pattern: str,
+    fields: List[str] = None,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Split a column-oriented table into row records which still hold placeholders
+    (in `fields`, all fields if None) and rows which are already completely filled.
+
+    Returns:
+        Tuple of (rows_to_fill, filled_rows)
+    """
+    records = pd.DataFrame(table_dict).to_dict(orient="records")
+    rows_to_fill, filled_rows = [], []
+    for rec in records:
+        if row_has_placeholder(rec, pattern, fields):
+            rows_to_fill.append(rec)
+        else:
+            filled_rows.append(rec)
+    return rows_to_fill, filled_rows
+
+
+def merge_generated_rows(
+    template_dict: Dict[str, List[Any]],
+    generated_rows: List[BaseModel],
+    join_keys: List[str],
+    pattern: str,
+    row_schema: Type[BaseModel],
+    filled_source: str = "Master Business Glossary",
+    fields: List[str] = None,
+) -> List[BaseModel]:
+    """
+    Merge rows generated by the Agent back into the template, deterministically.
+
+    The template order and row count are kept. For every template row:
+        - fields which were already filled are kept exactly as in the template,
+        - fields holding a placeholder take the generated value (matched by `join_keys`),
+        - if nothing was generated for the row, its placeholders are left in place
+          (so the validator can flag the row).
+    Rows which were completely filled get `filled_source` as citation and source.
+    Only `fields` (all fields if None) are checked for placeholders.
+    """
+    generated_by_key = {
+        tuple(str(getattr(r, k)) for k in join_keys): r.model_dump()
+        for r in generated_rows
+    }
+    extra_fields = [f for f in row_schema.model_fields if f not in template_dict]
+
+    merged: List[BaseModel] = []
+    for rec in pd.DataFrame(template_dict).to_dict(orient="records"):
+        row = {k: "" if pd.isna(v) else str(v) for k, v in rec.items()}
+        generated = generated_by_key.get(tuple(row[k] for k in join_keys))
+
+        if not row_has_placeholder(row, pattern, fields):
+            row.update({f: filled_source for f in extra_fields})
+        elif generated is None:
+            row.update({f: "" for f in extra_fields})
+        else:
+            for col, value in row.items():
+                if (fields is None or col in fields) and has_placeholder(value, pattern):
+                    row[col] = generated.get(col, value)
+            row.update({f: generated.get(f, "") for f in extra_fields})
+
+        merged.append(row_schema(**row))
+
+    return merged
+
+
+def save_outputs(df_result, context_text, table_summary_text, cfg_paths, filename_prefix: str = ""):
     """
     Saving the final results of the Agent into separate files along with
-    the timestamp
+    the timestamp. `filename_prefix` (e.g. the table key in batch runs) keeps the
+    outputs of tables finishing within the same second apart.
     """
 
     cfg_paths.output_dir.mkdir(parents=True, exist_ok=True)
 
     timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    if filename_prefix:
+        timestamp = f"{timestamp}_{filename_prefix}"
 
     files = {
         "csv": cfg_paths.output_dir / f"{timestamp}_{cfg_paths.output_filename_suffix_final_table}.csv",
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Type
+
+from pydantic import BaseModel
+
+LLM_CACHE_MODES = ("off", "read_write", "replay")
+
+
+class LLMCacheMiss(LookupError):
+    """Replay-only mode: the response of a prompt is not in the cache (no LLM call is made)"""
+
+
+def render_prompt(messages: Any) -> str:
+    """Canonical text of a prompt (role + content of every message, in order)"""
+    if isinstance(messages, (list, tuple)):
+        return "".join(f"<{getattr(m, 'type', 'text')}>\n{getattr(m, 'content', m)}\n" for m in messages)
+    return str(getattr(messages, "content", messages))
+
+
+def schema_fingerprint(schema: Optional[Type[BaseModel]]) -> str:
+    """Hash of the JSON schema of a structured output (changes to fields or descriptions invalidate entries)"""
+    if schema is None:
+        return "text"
+    raw = json.dumps(schema.model_json_schema(), sort_keys=True)
+    return f"{schema.__name__}:{hashlib.sha256(raw.encode('utf-8')).hexdigest()[:16]}"
+
+
+class LLMResponseCache:
+    """
+    Persistent cache of LLM responses (SQLite), keyed by
+    (model, sha256 of the prompt, output schema).
+
+    Only meaningful for deterministic calls (temperature 0). Above `max_entries`
+    the least recently used entries are evicted.
+    """
+
+    def __init__(self, path: Path, max_entries: int = 20_000):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                cache_key TEXT PRIMARY KEY,
+                model     TEXT NOT NULL,
+                schema    TEXT NOT NULL,
+                response  TEXT NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses (last_used)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, messages: Any, schema: Optional[Type[BaseModel]] = None) -> str:
+        prompt_hash = hashlib.sha256(render_prompt(messages).encode("utf-8")).hexdigest()
+        raw = f"{model}\x00{prompt_hash}\x00{schema_fingerprint(schema)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM responses WHERE cache_key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE responses SET last_used = ? WHERE cache_key = ?", (time.time(), key))
+            self._conn.commit()
+        return row[0]
+
+    def put(self, key: str, model: str, schema: str, response: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (cache_key, model, schema, response, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, model, schema, response, time.time()),
+            )
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE cache_key IN "
+                    "(SELECT cache_key FROM responses ORDER BY last_used ASC LIMIT ?)",
+                    (overflow,),
+                )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+
+class CachedLLM:
+    """
+    Read-through cache for the calls of one model and output schema.
+
+    Modes:
+        - "off": every call goes to the LLM
+        - "read_write": cached responses are reused, new responses are stored
+        - "replay": cached responses only, a miss raises LLMCacheMiss (CI / benchmark replays)
+
+    Responses are stored as JSON of the Pydantic `schema`, or as the message text
+    when there is no schema.
+    """
+
+    def __init__(self, cache: Optional[LLMResponseCache], model: str, schema: Optional[Type[BaseModel]] = None, mode: str = "off"):
+        if mode not in LLM_CACHE_MODES:
+            raise ValueError(f"Unknown LLM cache mode {mode!r}, expected one of {list(LLM_CACHE_MODES)}")
+        self.cache = cache if mode != "off" else None
+        self.model = model
+        self.schema = schema
+        self.mode = mode
+
+    def _encode(self, response: Any) -> str:
+        if self.schema is not None:
+            return response.model_dump_json()
+        return json.dumps({"content": getattr(response, "content", response)}, ensure_ascii=False)
+
+    def _decode(self, payload: str) -> Any:
+        if self.schema is not None:
+            return self.schema.model_validate_json(payload)
+        from langchain_core.messages import AIMessage
+        return AIMessage(content=json.loads(payload)["content"])
+
+    def _lookup(self, messages: Any):
+        key = LLMResponseCache.make_key(self.model, messages, self.schema)
+        payload = self.cache.get(key)
+        if payload is None and self.mode == "replay":
+            raise LLMCacheMiss(f"No cached response for {self.model} / {schema_fingerprint(self.schema)} (key {key[:12]})")
+        return key, (self._decode(payload) if payload is not None else None)
+
+    def _store(self, key: str, response: Any) -> None:
+        if response is not None:
+            self.cache.put(key, self.model, schema_fingerprint(self.schema), self._encode(response))
+
+    def invoke(self, messages: Any, compute: Callable[[], Any]) -> Any:
+        """Cached response of `messages`, or `compute()` (the actual LLM call) on a miss"""
+        if self.cache is None:
+            return compute()
+        key, cached = self._lookup(messages)
+        if cached is not None:
+            return cached
+        response = compute()
+        self._store(key, response)
+        return response
+
+    async def ainvoke(self, messages: Any, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Async variant of `invoke`"""
+        if self.cache is None:
+            return await compute()
+        key, cached = self._lookup(messages)
+        if cached is not None:
+            return cached
+        response = await compute()
+        self._store(key, response)
+        return response
+
+
+_caches: Dict[Path, LLMResponseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_llm_cache(path: Path, max_entries: int = 20_000) -> LLMResponseCache:
+    """One cache (SQLite connection) per file for the whole process"""
+    path = Path(path)
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = LLMResponseCache(path, max_entries=max_entries)
+            _caches[path] = cache
+        return cache
@@ -0,0 +1,344 @@
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: pip install pyarrow (Parquet / Feather / Arrow sources)
+    pa = pq = None
+
+
+@dataclass
+class SamplingReport:
+    """Cost of drawing a sample from a source table."""
+    method: str
+    sample_rows: int
+    rows_scanned: int
+    bytes_read: int
+    chunks: int
+    seconds: float
+    truncated: bool = False  # stopped by the nrows / byte budget before the end of the source
+
+    def summary(self) -> str:
+        return (
+            f"{self.method} sample of {self.sample_rows} row(s) from {self.rows_scanned} scanned row(s), "
+            f"{self.bytes_read / 1_048_576:.1f} MiB read in {self.chunks} chunk(s), {self.seconds:.2f}s"
+            + (" (stopped by the scan budget)" if self.truncated else "")
+        )
+
+
+class ReservoirSampler:
+    """
+    Uniform sample of `size` rows from a stream of DataFrame chunks (Algorithm R,
+    vectorized per chunk). Memory is bounded by the reservoir, not by the stream.
+    """
+
+    def __init__(self, size: int, seed: Optional[int] = None):
+        self.size = size
+        self.seen = 0
+        self._rng = np.random.default_rng(seed)
+        self._rows: List[Optional[pd.DataFrame]] = [None] * size
+        self._positions = np.full(size, -1, dtype=np.int64)
+
+    def add(self, chunk: pd.DataFrame) -> None:
+        n = len(chunk)
+        if n == 0 or self.size <= 0:
+            self.seen += n
+            return
+
+        positions = np.arange(self.seen, self.seen + n)
+        # Row t (0-based) replaces a random slot with probability size / (t + 1)
+        slots = np.floor(self._rng.random(n) * (positions + 1)).astype(np.int64)
+        slots[positions < self.size] = positions[positions < self.size]  # fill the reservoir first
+
+        for i in np.flatnonzero(slots < self.size):
+            slot = slots[i]
+            self._rows[slot] = chunk.iloc[[i]]
+            self._positions[slot] = positions[i]
+        self.seen += n
+
+    def sample(self) -> pd.DataFrame:
+        """Sampled rows in their original order"""
+        filled = [(pos, row) for pos, row in zip(self._positions, self._rows) if row is not None]
+        if not filled:
+            return pd.DataFrame()
+        filled.sort(key=lambda item: item[0])
+        return pd.concat([row for _, row in filled], ignore_index=True)
+
+
+def sample_csv(
+    path: Path,
+    sep: str,
+    sample_size: int,
+    method: str = "reservoir",
+    max_rows: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+    chunksize: int = 50_000,
+    seed: Optional[int] = None,
+    profiler=None,
+    columns: Optional[List[str]] = None,
+    decimal: str = ".",
+) -> Tuple[pd.DataFrame, SamplingReport]:
+    """
+    Sample `sample_size` rows of a CSV file without loading the whole file.
+
+    The file is scanned from its start: when `max_rows` / `max_bytes` stop the scan, the
+    sample is uniform over the head of the file only (the report is `truncated`).
+
+    Args:
+        path: CSV file
+        sep: Column separator
+        sample_size: Number of rows in the sample
+        method: "reservoir" (uniform over the scanned rows) or "head" (first rows, legacy)
+        max_rows: Stop after this many rows (None = no limit)
+        max_bytes: Stop once about this many bytes were read (None = no limit)
+        chunksize: Rows parsed per chunk
+        seed: Seed of the reservoir sampler (None = not reproducible)
+        profiler: Optional ColumnProfiler fed with every scanned chunk (same single pass)
+        columns: Columns to read (None = all)
+        decimal: Decimal separator of the numbers (e.g. "," for `1727237,59`)
+
+    Returns:
+        Tuple of (sample DataFrame, SamplingReport)
+    """
+    start = time.perf_counter()
+    read_options = {"sep": sep, "usecols": columns, "decimal": decimal}
+    if method == "head":
+        nrows = sample_size if max_rows is None else min(sample_size, max_rows)
+        df = pd.read_csv(path, nrows=nrows, **read_options)
+        df = df if columns is None else df[columns]  # usecols keeps the file order
+        if profiler is not None:
+            profiler.add(df)
+        report = SamplingReport(method, len(df), len(df), 0, 1, time.perf_counter() - start)
+        return df, report
+    if method != "reservoir":
+        raise ValueError(f"Unknown sampling method {method!r}, expected 'reservoir' or 'head'")
+
+    sampler = ReservoirSampler(sample_size, seed=seed)
+    chunks = 0
+    truncated = False
+    with open(path, "rb") as handle:
+        reader = pd.read_csv(handle, chunksize=chunksize, nrows=max_rows, **read_options)
+        for chunk in reader:
+            sampler.add(chunk)
+            if profiler is not None:
+                profiler.add(chunk)
+            chunks += 1
+            # The parser reads ahead, so the position is an upper bound of the parsed bytes
+            if max_bytes and handle.tell() >= max_bytes:
+                truncated = True
+                break
+        bytes_read = handle.tell()
+    if max_rows is not None and sampler.seen >= max_rows:
+        truncated = True
+
+    sample = sampler.sample()
+    if columns is not None and len(sample):
+        sample = sample[columns]  # usecols keeps the file order
+    report = SamplingReport(method, len(sample), sampler.seen, bytes_read, chunks, time.perf_counter() - start, truncated)
+    return sample, report
+
+
+# --- Columnar sources (Parquet, Feather / Arrow IPC) ---
+def _require_pyarrow(path: Path) -> None:
+    if pq is None:
+        raise ImportError(f"Reading {Path(path).name} needs pyarrow: pip install pyarrow")
+
+
+def _project(available: List[str], columns: Optional[List[str]]) -> List[str]:
+    if columns is None:
+        return list(available)
+    missing = [c for c in columns if c not in available]
+    if missing:
+        raise ValueError(f"Columns not found in the source: {', '.join(missing)}")
+    return list(columns)
+
+
+def _choose_groups(
+    group_rows: List[int],
+    group_bytes: List[float],
+    method: str,
+    max_rows: Optional[int],
+    max_bytes: Optional[int],
+    rng: np.random.Generator,
+) -> Tuple[List[int], bool]:
+    """
+    Row groups to read: taken in random order ("reservoir") or file order ("head") until
+    the row / byte budget is spent (at least one). Returns (row groups in file order, truncated).
+    """
+    if method == "head":
+        order = list(range(len(group_rows)))
+    elif method == "reservoir":
+        order = [int(i) for i in rng.permutation(len(group_rows))]
+    else:
+        raise ValueError(f"Unknown sampling method {method!r}, expected 'reservoir' or 'head'")
+
+    chosen: List[int] = []
+    rows = 0
+    size = 0.0
+    for i in order:
+        if chosen and ((max_rows is not None and rows >= max_rows) or (max_bytes and size >= max_bytes)):
+            break
+        chosen.append(i)
+        rows += group_rows[i]
+        size += group_bytes[i]
+    return sorted(chosen), len(chosen) < len(order)
+
+
+def _sample_groups(
+    chunks: Iterator[Tuple[pd.DataFrame, float]],
+    sample_size: int,
+    max_rows: Optional[int],
+    max_bytes: Optional[int],
+    chunksize: int,
+    seed: Optional[int],
+    profiler,
+) -> Tuple[pd.DataFrame, int, float, bool]:
+    """
+    Reservoir sample (and profile) of the chunks of the chosen row groups. `chunks` yields
+    (DataFrame, bytes read for it); small record batches are merged into `chunksize` rows.
+    Returns (sample, rows scanned, bytes read, stopped by the budget).
+    """
+    sampler = ReservoirSampler(sample_size, seed=seed)
+    bytes_read = 0.0
+    pending: List[pd.DataFrame] = []
+    pending_rows = 0
+
+    def flush() -> None:
+        nonlocal pending, pending_rows
+        if pending:
+            chunk = pd.concat(pending, ignore_index=True) if len(pending) > 1 else pending[0]
+            sampler.add(chunk)
+            if profiler is not None:
+                profiler.add(chunk)
+        pending, pending_rows = [], 0
+
+    stopped = False
+    for chunk, chunk_bytes in chunks:
+        if max_rows is not None:
+            chunk = chunk.iloc[:max(0, max_rows - sampler.seen - pending_rows)]
+        pending.append(chunk)
+        pending_rows += len(chunk)
+        bytes_read += chunk_bytes
+        if pending_rows >= chunksize:
+            flush()
+        # The budget also cuts a single large row group
+        if (max_rows is not None and sampler.seen + pending_rows >= max_rows) or (max_bytes and bytes_read >= max_bytes):
+            stopped = True
+            break
+    flush()
+    return sampler.sample(), sampler.seen, bytes_read, stopped
+
+
+def sample_parquet(
+    path: Path,
+    sample_size: int,
+    method: str = "reservoir",
+    max_rows: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+    chunksize: int = 50_000,
+    seed: Optional[int] = None,
+    profiler=None,
+    columns: Optional[List[str]] = None,
+) -> Tuple[pd.DataFrame, SamplingReport]:
+    """
+    Sample `sample_size` rows of a Parquet file from randomly chosen row groups.
+
+    Only the footer metadata and the projected column chunks of the chosen row groups
+    are read: row groups are picked in random order until the `max_rows` / `max_bytes`
+    (compressed bytes, from the metadata) budget is spent, then read in file order. The
+    sample is uniform over the rows of the row groups read.
+
+    Args: see sample_csv
+
+    Returns:
+        Tuple of (sample DataFrame, SamplingReport)
+    """
+    _require_pyarrow(path)
+    start = time.perf_counter()
+    parquet = pq.ParquetFile(path)
+    metadata = parquet.metadata
+    columns = _project(parquet.schema_arrow.names, columns)
+    if method == "head":
+        max_rows = sample_size if max_rows is None else min(sample_size, max_rows)
+
+    wanted = set(columns)
+    group_rows, group_bytes = [], []
+    for i in range(metadata.num_row_groups):
+        group = metadata.row_group(i)
+        group_rows.append(group.num_rows)
+        group_bytes.append(sum(
+            group.column(j).total_compressed_size
+            for j in range(group.num_columns)
+            if group.column(j).path_in_schema.split(".")[0] in wanted
+        ))
+    chosen, truncated = _choose_groups(group_rows, group_bytes, method, max_rows, max_bytes, np.random.default_rng(seed))
+
+    def chunks():
+        for i in chosen:
+            for batch in parquet.iter_batches(batch_size=chunksize, row_groups=[i], columns=columns):
+                yield batch.to_pandas(), group_bytes[i] * batch.num_rows / max(1, group_rows[i])
+
+    sample, scanned, bytes_read, stopped = _sample_groups(chunks(), sample_size, max_rows, max_bytes, chunksize, seed, profiler)
+    report = SamplingReport(
+        f"parquet {method}", len(sample), scanned, int(bytes_read), len(chosen), time.perf_counter() - start,
+        method != "head" and (truncated or stopped),
+    )
+    return sample, report
+
+
+def sample_arrow(
+    path: Path,
+    sample_size: int,
+    method: str = "reservoir",
+    max_rows: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+    chunksize: int = 50_000,
+    seed: Optional[int] = None,
+    profiler=None,
+    columns: Optional[List[str]] = None,
+) -> Tuple[pd.DataFrame, SamplingReport]:
+    """
+    Sample `sample_size` rows of a Feather (v2) / Arrow IPC file from randomly chosen
+    record batches.
+
+    The file is memory-mapped and only the projected columns of the chosen record
+    batches are read (and decompressed). The size of a batch is estimated from the first
+    one, `max_bytes` counts uncompressed bytes. Otherwise as sample_parquet.
+
+    Returns:
+        Tuple of (sample DataFrame, SamplingReport)
+    """
+    _require_pyarrow(path)
+    start = time.perf_counter()
+    with pa.memory_map(str(path), "r") as source:
+        names = pa.ipc.open_file(source).schema.names
+        columns = _project(names, columns)
+        options = pa.ipc.IpcReadOptions(included_fields=[names.index(c) for c in columns])
+        reader = pa.ipc.open_file(source, options=options)
+        if method == "head":
+            max_rows = sample_size if max_rows is None else min(sample_size, max_rows)
+
+        n_batches = reader.num_record_batches
+        first = reader.get_batch(0) if n_batches else None
+        group_rows = [first.num_rows if first is not None else 0] * n_batches
+        group_bytes = [first.nbytes if first is not None else 0] * n_batches
+        chosen, truncated = _choose_groups(group_rows, group_bytes, method, max_rows, max_bytes, np.random.default_rng(seed))
+
+        def chunks():
+            for i in chosen:
+                batch = reader.get_batch(i)
+                # included_fields keeps the file order of the columns
+                yield batch.to_pandas()[columns], batch.nbytes
+
+        sample, scanned, bytes_read, stopped = _sample_groups(chunks(), sample_size, max_rows, max_bytes, chunksize, seed, profiler)
+    report = SamplingReport(
+        f"arrow {method}", len(sample), scanned, int(bytes_read), len(chosen), time.perf_counter() - start,
+        method != "head" and (truncated or stopped),
+    )
+    return sample, report
@@ -0,0 +1,274 @@
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import duckdb
+except ImportError:  # optional: pip install duckdb
+    duckdb = None
+
+
+@dataclass(frozen=True)
+class SQLTable:
+    """A table (or view) of a SQL source"""
+    schema: str
+    name: str
+
+    @property
+    def qualified(self) -> str:
+        return f"{quote_identifier(self.schema)}.{quote_identifier(self.name)}"
+
+    def __str__(self) -> str:
+        return f"{self.schema}.{self.name}"
+
+
+@dataclass(frozen=True)
+class SQLColumn:
+    name: str
+    data_type: str
+    nullable: bool = True
+
+
+def quote_identifier(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+class SQLConnector(ABC):
+    """
+    Interface of a SQL source: list the tables of the catalog, fetch their schema and
+    pull row samples with the sampling pushed down to the database, so no table is
+    exported or fully read before a glossary run.
+
+    Connections are shared by the threads of a batch run, queries are serialized.
+    """
+
+    dialect = ""
+    default_schema = "main"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    # --- to implement ---
+    @abstractmethod
+    def list_tables(self, schema: Optional[str] = None) -> List[SQLTable]:
+        ...
+
+    @abstractmethod
+    def table_schema(self, table: SQLTable) -> List[SQLColumn]:
+        ...
+
+    @abstractmethod
+    def sample(self, table: SQLTable, n: int, columns: Optional[List[str]] = None, seed: Optional[int] = None) -> pd.DataFrame:
+        """About `n` uniformly sampled rows of `table` (fewer if the table is smaller)"""
+
+    @abstractmethod
+    def close(self) -> None:
+        ...
+
+    # --- shared ---
+    def resolve(self, name: str) -> SQLTable:
+        """`schema.table` or `table` (default schema) -> SQLTable"""
+        schema, _, table = name.rpartition(".")
+        return SQLTable(schema or self.default_schema, table)
+
+    def _projection(self, table: SQLTable, columns: Optional[List[str]]) -> str:
+        available = [c.name for c in self.table_schema(table)]
+        if not available:
+            raise ValueError(f"Table {table} not found in the {self.dialect} source")
+        if columns is None:
+            return ", ".join(quote_identifier(c) for c in available)
+        missing = [c for c in columns if c not in available]
+        if missing:
+            raise ValueError(f"Columns not found in {table}: {', '.join(missing)}")
+        return ", ".join(quote_identifier(c) for c in columns)
+
+    @abstractmethod
+    def _query(self, sql: str, params=()) -> pd.DataFrame:
+        ...
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class SQLiteConnector(SQLConnector):
+    """
+    SQLite file (opened read-only). Attached databases are listed as schemas.
+
+    Samples are drawn by random rowids: the rowid range is read from the ends of the
+    table b-tree and only the drawn rows are fetched. Tables without rowid (and views)
+    fall back to `ORDER BY random() LIMIT n`, which scans them.
+    """
+
+    dialect = "sqlite"
+
+    def __init__(self, path: Path):
+        super().__init__()
+        self.path = Path(path)
+        if not self.path.exists():
+            raise FileNotFoundError(f"SQLite database not found: {self.path}")
+        self._conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+
+    def _query(self, sql: str, params=()) -> pd.DataFrame:
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            columns = [d[0] for d in cursor.description]
+            return pd.DataFrame(cursor.fetchall(), columns=columns)
+
+    def list_tables(self, schema: Optional[str] = None) -> List[SQLTable]:
+        schemas = [schema] if schema else self._query("PRAGMA database_list")["name"].tolist()
+        tables = []
+        for name in schemas:
+            df = self._query(
+                f"SELECT name FROM {quote_identifier(name)}.sqlite_master "
+                "WHERE type IN ('table', 'view') AND name NOT LIKE 'sqlite_%' ORDER BY name"
+            )
+            tables.extend(SQLTable(name, t) for t in df["name"])
+        return tables
+
+    def table_schema(self, table: SQLTable) -> List[SQLColumn]:
+        df = self._query(f"PRAGMA {quote_identifier(table.schema)}.table_info({quote_identifier(table.name)})")
+        return [SQLColumn(r["name"], r["type"], not r["notnull"]) for r in df.to_dict(orient="records")]
+
+    def sample(self, table: SQLTable, n: int, columns: Optional[List[str]] = None, seed: Optional[int] = None) -> pd.DataFrame:
+        projection = self._projection(table, columns)
+        try:
+            bounds = self._query(f"SELECT min(rowid) AS lo, max(rowid) AS hi FROM {table.qualified}")
+        except sqlite3.OperationalError:  # no rowid
+            return self._query(f"SELECT {projection} FROM {table.qualified} ORDER BY random() LIMIT ?", (n,))
+        lo, hi = bounds.iloc[0]["lo"], bounds.iloc[0]["hi"]
+        if pd.isna(lo):
+            return self._query(f"SELECT {projection} FROM {table.qualified} LIMIT 0")
+        lo, hi = int(lo), int(hi)
+
+        rng = np.random.default_rng(seed)
+        if hi - lo + 1 <= 4 * n:  # small table: draw from all rows
+            df = self._query(f"SELECT {projection} FROM {table.qualified} ORDER BY rowid")
+            keep = np.sort(rng.choice(len(df), size=min(n, len(df)), replace=False))
+            return df.iloc[keep].reset_index(drop=True)
+
+        # Rowids may have gaps (deleted rows): draw more than needed, for a few rounds
+        rows: List[pd.DataFrame] = []
+        found: set = set()
+        for _ in range(8):
+            missing = n - len(found)
+            if missing <= 0:
+                break
+            candidates = [int(r) for r in np.unique(rng.integers(lo, hi + 1, size=2 * missing + 16)) if int(r) not in found]
+            for start in range(0, len(candidates), 900):  # SQLite variable limit
+                batch = candidates[start:start + 900]
+                df = self._query(
+                    f"SELECT rowid AS __rowid__, {projection} FROM {table.qualified} "
+                    f"WHERE rowid IN ({', '.join('?' * len(batch))})",
+                    batch,
+                )
+                rows.append(df)
+                found.update(df["__rowid__"].tolist())
+        if len(found) < n:
+            print(f"⚠️ {table}: sparse rowids, sampling with ORDER BY random()")
+            return self._query(f"SELECT {projection} FROM {table.qualified} ORDER BY random() LIMIT ?", (n,))
+
+        df = pd.concat(rows, ignore_index=True).drop_duplicates("__rowid__")
+        df = df.iloc[np.sort(rng.choice(len(df), size=n, replace=False))]
+        return df.sort_values("__rowid__").drop(columns="__rowid__").reset_index(drop=True)
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class DuckDBConnector(SQLConnector):
+    """
+    DuckDB database file (or ":memory:"), opened read-only.
+
+    Samples use DuckDB's sampling clause: `reservoir(n ROWS)`, and for tables above
+    `system_sample_min_rows` a block-level `system` sample first, so only a fraction of
+    the row groups is read.
+    """
+
+    dialect = "duckdb"
+
+    def __init__(self, path: str = ":memory:", read_only: bool = True, system_sample_min_rows: int = 1_000_000):
+        super().__init__()
+        if duckdb is None:
+            raise ImportError("DuckDB sources need duckdb: pip install duckdb")
+        self.path = str(path)
+        self.system_sample_min_rows = system_sample_min_rows
+        in_memory = self.path == ":memory:"
+        if not in_memory and not Path(self.path).exists():
+            raise FileNotFoundError(f"DuckDB database not found: {self.path}")
+        self._conn = duckdb.connect(self.path, read_only=read_only and not in_memory)
+
+    def _query(self, sql: str, params=()) -> pd.DataFrame:
+        with self._lock:
+            return self._conn.execute(sql, list(params)).df()
+
+    def list_tables(self, schema: Optional[str] = None) -> List[SQLTable]:
+        df = self._query(
+            "SELECT table_schema, table_name FROM information_schema.tables "
+            "WHERE table_catalog = current_database() AND table_schema NOT IN ('information_schema', 'pg_catalog') "
+            "AND (? IS NULL OR table_schema = ?) ORDER BY table_schema, table_name",
+            (schema, schema),
+        )
+        return [SQLTable(s, t) for s, t in zip(df["table_schema"], df["table_name"])]
+
+    def table_schema(self, table: SQLTable) -> List[SQLColumn]:
+        df = self._query(
+            "SELECT column_name, data_type, is_nullable FROM information_schema.columns "
+            "WHERE table_catalog = current_database() AND table_schema = ? AND table_name = ? "
+            "ORDER BY ordinal_position",
+            (table.schema, table.name),
+        )
+        return [
+            SQLColumn(r["column_name"], r["data_type"], r["is_nullable"] == "YES")
+            for r in df.to_dict(orient="records")
+        ]
+
+    def _estimated_rows(self, table: SQLTable) -> Optional[int]:
+        df = self._query(
+            "SELECT estimated_size FROM duckdb_tables() "
+            "WHERE database_name = current_database() AND schema_name = ? AND table_name = ?",
+            (table.schema, table.name),
+        )
+        return int(df.iloc[0, 0]) if len(df) and not pd.isna(df.iloc[0, 0]) else None  # None for views
+
+    def sample(self, table: SQLTable, n: int, columns: Optional[List[str]] = None, seed: Optional[int] = None) -> pd.DataFrame:
+        projection = self._projection(table, columns)
+        repeatable = f" REPEATABLE ({int(seed)})" if seed is not None else ""
+        source = f"(SELECT {projection} FROM {table.qualified})"
+
+        estimated = self._estimated_rows(table)
+        if estimated and estimated >= self.system_sample_min_rows:
+            # Whole vectors of rows are kept: read ~100x the sample (at least 20 vectors) only
+            percent = min(100.0, 100.0 * max(100 * n, 20 * 2048) / estimated)
+            seed_arg = f", {int(seed)}" if seed is not None else ""
+            source = f"(SELECT {projection} FROM {table.qualified} USING SAMPLE {percent:.6f} PERCENT (system{seed_arg}))"
+        return self._query(f"SELECT * FROM {source} USING SAMPLE reservoir({int(n)} ROWS){repeatable}")
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def open_connector(url: str) -> SQLConnector:
+    """
+    Connector of a SQL source URL:
+        - "sqlite:///path/to/file.db"
+        - "duckdb:///path/to/file.duckdb" or "duckdb:///:memory:"
+    Paths are relative to the working directory unless absolute ("sqlite:////abs/path.db").
+    """
+    dialect, sep, path = url.partition("://")
+    if not sep:
+        raise ValueError(f"SQL source {url!r} must look like 'sqlite:///file.db' or 'duckdb:///file.duckdb'")
+    path = path[1:] if path.startswith("/") else path
+    if dialect == "sqlite":
+        return SQLiteConnector(Path(path))
+    if dialect == "duckdb":
+        return DuckDBConnector(path or ":memory:")
+    raise ValueError(f"Unknown SQL dialect {dialect!r}, expected 'sqlite' or 'duckdb'")
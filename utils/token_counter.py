@@ -0,0 +1,28 @@
+from functools import lru_cache
+
+try:
+    import tiktoken
+except ImportError:  # optional: fall back to a character based estimate
+    tiktoken = None
+
+
+DEFAULT_MODEL = "gpt-4o-mini"
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def estimate_tokens(text: str, model: str = DEFAULT_MODEL) -> int:
+    """
+    Number of tokens of `text` for `model`.
+    Uses tiktoken when installed, otherwise ~4 characters per token.
+    """
+    text = str(text or "")
+    if tiktoken is None:
+        return (len(text) + 3) // 4
+    return len(_encoding(model).encode(text, disallowed_special=()))